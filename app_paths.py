@@ -0,0 +1,23 @@
+"""用户数据目录（缓存、历史记录等）"""
+import os
+import sys
+
+APP_DIR_NAME = "FocusTimer"
+
+
+def user_data_dir():
+    """返回本应用的用户数据目录，不存在时自动创建
+
+    Windows: %APPDATA%\\FocusTimer
+    其他平台: $XDG_CONFIG_HOME/FocusTimer（默认为 ~/.config/FocusTimer）
+    可以通过环境变量 FOCUS_TIMER_HOME 指定其他位置。
+    """
+    path = os.environ.get("FOCUS_TIMER_HOME")
+    if not path:
+        if sys.platform.startswith("win"):
+            base = os.environ.get("APPDATA") or os.path.expanduser("~")
+        else:
+            base = os.environ.get("XDG_CONFIG_HOME") or os.path.join(os.path.expanduser("~"), ".config")
+        path = os.path.join(base, APP_DIR_NAME)
+    os.makedirs(path, exist_ok=True)
+    return path
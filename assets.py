@@ -0,0 +1,128 @@
+"""图标和提示音等资源的统一加载
+
+资源根目录只确定一次（PyInstaller 打包后为 sys._MEIPASS，否则为程序所在目录，
+不依赖当前工作目录），每个文件只检查一次是否存在、只解码一次，之后返回共享的
+QPixmap/QIcon。每次实际加载的耗时记录在 load_times 中，带 --import-times
+启动时也会出现在启动里程碑里。
+
+资源根目录下有 resources.pack（见 resource_pack，打包时生成）时，其中包含的
+资源直接从内存映射的资源包中读取，不再打开零散的文件。
+"""
+import os
+import sys
+import time
+
+from PyQt5.QtGui import QIcon, QPixmap
+from PyQt5.QtWidgets import QApplication, QStyle
+
+import startup_profile
+from resource_pack import PACK_FILE_NAME, ResourcePack
+from timer_engine import CUE_BREAK, CUE_DING
+
+APP_ICON = "icons/clock.png"
+SOUND_FILES = {
+    CUE_DING: "sounds/ding.mp3",
+    CUE_BREAK: "sounds/break.mp3",
+}
+
+_shared = None
+
+
+def resource_root():
+    """资源根目录：打包后为 PyInstaller 的解压目录，否则为本文件所在目录"""
+    return getattr(sys, "_MEIPASS", None) or os.path.dirname(os.path.abspath(__file__))
+
+
+class AssetManager:
+    """按相对路径（如 "icons/clock.png"）缓存资源的路径和解码结果"""
+
+    def __init__(self, root=None):
+        self.root = root or resource_root()
+        self.load_times = {}  # 相对路径 -> 加载耗时(ms)
+        self._paths = {}
+        self._pixmaps = {}
+        self._icons = {}
+        self._fallback_icon = None
+        self.pack = self._open_pack()
+
+    def _open_pack(self):
+        start = time.perf_counter()
+        try:
+            pack = ResourcePack(os.path.join(self.root, PACK_FILE_NAME))
+        except FileNotFoundError:
+            return None  # 未打包运行时使用零散的资源文件
+        except (OSError, ValueError) as e:
+            print(f"无法读取资源包，改用资源文件: {e}")
+            return None
+        self._record(PACK_FILE_NAME, start)
+        return pack
+
+    def path(self, name):
+        """返回资源的绝对路径，文件不存在时返回 None（结果会被缓存）"""
+        if name not in self._paths:
+            path = os.path.join(self.root, name)
+            if not os.path.exists(path):
+                print(f"找不到资源文件: {path}")
+                path = None
+            self._paths[name] = path
+        return self._paths[name]
+
+    def _record(self, name, start):
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.load_times[name] = elapsed_ms
+        startup_profile.mark(f"加载 {name} ({elapsed_ms:.1f} ms)")
+
+    def pixmap(self, name):
+        """返回共享的 QPixmap，无法加载时返回空的 QPixmap"""
+        pixmap = self._pixmaps.get(name)
+        if pixmap is None:
+            start = time.perf_counter()
+            if self.pack is not None and name in self.pack:
+                pixmap = QPixmap()
+                if not pixmap.loadFromData(self.pack.get(name), self.pack.format(name).upper()):
+                    print(f"加载图片失败: {PACK_FILE_NAME}:{name}")
+            else:
+                path = self.path(name)
+                pixmap = QPixmap(path) if path else QPixmap()
+                if path and pixmap.isNull():
+                    print(f"加载图片失败: {path}")
+            self._pixmaps[name] = pixmap
+            self._record(name, start)
+        return pixmap
+
+    def icon(self, name=APP_ICON):
+        """返回共享的 QIcon，无法加载时返回系统默认图标"""
+        icon = self._icons.get(name)
+        if icon is None:
+            pixmap = self.pixmap(name)
+            icon = self.fallback_icon() if pixmap.isNull() else QIcon(pixmap)
+            self._icons[name] = icon
+        return icon
+
+    def fallback_icon(self):
+        if self._fallback_icon is None:
+            self._fallback_icon = QApplication.style().standardIcon(QStyle.SP_ComputerIcon)
+        return self._fallback_icon
+
+    def sound_sources(self):
+        """返回 {提示音名称: 资源包中的数据或绝对路径}，供 SoundBank 解码
+
+        缺少的文件不包含在内（播放时使用回退方式）。
+        """
+        sources = {}
+        for cue, name in SOUND_FILES.items():
+            if self.pack is not None and name in self.pack:
+                sources[cue] = self.pack.get(name)
+            else:
+                path = self.path(name)
+                if path:
+                    sources[cue] = path
+        return sources
+
+
+def shared_assets():
+    """返回全局共享的 AssetManager，需在创建 QApplication 之后调用"""
+    global _shared
+    if _shared is None:
+        _shared = AssetManager()
+    return _shared
@@ -0,0 +1,218 @@
+"""提示音的加载与播放
+
+pygame 的导入、mixer 初始化和 MP3 解码都放到后台线程中进行，
+窗口显示之前不做任何音频相关的工作。解码后的 PCM 数据缓存在磁盘上，
+之后启动时通过内存映射直接读取，不再解码 MP3。播放由专用的 AudioWorker
+线程完成，计时线程只投递命令，不会被音频设备或系统提示音阻塞。
+"""
+import collections
+import glob
+import hashlib
+import io
+import mmap
+import os
+import threading
+
+
+def _decode(pygame, source):
+    """解码声音：source 为文件路径，或资源包中的 MP3 数据（bytes/memoryview）"""
+    if isinstance(source, str):
+        return pygame.mixer.Sound(source)
+    return pygame.mixer.Sound(file=io.BytesIO(source))
+
+
+class PcmCache:
+    """解码后的 PCM 数据的磁盘缓存
+
+    缓存文件名由声音名称、源文件内容的哈希和 mixer 格式组成，
+    用户替换了 MP3 文件或 mixer 格式变化时会自动重新生成。
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+
+    def _cache_path(self, name, source, mixer_format):
+        if isinstance(source, str):
+            with open(source, "rb") as f:
+                source = f.read()
+        digest = hashlib.sha1(source).hexdigest()[:16]
+        frequency, size, channels = mixer_format
+        return os.path.join(self.cache_dir, f"{name}-{digest}-{frequency}_{size}_{channels}.pcm")
+
+    def load(self, pygame, name, source):
+        """返回 source（文件路径或 MP3 数据）对应的 pygame Sound，优先从缓存读取"""
+        cache_path = self._cache_path(name, source, pygame.mixer.get_init())
+        try:
+            with open(cache_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return pygame.mixer.Sound(buffer=data)
+        except (OSError, ValueError):
+            pass  # 缓存不存在或为空，重新解码
+
+        sound = _decode(pygame, source)
+        try:
+            self._store(name, cache_path, sound.get_raw())
+        except Exception as e:
+            print(f"写入声音缓存失败 {cache_path}: {e}")
+        return sound
+
+    def _store(self, name, cache_path, raw):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # 删除同名声音的旧缓存（源文件已被替换或 mixer 格式已变化）
+        for stale_path in glob.glob(os.path.join(self.cache_dir, f"{name}-*.pcm")):
+            if stale_path != cache_path:
+                try:
+                    os.remove(stale_path)
+                except OSError:
+                    pass
+        # 先写临时文件再替换，避免中途退出留下不完整的缓存
+        tmp_path = cache_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(raw)
+        os.replace(tmp_path, cache_path)
+
+
+class SoundBank:
+    """在后台线程中初始化 pygame.mixer 并解码提示音
+
+    sources 为 {名称: 文件路径或资源包中的 MP3 数据}，名称与 timer_engine 的 CUE_* 常量一致。
+    cache_dir 不为 None 时使用 PcmCache 缓存解码结果。
+    """
+
+    def __init__(self, sources, cache_dir=None):
+        self.sources = sources
+        self.cache = PcmCache(cache_dir) if cache_dir else None
+        self.sounds = {}
+        self.ready = threading.Event()  # 加载结束（无论成功与否）后置位
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def load_async(self):
+        """开始后台加载，重复调用不会重复加载"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._load, name="sound-loader", daemon=True)
+                self._thread.start()
+
+    def _load(self):
+        try:
+            import pygame
+            pygame.mixer.init()
+        except Exception as e:
+            print(f"音频初始化失败: {e}")
+            self.ready.set()
+            return
+
+        for name, source in self.sources.items():
+            try:
+                if self.cache is not None:
+                    self.sounds[name] = self.cache.load(pygame, name, source)
+                else:
+                    self.sounds[name] = _decode(pygame, source)
+            except Exception as e:
+                print(f"声音文件加载失败 {source if isinstance(source, str) else name}: {e}")
+        self.ready.set()
+
+    def get(self, name, timeout=0):
+        """返回已解码的声音对象
+
+        尚未加载完成时最多等待 timeout 秒，仍未就绪或加载失败时返回 None，
+        由调用方决定回退方式（例如系统提示音）。
+        """
+        if not self.ready.wait(timeout):
+            self.load_async()
+            return None
+        return self.sounds.get(name)
+
+
+class AudioWorker:
+    """专用的声音播放线程，使用有界命令队列
+
+    play / stop / set_volume 只把命令放入队列后立即返回。队列策略：
+    - 已有相同声音的 play 在排队时，新的 play 被合并；
+    - 排队的 play 达到 max_pending 条时丢弃最早的一条 play（越新的提示越有意义）；
+    - stop 会清除所有排队中的 play，多次 stop 只保留最后一次；
+    - 多次 set_volume 只保留最后一次。
+    控制命令（stop / set_volume）不会被丢弃，队列中最多有 max_pending 条 play 和各一条控制命令。
+    fallback(name) 在声音不可用或播放失败时于播放线程中调用（例如系统提示音）。
+    """
+    CMD_PLAY = "play"
+    CMD_STOP = "stop"
+    CMD_SET_VOLUME = "set_volume"
+
+    def __init__(self, sound_bank, fallback=None, max_pending=4):
+        self.sound_bank = sound_bank
+        self.fallback = fallback
+        self.max_pending = max_pending
+        self.volume = None
+        self.dropped = 0  # 被合并或丢弃的命令数
+        self._queue = collections.deque()
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def play(self, name):
+        self._post(self.CMD_PLAY, name)
+
+    def stop(self):
+        self._post(self.CMD_STOP, None)
+
+    def set_volume(self, volume):
+        """设置音量 (0.0-1.0)"""
+        self._post(self.CMD_SET_VOLUME, volume)
+
+    def _post(self, cmd, arg):
+        with self._cond:
+            if cmd == self.CMD_PLAY:
+                if (cmd, arg) in self._queue:
+                    self.dropped += 1
+                    return
+                plays = [queued for queued in self._queue if queued[0] == self.CMD_PLAY]
+                if plays and len(plays) >= self.max_pending:
+                    self._queue.remove(plays[0])
+                    self.dropped += 1
+            elif cmd == self.CMD_STOP:
+                pending = len(self._queue)
+                self._queue = collections.deque(c for c in self._queue
+                                                if c[0] not in (self.CMD_PLAY, self.CMD_STOP))
+                self.dropped += pending - len(self._queue)
+            elif cmd == self.CMD_SET_VOLUME:
+                pending = len(self._queue)
+                self._queue = collections.deque(c for c in self._queue if c[0] != self.CMD_SET_VOLUME)
+                self.dropped += pending - len(self._queue)
+            self._queue.append((cmd, arg))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="audio-worker", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                cmd, arg = self._queue.popleft()
+            try:
+                self._execute(cmd, arg)
+            except Exception as e:
+                print(f"音频命令执行失败 {cmd}: {e}")
+
+    def _execute(self, cmd, arg):
+        if cmd == self.CMD_PLAY:
+            sound = self.sound_bank.get(arg)
+            try:
+                if sound is None:
+                    raise RuntimeError("声音尚未加载")
+                if self.volume is not None:
+                    sound.set_volume(self.volume)
+                sound.play()
+            except Exception as e:
+                if self.fallback is not None:
+                    self.fallback(arg)
+                else:
+                    print(f"播放声音失败: {e}")
+        elif cmd == self.CMD_STOP:
+            for sound in list(self.sound_bank.sounds.values()):
+                sound.stop()
+        elif cmd == self.CMD_SET_VOLUME:
+            self.volume = arg
+            for sound in list(self.sound_bank.sounds.values()):
+                sound.set_volume(arg)
@@ -0,0 +1,191 @@
+"""启动时间基准测试（Linux）：比较源码运行和各打包配置的冷/热启动时间
+
+对每个目标分别测量：
+    tray    带 --fast-start 启动，到托盘图标显示为止
+    window  正常启动，到主窗口显示为止
+时间从创建进程开始、到程序通过 FOCUS_TIMER_STARTUP_FD 报告对应的启动里程碑为止
+（见 startup_profile），包括单文件 exe 解压运行时的时间。
+
+冷启动前用 posix_fadvise(DONTNEED) 把目标的文件（打包目录或脚本所在目录）从页缓存中
+清除；以 root 运行并加 --drop-caches 时改为清空整个页缓存（包括 Qt 等系统库）。
+热启动先运行一次预热，不计入结果。每个目标使用单独的临时数据目录，
+不会与正在运行的实例冲突。
+
+用法:
+    python build.py && python build.py --profile fast
+    python bench_startup.py --runs 10
+    python bench_startup.py --target source="python3 pomodoro_timer.py" --target fast=dist/fast/专注时钟/专注时钟
+在没有图形界面的机器上可以设置 QT_QPA_PLATFORM=offscreen。
+"""
+import argparse
+import os
+import select
+import shlex
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from startup_profile import STARTUP_FD_ENV
+
+# (名称, 额外参数, 等待的里程碑)
+MODES = (
+    ("tray", ["--fast-start"], "tray icon shown"),
+    ("window", [], "window shown"),
+)
+DEFAULT_TARGETS = (
+    ("source", [sys.executable, "pomodoro_timer_windows.py"]),
+    ("onefile", [os.path.join("dist", "专注时钟")]),
+    ("fast", [os.path.join("dist", "fast", "专注时钟", "专注时钟")]),
+    ("onefile", [os.path.join("dist", "FocusTimer")]),
+    ("fast", [os.path.join("dist", "fast", "FocusTimer", "FocusTimer")]),
+)
+START_TIMEOUT_S = 60.0
+
+
+def default_targets():
+    """已存在的默认目标（未打包的配置会被跳过）"""
+    targets = []
+    for name, command in DEFAULT_TARGETS:
+        if name not in (t[0] for t in targets) and os.path.exists(command[-1]):
+            targets.append((name, command))
+    return targets
+
+
+def _evict_paths(command):
+    """冷启动时需要清除缓存的目录：命令中每个已存在的文件所在的目录（不包括 Python 解释器）"""
+    interpreter = os.path.realpath(sys.executable)
+    paths = set()
+    for token in command:
+        if os.path.isfile(token) and os.path.realpath(token) != interpreter:
+            paths.add(os.path.dirname(os.path.abspath(token)))
+    return sorted(paths)
+
+
+def evict_page_cache(paths):
+    """把 paths 下所有文件从页缓存中清除，返回处理的文件数"""
+    count = 0
+    for root in paths:
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                try:
+                    fd = os.open(os.path.join(dirpath, filename), os.O_RDONLY)
+                except OSError:
+                    continue
+                try:
+                    os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+                    count += 1
+                except OSError:
+                    pass
+                finally:
+                    os.close(fd)
+    return count
+
+
+def drop_all_caches():
+    os.sync()
+    with open("/proc/sys/vm/drop_caches", "w") as f:
+        f.write("3\n")
+
+
+def measure_once(command, milestone, home):
+    """启动 command，返回到 milestone 的毫秒数（超时或提前退出时返回 None）"""
+    read_fd, write_fd = os.pipe()
+    env = dict(os.environ, FOCUS_TIMER_HOME=home, **{STARTUP_FD_ENV: str(write_fd)})
+    start = time.perf_counter()
+    process = subprocess.Popen(command, env=env, pass_fds=(write_fd,),
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.close(write_fd)
+    elapsed_ms = None
+    buffer = b""
+    try:
+        deadline = start + START_TIMEOUT_S
+        while elapsed_ms is None:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0 or not select.select([read_fd], [], [], remaining)[0]:
+                break
+            data = os.read(read_fd, 4096)
+            if not data:
+                break  # 进程已退出
+            buffer += data
+            if milestone.encode("utf-8") in buffer.split(b"\n"):
+                elapsed_ms = (time.perf_counter() - start) * 1000
+    finally:
+        os.close(read_fd)
+        process.terminate()
+        try:
+            process.wait(10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+    return elapsed_ms
+
+
+def run_benchmark(targets, runs, drop_caches=False):
+    """返回 [(目标, 模式, "cold"/"warm", [毫秒...])]"""
+    results = []
+    for name, command in targets:
+        evict = _evict_paths(command)
+        with tempfile.TemporaryDirectory(prefix="focus-bench-") as home:
+            for mode, extra_args, milestone in MODES:
+                full_command = command + extra_args
+                cold = []
+                for _ in range(runs):
+                    if drop_caches:
+                        drop_all_caches()
+                    else:
+                        evict_page_cache(evict)
+                    cold.append(measure_once(full_command, milestone, home))
+                measure_once(full_command, milestone, home)  # 预热
+                warm = [measure_once(full_command, milestone, home) for _ in range(runs)]
+                results.append((name, mode, "cold", cold))
+                results.append((name, mode, "warm", warm))
+                print(f"  {name} {mode}: 完成", file=sys.stderr)
+    return results
+
+
+def print_report(results, runs):
+    print(f"启动时间 (ms，每项 {runs} 次)")
+    print(f"{'目标':<10}{'模式':<8}{'缓存':<6}{'中位数':>10}{'最小':>10}{'最大':>10}{'失败':>6}")
+    for name, mode, temperature, samples in results:
+        ok = [s for s in samples if s is not None]
+        failed = len(samples) - len(ok)
+        if ok:
+            print(f"{name:<10}{mode:<8}{temperature:<6}{statistics.median(ok):>10.1f}"
+                  f"{min(ok):>10.1f}{max(ok):>10.1f}{failed:>6}")
+        else:
+            print(f"{name:<10}{mode:<8}{temperature:<6}{'-':>10}{'-':>10}{'-':>10}{failed:>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="启动时间基准测试（冷/热启动，Linux）")
+    parser.add_argument("--target", action="append", default=[], metavar="NAME=COMMAND",
+                        help="要测量的程序，可重复；默认为源码运行以及 dist/ 下已打包的配置")
+    parser.add_argument("--runs", type=int, default=5, help="每种情况的测量次数")
+    parser.add_argument("--drop-caches", action="store_true",
+                        help="冷启动前清空整个页缓存（需要 root）")
+    args = parser.parse_args()
+
+    if not sys.platform.startswith("linux"):
+        parser.error("只支持 Linux")
+    if args.drop_caches and os.geteuid() != 0:
+        parser.error("--drop-caches 需要 root 权限")
+
+    targets = []
+    for spec in args.target:
+        name, sep, command = spec.partition("=")
+        if not sep or not command:
+            parser.error(f"--target 格式应为 NAME=COMMAND: {spec}")
+        targets.append((name, shlex.split(command)))
+    targets = targets or default_targets()
+
+    print(f"Python {sys.version.split()[0]}  内核 {os.uname().release}  "
+          f"冷启动方式: {'drop_caches' if args.drop_caches else 'posix_fadvise'}")
+    for name, command in targets:
+        print(f"  {name}: {shlex.join(command)}")
+    print_report(run_benchmark(targets, args.runs, args.drop_caches), args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""计时引擎基准测试：用模拟时钟快进跑大量会话
+
+不需要 PyQt5 / pygame，也不用真正等待。报告每次唤醒/刷新的调度开销、
+各阶段的计时偏差以及各类事件的发送次数，用于在发布前发现计时引擎的性能回退。
+
+用法:
+    python bench_timer.py                       # 默认跑 1000 个会话
+    python bench_timer.py --sessions 5000 --latency-ms 15
+    python bench_timer.py --max-tick-overhead-us 50   # 超过阈值时以非零状态退出
+
+--live 模式用真实时钟在 Qt 事件循环中运行一个会话（需要 PyQt5），
+对比线程版引擎和 QTimer 版引擎的线程数、上下文切换次数和内存占用:
+    python bench_timer.py --live 60 --engine thread
+    python bench_timer.py --live 60 --engine qt
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+
+from timer_engine import SUSPEND_PAUSE, SUSPEND_POLICIES, SessionEngine, SimulatedClock
+
+# 参数取值范围与界面上各个 QSpinBox 的范围一致
+MIN_INTERVAL_RANGE = (1, 30)
+SHORT_BREAK_CHOICES = range(5, 61, 5)
+LONG_BREAK_CHOICES = range(5, 61, 5)
+TOTAL_WORK_TIME_CHOICES = range(10, 241, 10)
+
+
+class BenchListener:
+    """统计引擎发出的事件，并记录每个阶段的实际时长"""
+
+    def __init__(self):
+        self.counts = Counter()
+        self.drift_s = defaultdict(list)  # phase -> [实际时长 - 计划时长]
+
+    def on_phase_started(self, phase, phase_total_s):
+        self.counts["phase_started"] += 1
+
+    def on_tick(self, event):
+        self.counts["tick"] += 1
+
+    def on_cue(self, cue):
+        self.counts["cue"] += 1
+
+    def on_phase_finished(self, phase, phase_total_s, elapsed_s, completed):
+        self.counts["phase_finished"] += 1
+        if completed:
+            self.drift_s[phase].append(elapsed_s - phase_total_s)
+
+    def on_session_finished(self):
+        self.counts["session_finished"] += 1
+
+
+def random_settings(rng):
+    """随机生成一组合法的会话参数"""
+    min_interval = rng.randint(*MIN_INTERVAL_RANGE)
+    max_interval = rng.randint(min_interval, MIN_INTERVAL_RANGE[1])
+    return (min_interval, max_interval,
+            rng.choice(SHORT_BREAK_CHOICES),
+            rng.choice(LONG_BREAK_CHOICES),
+            rng.choice(TOTAL_WORK_TIME_CHOICES))
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def run_benchmark(sessions, seed=0, latency_s=0.0, suspend_policy=SUSPEND_PAUSE):
+    """跑 sessions 个随机参数的会话，返回汇总结果字典"""
+    rng = random.Random(seed)
+    listener = BenchListener()
+    run_times_s = []
+    end_errors_s = []  # 每个会话结束时的累计偏差
+    total_waits = 0
+    total_simulated_s = 0.0
+
+    for i in range(sessions):
+        clock = SimulatedClock(wake_latency_s=latency_s, rng=random.Random(seed + i))
+        engine = SessionEngine(clock=clock, rng=random.Random(seed + i), suspend_policy=suspend_policy)
+        engine.listeners.append(listener)
+        engine.configure(*random_settings(rng))
+
+        start = time.perf_counter()
+        engine.run()
+        run_times_s.append(time.perf_counter() - start)
+        end_errors_s.append(abs(engine.drift_report()["drift_s"]))
+
+        total_waits += clock.waits
+        total_simulated_s += clock.now()
+
+    total_run_s = sum(run_times_s)
+    ticks = listener.counts["tick"]
+    drift = {}
+    for phase, values in listener.drift_s.items():
+        values.sort()
+        drift[phase] = {
+            "count": len(values),
+            "mean_ms": sum(values) / len(values) * 1000,
+            "p99_ms": percentile(values, 0.99) * 1000,
+            "max_ms": values[-1] * 1000,
+            "max_abs_ms": max(-values[0], values[-1]) * 1000,  # 偏差有正有负
+        }
+    end_errors_s.sort()
+    return {
+        "sessions": sessions,
+        "simulated_hours": total_simulated_s / 3600,
+        "speedup": total_simulated_s / total_run_s if total_run_s else 0.0,
+        "wall_ms_per_session": total_run_s / sessions * 1000,
+        "overhead_us_per_wakeup": total_run_s / total_waits * 1e6 if total_waits else 0.0,
+        "overhead_us_per_tick": total_run_s / ticks * 1e6 if ticks else 0.0,
+        "wakeups_per_minute": total_waits * 60 / total_simulated_s if total_simulated_s else 0.0,
+        "ticks_per_minute": ticks * 60 / total_simulated_s if total_simulated_s else 0.0,
+        "counts": dict(listener.counts),
+        "drift": drift,
+        "session_end_error": {
+            "mean_ms": sum(end_errors_s) / len(end_errors_s) * 1000 if end_errors_s else 0.0,
+            "p99_ms": percentile(end_errors_s, 0.99) * 1000,
+            "max_ms": end_errors_s[-1] * 1000 if end_errors_s else 0.0,
+        },
+    }
+
+
+def print_report(result):
+    print(f"会话数: {result['sessions']}  模拟时长: {result['simulated_hours']:.1f} 小时  "
+          f"加速比: {result['speedup']:.0f}x")
+    print(f"每个会话耗时: {result['wall_ms_per_session']:.3f} ms")
+    print(f"调度开销: {result['overhead_us_per_wakeup']:.2f} us/唤醒, "
+          f"{result['overhead_us_per_tick']:.2f} us/刷新")
+    print(f"唤醒频率: {result['wakeups_per_minute']:.1f} 次/分钟, "
+          f"刷新频率: {result['ticks_per_minute']:.1f} 次/分钟")
+    print("事件次数: " + ", ".join(f"{name}={count}" for name, count in sorted(result["counts"].items())))
+    print("阶段计时偏差 (实际 - 计划):")
+    for phase, stats in sorted(result["drift"].items()):
+        print(f"  {phase:<12} n={stats['count']:<7} mean={stats['mean_ms']:.2f} ms  "
+              f"p99={stats['p99_ms']:.2f} ms  max={stats['max_ms']:.2f} ms")
+    end = result["session_end_error"]
+    print(f"会话结束累计偏差: mean={end['mean_ms']:.2f} ms  p99={end['p99_ms']:.2f} ms  "
+          f"max={end['max_ms']:.2f} ms")
+
+
+def _process_sample():
+    """返回 (自愿上下文切换, 非自愿上下文切换, 最大常驻内存KB)，不支持的平台返回 None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_nvcsw, usage.ru_nivcsw, usage.ru_maxrss
+
+
+def run_live(seconds, engine_name):
+    """在 Qt 事件循环中用真实时钟运行一个会话 seconds 秒，返回资源占用"""
+    from PyQt5.QtCore import QCoreApplication, QTimer
+    from qt_engine import QtSessionEngine
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+    engine = QtSessionEngine() if engine_name == "qt" else SessionEngine()
+    listener = BenchListener()
+    engine.listeners.append(listener)
+    engine.configure(1, 5, 10, 20, 90)
+
+    before = _process_sample()
+    cpu_before = time.process_time()
+    engine.start()
+    threads = threading.active_count()
+    QTimer.singleShot(int(seconds * 1000), app.quit)
+    app.exec_()
+    after = _process_sample()
+    cpu_s = time.process_time() - cpu_before
+    engine.stop()
+    engine.join(1.0)
+
+    result = {
+        "engine": engine_name,
+        "seconds": seconds,
+        "threads": threads,
+        "ticks": listener.counts["tick"],
+        "cpu_ms": cpu_s * 1000,
+    }
+    if before is not None and after is not None:
+        result["voluntary_switches"] = after[0] - before[0]
+        result["involuntary_switches"] = after[1] - before[1]
+        result["max_rss_kb"] = after[2]
+    return result
+
+
+def print_live_report(result):
+    print(f"引擎: {result['engine']}  运行: {result['seconds']} 秒  线程数: {result['threads']}  "
+          f"刷新次数: {result['ticks']}  CPU: {result['cpu_ms']:.1f} ms")
+    if "voluntary_switches" in result:
+        print(f"上下文切换: 自愿 {result['voluntary_switches']}, 非自愿 {result['involuntary_switches']}  "
+              f"最大常驻内存: {result['max_rss_kb']} KB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="计时引擎基准测试（模拟时钟）")
+    parser.add_argument("--sessions", type=int, default=1000, help="模拟的会话数量")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子，保证结果可复现")
+    parser.add_argument("--latency-ms", type=float, default=0.0,
+                        help="模拟每次唤醒的最大调度延迟(毫秒)")
+    parser.add_argument("--max-tick-overhead-us", type=float, default=None,
+                        help="每次刷新的调度开销上限(微秒)，超过时以状态码 1 退出")
+    parser.add_argument("--max-drift-ms", type=float, default=None,
+                        help="单个阶段计时偏差上限(毫秒)，超过时以状态码 1 退出")
+    parser.add_argument("--suspend-policy", choices=SUSPEND_POLICIES, default=SUSPEND_PAUSE,
+                        help="检测到系统休眠时被打断阶段的处理方式")
+    parser.add_argument("--live", type=float, default=None, metavar="SECONDS",
+                        help="改为用真实时钟在 Qt 事件循环中运行一个会话（需要 PyQt5）")
+    parser.add_argument("--engine", choices=("thread", "qt"), default="thread",
+                        help="--live 模式使用的引擎：计时线程或 QTimer 状态机")
+    args = parser.parse_args()
+
+    if args.live is not None:
+        print_live_report(run_live(args.live, args.engine))
+        return
+
+    result = run_benchmark(args.sessions, seed=args.seed, latency_s=args.latency_ms / 1000,
+                           suspend_policy=args.suspend_policy)
+    print_report(result)
+
+    failed = False
+    if args.max_tick_overhead_us is not None and result["overhead_us_per_tick"] > args.max_tick_overhead_us:
+        print(f"失败: 每次刷新开销 {result['overhead_us_per_tick']:.2f} us 超过上限 {args.max_tick_overhead_us} us")
+        failed = True
+    if args.max_drift_ms is not None:
+        # 提前结束的阶段偏差为负，按绝对值比较
+        worst_ms = max([stats["max_abs_ms"] for stats in result["drift"].values()]
+                       + [result["session_end_error"]["max_ms"]])
+        if worst_ms > args.max_drift_ms:
+            print(f"失败: 最大阶段偏差（绝对值）{worst_ms:.2f} ms 超过上限 {args.max_drift_ms} ms")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,8 @@ import os
 import sys
 import shutil
 from distutils.core import setup
-import PyInstaller.__main__
+import build_profiles
+import resource_pack
 
 # 设置控制台输出编码
 if sys.platform == 'win32':
@@ -10,7 +11,9 @@ if sys.platform == 'win32':
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
     os.system('chcp 65001 >nul')  # 设置Windows命令行为UTF-8编码
 
-print("开始打包专注时钟应用...")
+# --profile fast 生成启动更快的目录形式（见 build_profiles）
+profile = build_profiles.requested_profile(sys.argv)
+print(f"开始打包专注时钟应用（{profile}）...")
 
 # 确保必要的文件夹存在
 for folder in ["sounds", "icons"]:
@@ -47,16 +50,21 @@ if not os.path.exists(main_script):
     print(f"错误: 找不到主脚本文件 {main_script}")
     sys.exit(1)
 
+# 把图标和提示音打包成一个资源包，程序启动时只需映射这一个文件
+if resource_pack.main(["-o", resource_pack.DEFAULT_OUTPUT]) != 0:
+    sys.exit(1)
+
 # 运行PyInstaller打包
 print("开始PyInstaller打包过程...")
-PyInstaller.__main__.run([
+build_profiles.run_pyinstaller(profile, [
     main_script,
     '--name=专注时钟',
-    '--onefile',
     '--windowed',
-    '--add-data=sounds;sounds',
-    '--add-data=icons;icons',
+    f'--add-data={resource_pack.DEFAULT_OUTPUT}{os.pathsep}.',
     f'--icon={icon_file}' if os.path.exists(icon_file) else '',
-])
+] + build_profiles.profile_args(profile))
 
-print("打包完成! 可执行文件位于 dist/专注时钟.exe") 
\ No newline at end of file
+if profile == build_profiles.PROFILE_ONEFILE:
+    print("打包完成! 可执行文件位于 dist/专注时钟.exe")
+else:
+    print(f"打包完成! 程序目录位于 {build_profiles.dist_path(profile)}/专注时钟/") 
\ No newline at end of file
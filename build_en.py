@@ -3,9 +3,12 @@ import sys
 import shutil
 import subprocess
 from distutils.core import setup
-import PyInstaller.__main__
+import build_profiles
+import resource_pack
 
-print("Starting to package Focus Timer application...")
+# --profile fast builds the startup-optimized onedir layout (see build_profiles)
+profile = build_profiles.requested_profile(sys.argv)
+print(f"Starting to package Focus Timer application ({profile})...")
 
 # Install Pillow for icon processing
 try:
@@ -77,16 +80,17 @@ print("icons/ directory contents:")
 if os.path.exists("icons"):
     print(os.listdir("icons"))
 
+# Pack the icon and sounds into one indexed resource file that the app memory-maps at startup
+if resource_pack.main(["-o", resource_pack.DEFAULT_OUTPUT]) != 0:
+    sys.exit(1)
+
 # Build command arguments list
 args = [
     main_script,
     '--name=FocusTimer',
-    '--onefile',
     '--windowed',
-    f'--add-data=sounds/ding.mp3{separator}sounds',
-    f'--add-data=sounds/break.mp3{separator}sounds',
-    f'--add-data=icons/clock.png{separator}icons',
-]
+    f'--add-data={resource_pack.DEFAULT_OUTPUT}{separator}.',
+] + build_profiles.profile_args(profile)
 
 # Add icon parameter if .ico file exists
 if os.path.exists(icon_file_ico):
@@ -97,6 +101,9 @@ elif os.path.exists(icon_file_png):
 # Run PyInstaller packaging
 print("\nStarting PyInstaller packaging process...")
 print(f"Command arguments: {args}")
-PyInstaller.__main__.run(args)
+build_profiles.run_pyinstaller(profile, args)
 
-print("\nPackaging complete! Executable file is located at dist/FocusTimer.exe") 
\ No newline at end of file
+if profile == build_profiles.PROFILE_ONEFILE:
+    print("\nPackaging complete! Executable file is located at dist/FocusTimer.exe")
+else:
+    print(f"\nPackaging complete! Application folder is located at {build_profiles.dist_path(profile)}/FocusTimer/") 
\ No newline at end of file
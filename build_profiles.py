@@ -0,0 +1,74 @@
+"""打包配置：默认的单文件 exe 和启动更快的 fast 配置
+
+    onefile  与以前相同的单个可执行文件，每次启动都要把 Python 运行时、PyQt5 和
+             pygame 解压到临时目录
+    fast     目录形式（onedir），不需要解压；字节码用 -O 预编译；排除程序用不到的
+             Qt 模块、pygame 子模块和可选依赖（numpy 等），不使用 UPX 压缩
+
+用法: python build.py --profile fast（输出到 dist/fast/）
+两种配置的冷/热启动时间可以用 bench_startup.py 测量。
+"""
+import os
+import subprocess
+import sys
+
+PROFILE_FLAG = "--profile"
+PROFILE_ONEFILE = "onefile"
+PROFILE_FAST = "fast"
+PROFILES = (PROFILE_ONEFILE, PROFILE_FAST)
+
+EXCLUDED_QT_MODULES = (
+    "PyQt5.QtBluetooth", "PyQt5.QtDBus", "PyQt5.QtDesigner", "PyQt5.QtHelp", "PyQt5.QtLocation",
+    "PyQt5.QtMultimedia", "PyQt5.QtMultimediaWidgets", "PyQt5.QtNetwork", "PyQt5.QtNfc",
+    "PyQt5.QtOpenGL", "PyQt5.QtPositioning", "PyQt5.QtPrintSupport", "PyQt5.QtQml", "PyQt5.QtQuick",
+    "PyQt5.QtQuickWidgets", "PyQt5.QtSensors", "PyQt5.QtSerialPort", "PyQt5.QtSql", "PyQt5.QtTest",
+    "PyQt5.QtWebChannel", "PyQt5.QtWebSockets", "PyQt5.QtXml", "PyQt5.QtXmlPatterns", "PyQt5.uic",
+)
+# 只用到 pygame.mixer；这些子模块在 pygame/__init__.py 中都是可选导入
+EXCLUDED_PYGAME_MODULES = (
+    "pygame.examples", "pygame.tests", "pygame.docs", "pygame.camera", "pygame._camera_opencv",
+    "pygame._camera_vidcapture", "pygame.surfarray", "pygame.sndarray", "pygame.midi",
+    "pygame.freetype", "pygame.ftfont",
+)
+# numpy 只用于加速统计（stats 有纯 Python 实现）
+EXCLUDED_OTHER_MODULES = ("numpy", "tkinter", "unittest", "pydoc", "doctest", "xmlrpc", "lib2to3")
+
+
+def requested_profile(argv):
+    """--profile fast / --profile=fast，默认为 onefile"""
+    for i, arg in enumerate(argv):
+        if arg.startswith(PROFILE_FLAG + "="):
+            profile = arg.split("=", 1)[1]
+        elif arg == PROFILE_FLAG and i + 1 < len(argv):
+            profile = argv[i + 1]
+        else:
+            continue
+        if profile not in PROFILES:
+            print(f"未知的打包配置 {profile}，可选: {', '.join(PROFILES)}")
+            sys.exit(1)
+        return profile
+    return PROFILE_ONEFILE
+
+
+def dist_path(profile):
+    return "dist" if profile == PROFILE_ONEFILE else os.path.join("dist", profile)
+
+
+def profile_args(profile):
+    """返回该配置需要的 PyInstaller 参数"""
+    if profile == PROFILE_ONEFILE:
+        return ["--onefile"]
+    args = ["--onedir", "--noupx", "--noconfirm", f"--distpath={dist_path(profile)}",
+            f"--workpath={os.path.join('build', profile)}"]
+    for module in EXCLUDED_QT_MODULES + EXCLUDED_PYGAME_MODULES + EXCLUDED_OTHER_MODULES:
+        args.append(f"--exclude-module={module}")
+    return args
+
+
+def run_pyinstaller(profile, args):
+    """按配置运行 PyInstaller；fast 配置在 python -O 下运行，打包的字节码随之优化"""
+    if profile == PROFILE_ONEFILE:
+        import PyInstaller.__main__
+        PyInstaller.__main__.run(args)
+    else:
+        subprocess.check_call([sys.executable, "-O", "-m", "PyInstaller"] + args)
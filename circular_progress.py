@@ -0,0 +1,172 @@
+import math
+
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtCore import Qt, QPointF, QRectF
+from PyQt5.QtGui import QFont, QFontMetricsF, QPainter, QPen, QColor, QPixmap, QRegion
+
+
+class CircularProgressBar(QWidget):
+    """自定义圆形进度条控件
+
+    背景圆圈和刻度线是静态的，只在控件尺寸或设备像素比变化时
+    重新绘制到缓存的 QPixmap 中；每帧只绘制进度弧和文本。
+    数值没有变化时不重绘，只有文本变化时只重绘对应的文本区域。
+    """
+    TICK_COUNT = 60
+    ARC_PEN_WIDTH = 10
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMinimumSize(220, 220)  # 设置最小尺寸以确保有足够空间绘制
+        self.percentage = 0
+        self.text = "00:00"
+        self.total_text = "总剩余: 00:00:00"
+
+        # 静态表盘缓存，键为 (宽, 高, 设备像素比)
+        self._dial_pixmap = None
+        self._dial_key = None
+
+        # 每帧都会用到的画笔和字体只创建一次
+        self._arc_pen = QPen(QColor(76, 175, 80), self.ARC_PEN_WIDTH)  # 设置为绿色，可以根据需要调整
+        self._text_pen = QPen(QColor(10, 10, 10))
+        self._text_font = QFont("Arial", 28, QFont.Bold)
+        self._text_line_height = QFontMetricsF(self._text_font).height() + 4
+        self._total_font = QFont("Arial", 13, QFont.Bold)
+
+    def setPercentage(self, value):
+        """设置进度百分比 (0-100)"""
+        self.setValues(percentage=value)
+
+    def setText(self, text):
+        """设置中心显示的文本"""
+        self.setValues(text=text)
+
+    def setTotalText(self, text):
+        """设置总剩余时间文本"""
+        self.setValues(total_text=text)
+
+    def setValues(self, percentage=None, text=None, total_text=None):
+        """一次性设置进度、中心文本和总剩余文本，为 None 的参数保持不变
+
+        只有真正变化的部分才会被标记为需要重绘，多个变化合并为一次重绘请求。
+        """
+        dirty = QRegion()
+        if percentage is not None and percentage != self.percentage:
+            old_percentage = self.percentage
+            self.percentage = percentage
+            if self._span_angle(percentage) != self._span_angle(old_percentage):
+                dirty = dirty.united(self._ring_rect())
+        if text is not None and text != self.text:
+            self.text = text
+            dirty = dirty.united(self._text_rect().toAlignedRect())
+        if total_text is not None and total_text != self.total_text:
+            self.total_text = total_text
+            dirty = dirty.united(self._total_rect().toAlignedRect())
+        if not dirty.isEmpty():
+            self.update(dirty)  # 触发（部分）重绘
+
+    @staticmethod
+    def _span_angle(percentage):
+        """进度对应的弧度跨度，Qt使用1/16度单位，顺时针为负"""
+        return int(-percentage * 360 * 16 / 100)
+
+    def _dial_rect(self):
+        """圆形所在的正方形区域（留出一些边距）"""
+        width = self.width()
+        height = self.height()
+        size = min(width, height) - 10
+        return QRectF((width - size) / 2, (height - size) / 2, size, size)
+
+    def _text_rect(self):
+        """中心时间文本所在的区域"""
+        rect = self._dial_rect()
+        line_height = self._text_line_height
+        return QRectF(rect.left(), rect.center().y() - line_height / 2, rect.width(), line_height)
+
+    def _total_rect(self):
+        """总剩余时间文本区：位于圆形高度66%处，高度为圆形高度的20%"""
+        rect = self._dial_rect()
+        return QRectF(
+            rect.left(),
+            rect.top() + rect.height() * 0.66,
+            rect.width(),
+            rect.height() * 0.2
+        )
+
+    def _ring_rect(self):
+        """进度弧所在的整个圆环区域（含画笔宽度和抗锯齿的边缘）
+
+        跨度不同时 drawArc 对整条弧的细分和抗锯齿都会略有不同，只重绘变化的一段
+        会在其他位置留下旧的边缘像素，因此进度变化时重绘整个圆环（表盘有缓存，开销很小）。
+        """
+        margin = self.ARC_PEN_WIDTH / 2 + 2
+        return self._dial_rect().adjusted(-margin, -margin, margin, margin).toAlignedRect()
+
+    def _render_dial(self, dpr):
+        """把背景圆圈和刻度线绘制到一张透明的 QPixmap 上"""
+        pixmap = QPixmap(max(1, round(self.width() * dpr)), max(1, round(self.height() * dpr)))
+        pixmap.setDevicePixelRatio(dpr)
+        pixmap.fill(Qt.transparent)
+
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        rect = self._dial_rect()
+
+        # 绘制背景圆圈
+        painter.setPen(QPen(QColor(200, 200, 200), 10))
+        painter.drawEllipse(rect)
+
+        # 绘制刻度线
+        painter.translate(rect.center())  # 将原点移到中心
+        radius = rect.width() / 2 - 5  # 略微调整刻度线位置
+        major_pen = QPen(QColor(50, 50, 50), 2)
+        minor_pen = QPen(QColor(150, 150, 150), 1)
+        for i in range(self.TICK_COUNT):
+            if i % 5 == 0:  # 每5分钟一个大刻度
+                painter.setPen(major_pen)
+                inner = radius - 10
+            else:
+                painter.setPen(minor_pen)
+                inner = radius - 5
+            angle = math.radians(i * 360 / self.TICK_COUNT)
+            sin_a, cos_a = math.sin(angle), -math.cos(angle)
+            painter.drawLine(QPointF(inner * sin_a, inner * cos_a),
+                             QPointF(radius * sin_a, radius * cos_a))
+        painter.end()
+        return pixmap
+
+    def _static_layer(self):
+        """返回静态表盘缓存，尺寸或设备像素比变化时重建"""
+        dpr = self.devicePixelRatioF()
+        key = (self.width(), self.height(), dpr)
+        if self._dial_pixmap is None or self._dial_key != key:
+            self._dial_pixmap = self._render_dial(dpr)
+            self._dial_key = key
+        return self._dial_pixmap
+
+    def resizeEvent(self, event):
+        self._dial_pixmap = None
+        super().resizeEvent(event)
+
+    def paintEvent(self, event):
+        """绘制圆形进度条"""
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self._static_layer())
+        painter.setRenderHint(QPainter.Antialiasing)  # 启用抗锯齿
+        rect = self._dial_rect()
+
+        # 绘制进度弧
+        if self.percentage > 0:
+            painter.setPen(self._arc_pen)
+            # 计算起始角度和跨度角度，Qt中0度是3点钟方向，逆时针旋转
+            start_angle = 90 * 16  # 从12点钟方向开始
+            painter.drawArc(rect, start_angle, self._span_angle(self.percentage))
+
+        # 绘制当前时间文本
+        painter.setPen(self._text_pen)
+        painter.setFont(self._text_font)
+        painter.drawText(self._text_rect(), Qt.AlignCenter, self.text)
+
+        # 在圆形内部绘制总剩余时间
+        painter.setFont(self._total_font)
+        painter.drawText(self._total_rect(), Qt.AlignCenter, self.total_text)
@@ -0,0 +1,55 @@
+"""快速启动模式：先只显示托盘图标，第一次打开时才创建主窗口
+
+适合开机自启动：登录时只需创建 QApplication 和托盘图标，设置表单、
+进度条和计时引擎等都推迟到用户第一次打开窗口时再构建。
+"""
+import os
+
+from PyQt5.QtCore import QObject
+from PyQt5.QtWidgets import QAction, QApplication, QMenu, QStyle, QSystemTrayIcon
+
+FAST_START_FLAG = "--fast-start"
+FAST_START_ENV = "FOCUS_TIMER_FAST_START"
+
+
+def fast_start_requested(argv):
+    """命令行带 --fast-start 或环境变量 FOCUS_TIMER_FAST_START=1 时启用"""
+    return FAST_START_FLAG in argv or os.environ.get(FAST_START_ENV) == "1"
+
+
+class DeferredWindowLauncher(QObject):
+    """只带“打开/退出”菜单的托盘图标，第一次打开时调用 window_factory 创建主窗口
+
+    window_factory(tray_icon) 需返回带有 show_window() 方法的窗口，
+    窗口接管同一个托盘图标（重新设置菜单和信号连接）。
+    """
+
+    def __init__(self, window_factory, icon, tooltip, show_text, quit_text):
+        super().__init__()
+        self.window_factory = window_factory
+        self.window = None
+
+        if icon.isNull():
+            icon = QApplication.style().standardIcon(QStyle.SP_ComputerIcon)
+        self.tray_icon = QSystemTrayIcon(icon)
+        self.tray_menu = QMenu()
+        self.tray_menu.addAction(QAction(show_text, self, triggered=self.show_window))
+        self.tray_menu.addAction(QAction(quit_text, self, triggered=QApplication.quit))
+        self.tray_icon.setContextMenu(self.tray_menu)
+        self.tray_icon.activated.connect(self._on_activated)
+        self.tray_icon.setToolTip(tooltip)
+        self.tray_icon.show()
+
+    def _on_activated(self, reason):
+        if reason == QSystemTrayIcon.DoubleClick:
+            self.show_window()
+
+    def ensure_window(self):
+        """返回主窗口，尚未创建时创建（但不显示）"""
+        if self.window is None:
+            self.tray_icon.activated.disconnect(self._on_activated)
+            self.window = self.window_factory(self.tray_icon)
+        return self.window
+
+    def show_window(self):
+        self.ensure_window().show_window()
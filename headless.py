@@ -0,0 +1,275 @@
+"""无界面的专注时钟：在终端或后台运行同样的工作/休息循环
+
+只使用标准库，不加载 PyQt5 和 pygame。提醒通过可插拔的通知方式发出：
+    bell    终端响铃
+    stdout  在终端输出状态（终端中显示实时倒计时）
+    socket  在本地套接字上广播 JSON 行事件，其他程序连接后即可接收
+
+用法:
+    python headless.py                               # 默认参数，输出到终端并响铃
+    python headless.py --min 25 --max 25 --total 100 --notify stdout
+    python headless.py --notify socket --socket /tmp/focus.sock --repeat --daemon
+    nc -U /tmp/focus.sock                            # 在另一个终端接收事件
+"""
+import argparse
+import json
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+
+from app_paths import user_data_dir
+import instrumentation
+from history import HISTORY_FILE_NAME, HistoryRecorder, HistoryStore
+from timer_engine import (CUE_BREAK, PHASE_LONG_BREAK, PHASE_SHORT_BREAK, PHASE_WORKING, SUSPEND_PAUSE,
+                          SUSPEND_POLICIES, SessionEngine, format_clock, format_total_seconds)
+
+PHASE_DISPLAY_TEXTS = {
+    PHASE_WORKING: "工作中",
+    PHASE_SHORT_BREAK: "短休息",
+    PHASE_LONG_BREAK: "长休息",
+}
+DISPLAY_PLEASE_REST_SECONDS = "请休息 {seconds} 秒"
+DISPLAY_BACK_TO_WORK = "继续工作"
+DISPLAY_LONG_BREAK_NOTICE = "{total_time_min}分钟已到！请起来活动并休息 {long_break_min} 分钟"
+DISPLAY_SESSION_FINISHED = "本次专注结束"
+
+DAEMON_LOG_FILE_NAME = "headless.log"
+
+
+class BellSink:
+    """每次提示音时在终端响铃（长休息响两次）"""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def on_cue(self, cue):
+        self.stream.write("\a\a" if cue == CUE_BREAK else "\a")
+        self.stream.flush()
+
+
+class StdoutSink:
+    """输出阶段变化；live 为 True 时在同一行刷新倒计时（默认仅在终端中）"""
+
+    def __init__(self, engine, stream=None, live=None):
+        self.engine = engine
+        self.stream = stream or sys.stdout
+        self.live = self.stream.isatty() if live is None else live
+
+    def _line(self, text):
+        prefix = "\r\033[K" if self.live else ""
+        self.stream.write(f"{prefix}{time.strftime('%H:%M:%S')} {text}\n")
+        self.stream.flush()
+
+    def on_phase_started(self, phase, phase_total_s):
+        if phase == PHASE_WORKING:
+            self._line(f"{DISPLAY_BACK_TO_WORK} {format_clock(phase_total_s)}")
+        elif phase == PHASE_SHORT_BREAK:
+            self._line(DISPLAY_PLEASE_REST_SECONDS.format(seconds=phase_total_s))
+        else:
+            self._line(DISPLAY_LONG_BREAK_NOTICE.format(total_time_min=self.engine.total_work_time_m,
+                                                        long_break_min=self.engine.long_break_m))
+
+    def on_tick(self, event):
+        if self.live:
+            self.stream.write(f"\r\033[K{PHASE_DISPLAY_TEXTS[event.phase]}: {format_clock(event.remaining_s)}"
+                              f"  总剩余: {format_total_seconds(event.overall_remaining_s)}")
+            self.stream.flush()
+
+    def on_session_finished(self):
+        self._line(DISPLAY_SESSION_FINISHED)
+
+
+def _is_tcp_address(address):
+    """"host:port" 为 TCP 地址，否则为 Unix 套接字路径"""
+    return ":" in address and not address.startswith("/")
+
+
+class SocketSink:
+    """在本地套接字上向所有已连接的客户端广播 JSON 行事件
+
+    address 为 Unix 套接字路径，或 "host:port"（建议只用 127.0.0.1）。
+    客户端断开或写入阻塞时直接丢弃该客户端，不会拖慢计时。
+    """
+
+    def __init__(self, address):
+        if _is_tcp_address(address):
+            host, port = address.rsplit(":", 1)
+            self._server = socket.create_server((host, int(port)))
+        else:
+            if os.path.exists(address):
+                os.remove(address)
+            self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._server.bind(address)
+            self._server.listen(4)
+        self.address = address
+        self._clients = []
+        self._lock = threading.Lock()
+        threading.Thread(target=self._accept_loop, name="notify-socket", daemon=True).start()
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return
+            conn.setblocking(False)
+            with self._lock:
+                self._clients.append(conn)
+
+    def _send(self, event, **fields):
+        data = (json.dumps(dict(event=event, time=time.time(), **fields), ensure_ascii=False) + "\n").encode()
+        with self._lock:
+            for conn in list(self._clients):
+                try:
+                    conn.sendall(data)
+                except OSError:
+                    self._clients.remove(conn)
+                    conn.close()
+
+    def on_phase_started(self, phase, phase_total_s):
+        self._send("phase_started", phase=phase, phase_total_s=phase_total_s)
+
+    def on_phase_finished(self, phase, phase_total_s, elapsed_s, completed):
+        self._send("phase_finished", phase=phase, elapsed_s=round(elapsed_s, 3), completed=completed)
+
+    def on_cue(self, cue):
+        self._send("cue", cue=cue)
+
+    def on_session_finished(self):
+        self._send("session_finished")
+
+    def close(self):
+        self._server.close()
+        with self._lock:
+            for conn in self._clients:
+                conn.close()
+            self._clients = []
+
+
+def daemonize(log_path):
+    """脱离终端在后台运行（仅 POSIX），标准输出和错误输出重定向到 log_path"""
+    if os.fork() > 0:
+        os._exit(0)
+    os.setsid()
+    if os.fork() > 0:
+        os._exit(0)
+    os.chdir("/")
+    with open(os.devnull, "rb") as devnull:
+        os.dup2(devnull.fileno(), sys.stdin.fileno())
+    with open(log_path, "ab", buffering=0) as log:
+        os.dup2(log.fileno(), sys.stdout.fileno())
+        os.dup2(log.fileno(), sys.stderr.fileno())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="无界面的专注时钟（仅需标准库）")
+    parser.add_argument("--min", type=int, default=3, help="最小工作间隔(分钟)")
+    parser.add_argument("--max", type=int, default=5, help="最大工作间隔(分钟)")
+    parser.add_argument("--short-break", type=int, default=10, help="短休息(秒)")
+    parser.add_argument("--long-break", type=int, default=20, help="长休息(分钟)")
+    parser.add_argument("--total", type=int, default=90, help="总工作时间(分钟)")
+    parser.add_argument("--seed", type=int, default=None, help="随机种子，用于复现某次会话")
+    parser.add_argument("--suspend-policy", choices=SUSPEND_POLICIES, default=SUSPEND_PAUSE,
+                        help="检测到系统休眠时被打断阶段的处理方式")
+    parser.add_argument("--notify", default="stdout,bell",
+                        help="逗号分隔的通知方式: bell, stdout, socket")
+    parser.add_argument("--socket", default=None,
+                        help="socket 通知方式的地址（Unix 套接字路径或 127.0.0.1:端口，"
+                             "默认为用户数据目录下的 headless.sock）")
+    parser.add_argument("--repeat", action="store_true", help="会话结束后立即开始下一个会话")
+    parser.add_argument("--daemon", action="store_true", help="在后台运行（仅 POSIX）")
+    parser.add_argument("--no-history", action="store_true", help="不记录会话历史")
+    parser.add_argument(instrumentation.INSTRUMENT_FLAG, action="store_true",
+                        help="采集性能数据，退出时（或收到 SIGUSR1 时）导出为 JSON")
+    parser.add_argument("--metrics", nargs="?", const="", default=None, metavar="ADDRESS",
+                        help="导出 Prometheus 指标（127.0.0.1:端口 或 Unix 套接字路径，默认 127.0.0.1:9464）")
+    args = parser.parse_args(argv)
+
+    engine = SessionEngine(suspend_policy=args.suspend_policy)
+    try:
+        engine.configure(args.min, args.max, args.short_break, args.long_break, args.total, seed=args.seed)
+    except ValueError:
+        parser.error("--min 不能大于 --max")
+
+    # 解析完参数再确定默认地址（--help 不创建数据目录）；daemonize() 会切换到根目录，
+    # 相对的套接字路径要在这之前转为绝对路径
+    if args.socket is None:
+        args.socket = os.path.join(user_data_dir(), "headless.sock")
+    elif not _is_tcp_address(args.socket):
+        args.socket = os.path.abspath(args.socket)
+    metrics_address = None
+    if args.metrics is not None or os.environ.get("FOCUS_TIMER_METRICS"):
+        import metrics  # 只在启用时导入
+        metrics_address = metrics.requested_address([] if args.metrics is None else [f"--metrics={args.metrics}"])
+        if not _is_tcp_address(metrics_address):
+            metrics_address = os.path.abspath(metrics_address)
+
+    if args.daemon:
+        if not hasattr(os, "fork"):
+            parser.error("--daemon 仅支持 POSIX 系统")
+        daemonize(os.path.join(user_data_dir(), DAEMON_LOG_FILE_NAME))
+    # 采样线程要在 fork 之后启动
+    recorder = instrumentation.install_if_requested([instrumentation.INSTRUMENT_FLAG] if args.instrument else [])
+    exporter = None
+    if metrics_address is not None:
+        exporter = metrics.start_if_requested([f"--metrics={metrics_address}"])
+        if exporter is not None:
+            exporter.attach(engine)
+
+    sinks = []
+    for name in filter(None, (n.strip() for n in args.notify.split(","))):
+        if name == "bell":
+            sinks.append(BellSink())
+        elif name == "stdout":
+            sinks.append(StdoutSink(engine))
+        elif name == "socket":
+            sinks.append(SocketSink(args.socket))
+        else:
+            parser.error(f"未知的通知方式: {name}")
+    engine.listeners.extend(sinks)
+
+    history = None
+    if not args.no_history:
+        history = HistoryStore(os.path.join(user_data_dir(), HISTORY_FILE_NAME))
+        engine.listeners.append(HistoryRecorder(history))
+
+    # 计时在后台线程中进行，主线程只等待。信号处理函数只设置标志，由主循环停止会话或导出数据：
+    # 处理函数在主线程中执行，而主线程可能正持有引擎的锁（例如 --repeat 时正在开始下一个会话）
+    stopping = threading.Event()
+    dump_requested = threading.Event()
+
+    signal.signal(signal.SIGINT, lambda signum, frame: stopping.set())
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopping.set())
+    if recorder is not None and hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, lambda signum, frame: dump_requested.set())
+
+    try:
+        while not stopping.is_set():
+            engine.start()
+            while engine.timer_thread.is_alive() and not stopping.is_set():
+                engine.join(0.5)
+                if dump_requested.is_set():
+                    dump_requested.clear()
+                    print(f"性能数据已保存到 {recorder.dump()}")
+            if not args.repeat:
+                break
+    finally:
+        engine.stop()
+        engine.join(1.0)
+        if history is not None:
+            history.close()
+        for sink in sinks:
+            if hasattr(sink, "close"):
+                sink.close()
+        if exporter is not None:
+            exporter.close()
+        if recorder is not None:
+            print(f"性能数据已保存到 {recorder.dump()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
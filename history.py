@@ -0,0 +1,213 @@
+"""会话历史记录
+
+每个阶段结束时（正常完成或被停止）记录一条数据，保存在用户数据目录下的
+SQLite 数据库中（WAL 模式）。写入由后台线程批量完成，计时线程和界面线程
+只把记录放入内存队列，不会被磁盘 I/O 阻塞。启动时不读取历史数据，
+数据库在第一次写入时才打开，历史再多也不影响启动速度。
+"""
+import sqlite3
+import threading
+import time
+
+HISTORY_FILE_NAME = "history.sqlite3"
+
+SCHEMA_VERSION = 2
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,          -- 会话开始时间（毫秒时间戳）
+    started_at REAL NOT NULL,
+    seed INTEGER,                    -- SessionSchedule 的随机种子，可用于复现
+    planned_s INTEGER NOT NULL,
+    finished INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS intervals (
+    id INTEGER PRIMARY KEY,
+    session_id INTEGER NOT NULL,
+    phase TEXT NOT NULL,             -- timer_engine.PHASE_*
+    started_at REAL NOT NULL,
+    planned_s INTEGER NOT NULL,
+    elapsed_s REAL NOT NULL,
+    completed INTEGER NOT NULL       -- 0 表示阶段被停止（跳过）
+);
+CREATE INDEX IF NOT EXISTS intervals_started_at ON intervals (started_at);
+"""
+
+# 按天汇总的统计表，由触发器在插入 intervals 时同步更新，统计界面只需读取这张小表。
+# day 为本地日期的序数（与 datetime.date.toordinal() 相同）
+ROLLUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS daily_totals (
+    day INTEGER NOT NULL,
+    phase TEXT NOT NULL,
+    intervals INTEGER NOT NULL,
+    completed INTEGER NOT NULL,
+    seconds REAL NOT NULL,
+    PRIMARY KEY (day, phase)
+) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS intervals_rollup AFTER INSERT ON intervals BEGIN
+    INSERT INTO daily_totals (day, phase, intervals, completed, seconds)
+    VALUES (CAST(julianday(NEW.started_at, 'unixepoch', 'localtime') - 1721424.5 AS INTEGER),
+            NEW.phase, 1, NEW.completed, NEW.elapsed_s)
+    ON CONFLICT (day, phase) DO UPDATE SET
+        intervals = intervals + 1,
+        completed = completed + excluded.completed,
+        seconds = seconds + excluded.seconds;
+END;
+"""
+# 从 1 版升级时根据已有记录一次性生成汇总
+ROLLUP_BACKFILL = """
+INSERT OR REPLACE INTO daily_totals (day, phase, intervals, completed, seconds)
+SELECT CAST(julianday(started_at, 'unixepoch', 'localtime') - 1721424.5 AS INTEGER) AS day,
+       phase, COUNT(*), SUM(completed), SUM(elapsed_s)
+FROM intervals GROUP BY day, phase
+"""
+
+
+def _statements(script):
+    """把 SQL 脚本拆成单条语句（触发器体内的分号不拆开）"""
+    statement = ""
+    for part in script.split(";"):
+        statement += part + ";"
+        if sqlite3.complete_statement(statement):
+            if statement.strip(" \n;"):
+                yield statement
+            statement = ""
+
+
+class HistoryStore:
+    """批量写入的历史数据库
+
+    add_session / finish_session / add_interval 只把语句放入队列后立即返回，
+    写入线程每 FLUSH_INTERVAL_S 秒或积累 BATCH_SIZE 条后在一个事务中写入。
+    """
+    FLUSH_INTERVAL_S = 5.0
+    BATCH_SIZE = 64
+
+    def __init__(self, path):
+        self.path = path
+        self.written = 0  # 已写入的语句数
+        self._pending = []
+        self._cond = threading.Condition()
+        self._thread = None
+        self._closed = False
+
+    def add_session(self, session_id, started_at, seed, planned_s):
+        self._post("INSERT OR REPLACE INTO sessions (id, started_at, seed, planned_s) VALUES (?, ?, ?, ?)",
+                   (session_id, started_at, seed, planned_s))
+
+    def finish_session(self, session_id):
+        self._post("UPDATE sessions SET finished = 1 WHERE id = ?", (session_id,))
+
+    def add_interval(self, session_id, phase, started_at, planned_s, elapsed_s, completed):
+        self._post("INSERT INTO intervals (session_id, phase, started_at, planned_s, elapsed_s, completed) "
+                   "VALUES (?, ?, ?, ?, ?, ?)",
+                   (session_id, phase, started_at, planned_s, elapsed_s, int(completed)))
+
+    def _post(self, sql, params):
+        with self._cond:
+            if self._closed:
+                print("历史记录已关闭，丢弃一条记录")
+                return
+            self._pending.append((sql, params))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+                self._thread.start()
+            if len(self._pending) >= self.BATCH_SIZE:
+                self._cond.notify()
+
+    def close(self, timeout=2.0):
+        """写入队列中剩余的记录并结束写入线程（退出程序前调用）"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def connect(self):
+        """打开数据库并确保表结构存在（也供统计等只读查询使用）"""
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")  # WAL 模式下足以保证不损坏数据库
+        if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            try:
+                self._migrate(conn)
+            except Exception:
+                conn.close()
+                raise
+        return conn
+
+    def _migrate(self, conn):
+        """在一个写事务中建表、生成汇总并更新版本号，出错时全部回滚
+
+        executescript 会先隐式提交，所以逐条执行；BEGIN IMMEDIATE 先取得写锁，
+        再读一次版本号，两个进程同时启动时只有一个执行升级。
+        """
+        conn.isolation_level = None  # 由下面的 BEGIN / COMMIT 控制事务
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                version = conn.execute("PRAGMA user_version").fetchone()[0]
+                if version < SCHEMA_VERSION:
+                    for statement in _statements(SCHEMA + ROLLUP_SCHEMA):
+                        conn.execute(statement)
+                    if version == 1:
+                        conn.execute(ROLLUP_BACKFILL)
+                    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.isolation_level = ""
+
+    def _run(self):
+        conn = None
+        while True:
+            with self._cond:
+                if not self._closed and len(self._pending) < self.BATCH_SIZE:
+                    self._cond.wait(self.FLUSH_INTERVAL_S)
+                batch, self._pending = self._pending, []
+                closed = self._closed
+            if batch:
+                try:
+                    if conn is None:
+                        conn = self.connect()
+                    with conn:
+                        for sql, params in batch:
+                            conn.execute(sql, params)
+                    self.written += len(batch)
+                except Exception as e:
+                    print(f"写入历史记录失败 {self.path}: {e}")
+            if closed:
+                break
+        if conn is not None:
+            conn.close()
+
+
+class HistoryRecorder:
+    """SessionEngine 的监听器，把会话和每个阶段的结果交给 HistoryStore
+
+    回调在计时线程中执行，只做内存操作。
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.session_id = None
+        self._phase_started_at = 0.0
+
+    def on_session_started(self, schedule):
+        started_at = time.time()
+        self.session_id = int(started_at * 1000)
+        self.store.add_session(self.session_id, started_at, schedule.seed, schedule.total_s)
+
+    def on_phase_started(self, phase, phase_total_s):
+        self._phase_started_at = time.time()
+
+    def on_phase_finished(self, phase, phase_total_s, elapsed_s, completed):
+        if self.session_id is not None:
+            self.store.add_interval(self.session_id, phase, self._phase_started_at,
+                                    phase_total_s, elapsed_s, completed)
+
+    def on_session_finished(self):
+        if self.session_id is not None:
+            self.store.finish_session(self.session_id)
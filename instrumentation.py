@@ -0,0 +1,241 @@
+"""可选的运行时性能采集
+
+命令行带 --instrument 或设置环境变量 FOCUS_TIMER_INSTRUMENT=1 时启用，
+否则什么都不做，对运行没有任何影响。启用后：
+- 为引擎回调、倒计时步进、声音播放、进度条重绘和界面刷新槽函数记录耗时直方图
+  （调用次数即重绘次数/信号投递次数）；
+- 后台线程每秒采样一次进程 CPU 时间、常驻内存（仅 Linux/Windows）和各钩子每秒的调用次数，
+  保存在固定长度的环形缓冲区中；
+- dump() 把以上数据写成 JSON（图形界面通过托盘菜单导出）。
+"""
+import collections
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+INSTRUMENT_FLAG = "--instrument"
+INSTRUMENT_ENV = "FOCUS_TIMER_INSTRUMENT"
+
+SAMPLE_INTERVAL_S = 1.0
+SAMPLE_CAPACITY = 3600  # 环形缓冲区保留最近一小时的采样
+HISTOGRAM_BUCKETS = 32  # 第 i 个桶为 [2^i, 2^(i+1)) 微秒
+
+_recorder = None
+
+
+def instrumentation_requested(argv):
+    return INSTRUMENT_FLAG in argv or os.environ.get(INSTRUMENT_ENV) == "1"
+
+
+def enabled():
+    return _recorder is not None
+
+
+def recorder():
+    return _recorder
+
+
+class LatencyHistogram:
+    """按 2 的幂分桶的耗时直方图（微秒）"""
+
+    def __init__(self):
+        self.buckets = [0] * HISTOGRAM_BUCKETS
+        self.count = 0
+        self.total_us = 0.0
+        self.max_us = 0.0
+
+    def add(self, elapsed_us):
+        self.buckets[min(HISTOGRAM_BUCKETS - 1, max(0, int(elapsed_us)).bit_length())] += 1
+        self.count += 1
+        self.total_us += elapsed_us
+        self.max_us = max(self.max_us, elapsed_us)
+
+    def percentile_us(self, fraction):
+        """返回该分位数所在桶的上界"""
+        target = fraction * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if n and seen >= target:
+                return float(2 ** i)
+        return 0.0
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "mean_us": self.total_us / self.count if self.count else 0.0,
+            "p50_us": self.percentile_us(0.5),
+            "p99_us": self.percentile_us(0.99),
+            "max_us": self.max_us,
+            "buckets_us": {str(2 ** i): n for i, n in enumerate(self.buckets) if n},
+        }
+
+
+def current_rss_kb():
+    """当前常驻内存(KB)，无法获取时返回 None
+
+    只支持 Linux 和 Windows。getrusage 的 ru_maxrss 是峰值（macOS 上单位还是字节），
+    不能当作当前值，其他平台返回 None。
+    """
+    try:
+        if sys.platform.startswith("linux"):
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+        if sys.platform.startswith("win"):
+            import ctypes
+            from ctypes import wintypes
+
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+                    (name, ctypes.c_size_t) for name in (
+                        "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage",
+                        "QuotaPagedPoolUsage", "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage",
+                        "PagefileUsage", "PeakPagefileUsage")]
+
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            handle = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+                return counters.WorkingSetSize // 1024
+        return None
+    except Exception:
+        return None
+
+
+class Recorder:
+    """耗时直方图、计数和周期采样"""
+
+    def __init__(self, sample_capacity=SAMPLE_CAPACITY):
+        self.started_at = time.time()
+        self.histograms = collections.defaultdict(LatencyHistogram)
+        self.counters = collections.Counter()
+        self.samples = collections.deque(maxlen=sample_capacity)
+        self._lock = threading.Lock()
+        self._last_counts = {}
+        self._last_sample_ts = time.monotonic()
+        self._sampler = None
+
+    def record(self, name, elapsed_s):
+        with self._lock:
+            self.histograms[name].add(elapsed_s * 1e6)
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def timed(self, name, func):
+        """返回记录每次调用耗时的 func 包装"""
+        perf_counter = time.perf_counter
+
+        # 不复制 __dict__：带 pyqtSlot 签名的函数会被 PyQt 按元对象中原来的槽调用，绕过包装
+        @functools.wraps(func, updated=())
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(name, perf_counter() - start)
+        return wrapper
+
+    def sample(self):
+        """记录一次 CPU、内存和各钩子每秒调用次数"""
+        now = time.monotonic()
+        with self._lock:
+            counts = {name: h.count for name, h in self.histograms.items()}
+            counts.update(self.counters)
+            interval_s = max(now - self._last_sample_ts, 1e-9)
+            rates = {name: (n - self._last_counts.get(name, 0)) / interval_s
+                     for name, n in counts.items() if n != self._last_counts.get(name, 0)}
+            self._last_counts = counts
+            self._last_sample_ts = now
+            sample = {
+                "time": time.time(),
+                "cpu_s": time.process_time(),
+                "threads": threading.active_count(),
+                "per_second": rates,
+            }
+            rss_kb = current_rss_kb()
+            if rss_kb is not None:
+                sample["rss_kb"] = rss_kb
+            self.samples.append(sample)
+
+    def start_sampler(self, interval_s=SAMPLE_INTERVAL_S):
+        if self._sampler is not None:
+            return
+
+        def run():
+            while True:
+                time.sleep(interval_s)
+                self.sample()
+
+        self._sampler = threading.Thread(target=run, name="instrumentation-sampler", daemon=True)
+        self._sampler.start()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "started_at": self.started_at,
+                "uptime_s": time.time() - self.started_at,
+                "histograms": {name: h.to_dict() for name, h in sorted(self.histograms.items())},
+                "counters": dict(self.counters),
+                "samples": list(self.samples),
+            }
+
+    def dump(self, path=None):
+        """把当前数据写成 JSON，返回文件路径"""
+        if path is None:
+            from app_paths import user_data_dir
+            path = os.path.join(user_data_dir(), time.strftime("instrumentation-%Y%m%d-%H%M%S.json"))
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=1)
+        return path
+
+
+def _wrap(cls, method_name, hist_name):
+    setattr(cls, method_name, _recorder.timed(hist_name, getattr(cls, method_name)))
+
+
+def _instrument_notify(engine_class):
+    """把引擎的每个监听器回调分别计时，名称为 “监听器类名.回调名”"""
+    perf_counter = time.perf_counter
+
+    def _notify(self, name, *args):
+        for listener in self.listeners:
+            callback = getattr(listener, name, None)
+            if callback is not None:
+                start = perf_counter()
+                callback(*args)
+                _recorder.record(f"{type(listener).__name__}.{name}", perf_counter() - start)
+
+    engine_class._notify = _notify
+
+
+def install_if_requested(argv=None, window_class=None):
+    """按命令行/环境变量启用采集，返回 Recorder（未启用时返回 None）
+
+    需在创建窗口之前调用：为已导入模块中的相关类和 window_class 的
+    update_ui_elements / update_progress 安装计时包装。
+    """
+    global _recorder
+    argv = sys.argv if argv is None else argv
+    if _recorder is not None or not instrumentation_requested(argv):
+        return _recorder
+    _recorder = Recorder()
+
+    import timer_engine
+    _instrument_notify(timer_engine.SessionEngine)
+    _wrap(timer_engine.DeadlineTicker, "step", "ticker.step")
+    # 以下模块只在已被导入时才安装（无界面模式下不会导入 Qt 和音频模块）
+    if "audio" in sys.modules:
+        _wrap(sys.modules["audio"].AudioWorker, "_execute", "audio.execute")
+    if "circular_progress" in sys.modules:
+        _wrap(sys.modules["circular_progress"].CircularProgressBar, "paintEvent", "progress.paintEvent")
+    if window_class is not None:
+        for name in ("update_ui_elements", "update_progress"):
+            _wrap(window_class, name, f"window.{name}")
+
+    _recorder.start_sampler()
+    return _recorder
@@ -0,0 +1,214 @@
+"""可选的 Prometheus 指标导出
+
+命令行带 --metrics [地址] 或设置环境变量 FOCUS_TIMER_METRICS=地址 时启用，
+地址为 "127.0.0.1:端口"（默认 127.0.0.1:9464）或 Unix 套接字路径：
+    curl http://127.0.0.1:9464/metrics
+    curl --unix-socket /tmp/focus-metrics.sock http://localhost/metrics
+
+导出当前阶段、剩余时间、刷新/重绘/提示音/休眠计数以及进程 CPU、内存和线程数。
+应答在后台线程中生成，只读取引擎状态快照和本模块自己的计数，从不访问 Qt 对象。
+图形界面和无界面模式都只在启用时才导入本模块。
+"""
+import os
+import socket
+import sys
+import threading
+import time
+
+from instrumentation import current_rss_kb
+from timer_engine import PHASE_IDLE, PHASE_LONG_BREAK, PHASE_SHORT_BREAK, PHASE_WORKING
+
+METRICS_FLAG = "--metrics"
+METRICS_ENV = "FOCUS_TIMER_METRICS"
+DEFAULT_ADDRESS = "127.0.0.1:9464"
+
+PHASE_LABELS = {
+    PHASE_IDLE: "idle",
+    PHASE_WORKING: "working",
+    PHASE_SHORT_BREAK: "short_break",
+    PHASE_LONG_BREAK: "long_break",
+}
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+REQUEST_TIMEOUT_S = 2.0
+
+_exporter = None
+
+
+def requested_address(argv):
+    """--metrics [地址] / --metrics=地址 / FOCUS_TIMER_METRICS，未启用时返回 None"""
+    for i, arg in enumerate(argv):
+        if arg.startswith(METRICS_FLAG + "="):
+            return arg.split("=", 1)[1] or DEFAULT_ADDRESS
+        if arg == METRICS_FLAG:
+            if i + 1 < len(argv) and not argv[i + 1].startswith("-"):
+                return argv[i + 1]
+            return DEFAULT_ADDRESS
+    value = os.environ.get(METRICS_ENV)
+    if not value:
+        return None
+    return DEFAULT_ADDRESS if value == "1" else value
+
+
+def _bind(address):
+    if ":" in address and not address.startswith("/"):
+        host, port = address.rsplit(":", 1)
+        server = socket.create_server((host, int(port)))
+    else:
+        if os.path.exists(address):
+            os.remove(address)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(address)
+        server.listen(4)
+    return server
+
+
+class MetricsExporter:
+    """引擎监听器 + 极简 HTTP 服务，只应答 GET /metrics
+
+    回调里只做整数自增和引用赋值，开销可以忽略。
+    """
+
+    def __init__(self, address):
+        self.address = address
+        self.engine = None
+        self.ticks = 0
+        self.repaints = None  # 没有进度条（无界面模式）时不导出
+        self.cues = 0
+        self.suspends = 0
+        self.sessions = 0
+        self.phases_completed = dict.fromkeys(PHASE_LABELS, 0)
+        self.phases_skipped = dict.fromkeys(PHASE_LABELS, 0)
+        self._last_tick = None
+        self._server = _bind(address)
+        threading.Thread(target=self._serve, name="metrics-exporter", daemon=True).start()
+
+    def attach(self, engine):
+        self.engine = engine
+        engine.listeners.append(self)
+
+    def count_repaint(self):
+        self.repaints = (self.repaints or 0) + 1
+
+    # --- 引擎回调（在引擎线程或 GUI 线程中执行） ---
+    def on_session_started(self, schedule):
+        self.sessions += 1
+        self._last_tick = None
+
+    def on_tick(self, event):
+        self.ticks += 1
+        self._last_tick = event
+
+    def on_phase_finished(self, phase, phase_total_s, elapsed_s, completed):
+        counts = self.phases_completed if completed else self.phases_skipped
+        counts[phase] += 1
+
+    def on_cue(self, cue):
+        self.cues += 1
+
+    def on_suspend_detected(self, suspended_s, shift_s):
+        self.suspends += 1
+
+    # --- 导出 ---
+    def render(self):
+        """生成 Prometheus 文本格式的指标"""
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{labels} {value}")
+
+        if self.engine is not None:
+            is_running, phase, remaining_s = self.engine.state()
+        else:
+            is_running, phase, remaining_s = False, PHASE_IDLE, 0
+        if not is_running:
+            phase = PHASE_IDLE
+        last_tick = self._last_tick
+        session_remaining_s = last_tick.overall_remaining_s if is_running and last_tick is not None else 0
+
+        metric("focus_timer_phase", "gauge", "Current phase (1 for the active phase).",
+               [(f'{{phase="{label}"}}', int(p == phase)) for p, label in PHASE_LABELS.items()])
+        metric("focus_timer_phase_remaining_seconds", "gauge", "Seconds left in the current phase.",
+               [("", remaining_s if is_running else 0)])
+        metric("focus_timer_session_remaining_seconds", "gauge", "Seconds left until the long break starts.",
+               [("", session_remaining_s)])
+        metric("focus_timer_sessions_total", "counter", "Sessions started.", [("", self.sessions)])
+        metric("focus_timer_phases_total", "counter", "Phases finished, by phase and outcome.",
+               [(f'{{phase="{PHASE_LABELS[p]}",outcome="completed"}}', n)
+                for p, n in self.phases_completed.items() if p != PHASE_IDLE] +
+               [(f'{{phase="{PHASE_LABELS[p]}",outcome="stopped"}}', n)
+                for p, n in self.phases_skipped.items() if p != PHASE_IDLE])
+        metric("focus_timer_ticks_total", "counter", "Countdown display updates emitted by the engine.",
+               [("", self.ticks)])
+        if self.repaints is not None:
+            metric("focus_timer_repaints_total", "counter", "Progress ring repaints.", [("", self.repaints)])
+        metric("focus_timer_cues_total", "counter", "Sound cues played.", [("", self.cues)])
+        metric("focus_timer_suspends_total", "counter", "System suspends detected during a session.",
+               [("", self.suspends)])
+        metric("process_cpu_seconds_total", "counter", "Total user and system CPU time spent in seconds.",
+               [("", round(time.process_time(), 3))])
+        rss_kb = current_rss_kb()
+        if rss_kb is not None:
+            metric("process_resident_memory_bytes", "gauge", "Resident memory size in bytes.",
+                   [("", rss_kb * 1024)])
+        metric("process_threads", "gauge", "Python threads in the process.",
+               [("", threading.active_count())])
+        return "\n".join(lines) + "\n"
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return  # close() 关闭了监听套接字
+            with conn:
+                try:
+                    conn.settimeout(REQUEST_TIMEOUT_S)
+                    request_line = conn.recv(1024).split(b"\r\n", 1)[0].split()
+                    if len(request_line) >= 2 and request_line[0] == b"GET" and \
+                            request_line[1].split(b"?")[0] in (b"/metrics", b"/"):
+                        status, body = "200 OK", self.render().encode()
+                    else:
+                        status, body = "404 Not Found", b"not found\n"
+                    conn.sendall(f"HTTP/1.0 {status}\r\nContent-Type: {CONTENT_TYPE}\r\n"
+                                 f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+                except Exception as e:
+                    print(f"处理指标请求失败: {e}")
+
+    def close(self):
+        self._server.close()
+        if not (":" in self.address and not self.address.startswith("/")):
+            try:
+                os.remove(self.address)
+            except OSError:
+                pass
+
+
+def start_if_requested(argv=None):
+    """按命令行/环境变量启动指标服务，返回 MetricsExporter（未启用或启动失败时返回 None）"""
+    global _exporter
+    argv = sys.argv if argv is None else argv
+    if _exporter is not None:
+        return _exporter
+    address = requested_address(argv)
+    if address is None:
+        return None
+    try:
+        _exporter = MetricsExporter(address)
+    except (OSError, ValueError) as e:
+        print(f"无法启动指标服务 {address}: {e}")
+        return None
+    # 进度条已导入（图形界面）时统计重绘次数
+    if "circular_progress" in sys.modules:
+        progress_class = sys.modules["circular_progress"].CircularProgressBar
+        paint_event = progress_class.paintEvent
+
+        def counted_paint_event(self, event):
+            _exporter.count_repaint()
+            return paint_event(self, event)
+
+        progress_class.paintEvent = counted_paint_event
+        _exporter.repaints = 0
+    return _exporter
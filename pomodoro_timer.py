@@ -1,90 +1,37 @@
 import sys
-import random
-import time
-import os # Keep os for icon path check
-import math
-from datetime import datetime, timedelta
-import threading
+import os
+import startup_profile
+startup_profile.install_if_requested() # Must run before the PyQt5 imports to time them
+import single_instance
+single_instance.ensure_single_instance(sys.argv) # Forwards to a running instance and exits before loading Qt
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                             QHBoxLayout, QLabel, QPushButton, QSpinBox,
                             QSystemTrayIcon, QMenu, QAction, QMessageBox,
-                            QGridLayout, QSizePolicy, QGroupBox, QFormLayout,
-                            QStyle) # QStyle needed for fallback icon
-from PyQt5.QtCore import Qt, QTimer, pyqtSignal, pyqtSlot, QEvent, QSize, QRectF
-from PyQt5.QtGui import QIcon, QFont, QPainter, QPen, QColor, QBrush
-import pygame
-
-class CircularProgressBar(QWidget):
-    """自定义圆形进度条控件"""
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.setMinimumSize(220, 220)
-        self.percentage = 0
-        self.text = "00:00"
-        self.total_text = "总剩余: 00:00:00"
-
-    def setPercentage(self, value):
-        self.percentage = value
-        self.update()
-
-    def setText(self, text):
-        self.text = text
-        self.update()
-
-    def setTotalText(self, text):
-        self.total_text = text
-        self.update()
-
-    def paintEvent(self, event):
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
-        width = self.width()
-        height = self.height()
-        size = min(width, height) - 10
-        rect = QRectF((width - size) / 2, (height - size) / 2, size, size)
-        painter.setPen(QPen(QColor(200, 200, 200), 10))
-        painter.drawEllipse(rect)
-        if self.percentage > 0:
-            painter.setPen(QPen(QColor(76, 175, 80), 10))
-            start_angle = 90 * 16
-            span_angle = -self.percentage * 360 * 16 / 100
-            painter.drawArc(rect, start_angle, span_angle)
-        painter.save()
-        painter.translate(width / 2, height / 2)
-        radius = size / 2 - 5
-        for i in range(60):
-            if i % 5 == 0:
-                painter.setPen(QPen(QColor(50, 50, 50), 2))
-                outer_len = radius
-                inner_len = radius - 10
-            else:
-                painter.setPen(QPen(QColor(150, 150, 150), 1))
-                outer_len = radius
-                inner_len = radius - 5
-            angle = i * 6
-            x1 = inner_len * math.sin(math.radians(angle))
-            y1 = -inner_len * math.cos(math.radians(angle))
-            x2 = outer_len * math.sin(math.radians(angle))
-            y2 = -outer_len * math.cos(math.radians(angle))
-            painter.drawLine(int(x1), int(y1), int(x2), int(y2))
-        painter.restore()
-        painter.setPen(QColor(10, 10, 10))
-        font = QFont("Arial", 28, QFont.Bold)
-        painter.setFont(font)
-        painter.drawText(rect, Qt.AlignCenter, self.text)
-        font = QFont("Arial", 13, QFont.Bold)
-        painter.setFont(font)
-        total_rect = QRectF(
-            rect.left(),
-            rect.top() + rect.height() * 0.66,
-            rect.width(),
-            rect.height() * 0.2
-        )
-        painter.drawText(total_rect, Qt.AlignCenter, self.total_text)
-
+                            QSizePolicy, QGroupBox, QFormLayout)
+from PyQt5.QtCore import QEvent, Qt, QTimer, pyqtSignal, pyqtSlot
+from PyQt5.QtGui import QFont
+from app_paths import user_data_dir
+from assets import shared_assets
+from audio import AudioWorker, SoundBank
+from circular_progress import CircularProgressBar
+from fast_start import DeferredWindowLauncher, fast_start_requested
+from history import HISTORY_FILE_NAME, HistoryRecorder, HistoryStore
+import instrumentation
+from qt_engine import create_engine
+import timer_engine
+from timer_engine import format_clock, format_time_of_day, format_total_seconds
+from tray_progress import TrayProgressAtlas
 
 class PomodoroTimer(QMainWindow):
     update_signal = pyqtSignal(str)
+    tick_signal = pyqtSignal(object) # Carries a timer_engine.TickEvent
+    # The engine thread only emits signals; the queued connections run every Qt call on the GUI thread
+    tray_message_signal = pyqtSignal(str, str) # title, message
+    session_finished_signal = pyqtSignal()
+    tray_frame_signal = pyqtSignal(int) # Index into TrayProgressAtlas; only sent when the frame changes
+    schedule_signal = pyqtSignal(str) # Upcoming break times; only sent when a phase starts or after a suspend
+
+    metrics_exporter = None # Set by main() when started with --metrics
 
     # --- UI Text Constants (Copied from windows version) ---
     APP_NAME = "专注时钟"
@@ -101,6 +48,9 @@ class PomodoroTimer(QMainWindow):
     STOP_BUTTON_TEXT = "停止"
     TRAY_SHOW_ACTION_TEXT = "打开" # Changed from "显示"
     TRAY_QUIT_ACTION_TEXT = "退出"
+    TRAY_STATS_ACTION_TEXT = "统计"
+    TRAY_DUMP_INSTRUMENTATION_TEXT = "导出性能数据"
+    INSTRUMENTATION_DUMPED_TEXT = "性能数据已保存到 {path}"
     QUIT_CONFIRM_TITLE = '退出确认'
     QUIT_CONFIRM_MESSAGE = '确定要退出应用程序吗？\n\n如果您想保持程序在后台运行，请点击"取消"，\n程序将最小化到系统托盘。'
     MINIMIZED_TO_TRAY_TITLE = "专注时钟"
@@ -108,11 +58,11 @@ class PomodoroTimer(QMainWindow):
     SETTINGS_ERROR_TITLE = "设置错误"
     MIN_MAX_INTERVAL_ERROR_MESSAGE = "最小间隔不能大于最大间隔！"
 
-    # --- Timer Phases (Internal State) ---
-    PHASE_IDLE = "IDLE"
-    PHASE_WORKING = "WORKING"
-    PHASE_SHORT_BREAK = "SHORT_BREAK"
-    PHASE_LONG_BREAK = "LONG_BREAK"
+    # --- Timer Phases (Internal State, owned by timer_engine) ---
+    PHASE_IDLE = timer_engine.PHASE_IDLE
+    PHASE_WORKING = timer_engine.PHASE_WORKING
+    PHASE_SHORT_BREAK = timer_engine.PHASE_SHORT_BREAK
+    PHASE_LONG_BREAK = timer_engine.PHASE_LONG_BREAK
 
     # --- Display Texts for Phases ---
     DISPLAY_IDLE = "准备就绪"
@@ -123,63 +73,49 @@ class PomodoroTimer(QMainWindow):
     DISPLAY_STOPPED = "已停止"
     DISPLAY_PLEASE_REST_SECONDS = "请休息 {seconds} 秒"
     DISPLAY_LONG_BREAK_NOTICE = "{total_time_min}分钟已到！请起来活动并休息 {long_break_min} 分钟"
-
-
-    def __init__(self):
+    DISPLAY_NEXT_BREAK = "下次休息 {time}"
+    DISPLAY_LONG_BREAK_AT = "长休息 {time}"
+    PHASE_DISPLAY_TEXTS = {
+        PHASE_WORKING: DISPLAY_WORKING,
+        PHASE_SHORT_BREAK: DISPLAY_SHORT_BREAK,
+        PHASE_LONG_BREAK: DISPLAY_LONG_BREAK,
+    }
+
+    AUDIO_LOAD_DELAY_MS = 500 # Start loading sounds this long after the window is shown
+    SOUND_CACHE_DIR_NAME = "sound_cache" # Decoded PCM cache under the user data dir
+
+    def __init__(self, tray_icon=None):
         super().__init__()
-        pygame.mixer.init()
-        try:
-            # Direct path for non-Windows version, assumes sounds/icons folders are relative to script
-            self.ding_sound = pygame.mixer.Sound("sounds/ding.mp3")
-            self.break_sound = pygame.mixer.Sound("sounds/break.mp3")
-        except Exception as e:
-            print(f"声音文件加载失败: {e}")
-            self.ding_sound = None # No winsound fallback for generic version
-            self.break_sound = None
-
-        self.min_interval = 3
-        self.max_interval = 5
-        self.short_break_s = 10
-        self.long_break_m = 20
-        self.total_work_time_m = 90
-
-        self.is_running = False
-        self.timer_thread = None
-        self.remaining_time_s = 0
-        self.total_elapsed_s = 0
-        self.current_work_interval_s = 0
-
-        self.current_timer_phase = self.PHASE_IDLE
-
-        self.overall_start_time_ts = 0
-        self.total_target_seconds = 0
+        self.assets = shared_assets() # Icon and sound paths resolved once, icon decoded once
+        # Audio is initialized and decoded in the background once the window is up (see main()),
+        # and decoded PCM is cached on disk so later launches skip MP3 decoding.
+        self.sound_bank = SoundBank(self.assets.sound_sources(),
+                                    cache_dir=os.path.join(user_data_dir(), self.SOUND_CACHE_DIR_NAME))
+        self.audio = AudioWorker(self.sound_bank) # Plays cues off the timer thread; silent if not ready
+
+        # All scheduling state lives in the engine; this window only displays it.
+        # --qt-timer selects the single-threaded QTimer engine instead of the timer thread.
+        self.engine = create_engine(sys.argv)
+        self.engine.listeners.append(self)
+        # Phase results are queued in memory and written to SQLite in batches by a background thread
+        self.history = HistoryStore(os.path.join(user_data_dir(), HISTORY_FILE_NAME))
+        self.engine.listeners.append(HistoryRecorder(self.history))
+        if self.metrics_exporter is not None: # Only set when started with --metrics
+            self.metrics_exporter.attach(self.engine)
+        # Ticks are only forwarded while the window is visible and not minimized (see _update_tick_visibility);
+        # read by the timer thread, written on the GUI thread
+        self._ticks_visible = False
+        self.tray_atlas = None # Rendered on the first start, not at launch
+        self._tray_frame = None # Last frame sent by the timer thread
+        self._schedule_stale = True # Set by on_phase_started/on_suspend_detected, cleared by the next tick
 
         self.init_ui()
-        self.init_tray()
-
-    def _get_icon(self, icon_name="icons/clock.png"):
-        # Simplified for generic version, no resource_path
-        try:
-            if os.path.exists(icon_name):
-                return QIcon(icon_name)
-        except Exception as e:
-            print(f"加载图标失败 {icon_name}: {e}")
-        # Fallback to a standard Qt icon if custom one fails or not found
-        try:
-            return QApplication.style().standardIcon(QStyle.SP_ComputerIcon) 
-        except Exception:
-             return QIcon() # Empty icon as last resort
-
-    def format_total_seconds(self, total_seconds):
-        s = int(total_seconds)
-        m, s_rem = divmod(s, 60)
-        h, m_rem = divmod(m, 60)
-        return f"{h:02d}:{m_rem:02d}:{s_rem:02d}"
+        self.init_tray(tray_icon)
 
     def init_ui(self):
         self.setWindowTitle(self.APP_NAME)
         self.setMinimumSize(500, 450)
-        self.setWindowIcon(self._get_icon())
+        self.setWindowIcon(self.assets.icon())
 
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
@@ -195,8 +131,8 @@ class PomodoroTimer(QMainWindow):
         settings_group = QGroupBox(self.SETTINGS_GROUP_TITLE)
         settings_layout = QFormLayout(settings_group)
 
-        self.min_spinbox = QSpinBox(minimum=1, maximum=30, value=self.min_interval, minimumWidth=70)
-        self.max_spinbox = QSpinBox(minimum=1, maximum=30, value=self.max_interval, minimumWidth=70)
+        self.min_spinbox = QSpinBox(minimum=1, maximum=30, value=self.engine.min_interval, minimumWidth=70)
+        self.max_spinbox = QSpinBox(minimum=1, maximum=30, value=self.engine.max_interval, minimumWidth=70)
         interval_layout = QHBoxLayout()
         interval_layout.addWidget(self.min_spinbox)
         interval_layout.addWidget(QLabel(self.TO_LABEL))
@@ -205,21 +141,21 @@ class PomodoroTimer(QMainWindow):
         interval_layout.addStretch(1)
         settings_layout.addRow(self.WORK_INTERVAL_LABEL, interval_layout)
 
-        self.short_break_spinbox = QSpinBox(minimum=5, maximum=60, value=self.short_break_s, singleStep=5, minimumWidth=70)
+        self.short_break_spinbox = QSpinBox(minimum=5, maximum=60, value=self.engine.short_break_s, singleStep=5, minimumWidth=70)
         short_break_layout = QHBoxLayout()
         short_break_layout.addWidget(self.short_break_spinbox)
         short_break_layout.addWidget(QLabel(self.SECONDS_UNIT_LABEL))
         short_break_layout.addStretch(1)
         settings_layout.addRow(self.SHORT_BREAK_LABEL, short_break_layout)
         
-        self.long_break_spinbox = QSpinBox(minimum=5, maximum=60, value=self.long_break_m, singleStep=5, minimumWidth=70)
+        self.long_break_spinbox = QSpinBox(minimum=5, maximum=60, value=self.engine.long_break_m, singleStep=5, minimumWidth=70)
         long_break_layout = QHBoxLayout()
         long_break_layout.addWidget(self.long_break_spinbox)
         long_break_layout.addWidget(QLabel(self.MINUTES_UNIT_LABEL))
         long_break_layout.addStretch(1)
         settings_layout.addRow(self.LONG_BREAK_LABEL, long_break_layout)
 
-        self.total_time_spinbox = QSpinBox(minimum=10, maximum=240, value=self.total_work_time_m, singleStep=10, minimumWidth=70)
+        self.total_time_spinbox = QSpinBox(minimum=10, maximum=240, value=self.engine.total_work_time_m, singleStep=10, minimumWidth=70)
         total_time_layout = QHBoxLayout()
         total_time_layout.addWidget(self.total_time_spinbox)
         total_time_layout.addWidget(QLabel(self.MINUTES_UNIT_LABEL))
@@ -239,10 +175,14 @@ class PomodoroTimer(QMainWindow):
 
         self.progress_widget = CircularProgressBar()
         status_layout.addWidget(self.progress_widget, 1)
+
+        self.schedule_label = QLabel("") # Upcoming break times from the precomputed schedule
+        self.schedule_label.setAlignment(Qt.AlignCenter)
+        status_layout.addWidget(self.schedule_label)
         
-        initial_total_s = self.total_work_time_m * 60
+        initial_total_s = self.engine.total_work_time_m * 60
         self.progress_widget.setText("00:00")
-        self.progress_widget.setTotalText(f"总剩余: {self.format_total_seconds(initial_total_s)}")
+        self.progress_widget.setTotalText(f"总剩余: {format_total_seconds(initial_total_s)}")
 
         main_layout.addWidget(status_group)
 
@@ -256,6 +196,11 @@ class PomodoroTimer(QMainWindow):
         main_layout.addLayout(button_layout)
 
         self.update_signal.connect(self.update_ui_elements)
+        self.tick_signal.connect(self.update_progress)
+        self.tray_message_signal.connect(self.show_tray_message)
+        self.session_finished_signal.connect(self.stop_timer)
+        self.tray_frame_signal.connect(self.set_tray_progress)
+        self.schedule_signal.connect(self.update_schedule)
         self._set_input_widgets_enabled(True)
 
     def _set_input_widgets_enabled(self, enabled):
@@ -265,14 +210,20 @@ class PomodoroTimer(QMainWindow):
         self.long_break_spinbox.setEnabled(enabled)
         self.total_time_spinbox.setEnabled(enabled)
 
-    def init_tray(self):
-        self.tray_icon = QSystemTrayIcon(self)
-        self.tray_icon.setIcon(self._get_icon()) # Uses simplified _get_icon
+    def init_tray(self, tray_icon=None):
+        # In fast-start mode the tray icon already exists and is handed over to the window
+        self.tray_icon = tray_icon or QSystemTrayIcon(self)
+        self.tray_icon.setIcon(self.assets.icon()) # Same decoded icon as the window
         
         tray_menu = QMenu()
         show_action = QAction(self.TRAY_SHOW_ACTION_TEXT, self, triggered=self.show_window)
+        stats_action = QAction(self.TRAY_STATS_ACTION_TEXT, self, triggered=self.show_stats)
         quit_action = QAction(self.TRAY_QUIT_ACTION_TEXT, self, triggered=self.close_application)
         tray_menu.addAction(show_action)
+        tray_menu.addAction(stats_action)
+        if instrumentation.enabled():
+            tray_menu.addAction(QAction(self.TRAY_DUMP_INSTRUMENTATION_TEXT, self,
+                                        triggered=self.dump_instrumentation))
         tray_menu.addAction(quit_action)
         
         self.tray_icon.setContextMenu(tray_menu)
@@ -286,6 +237,58 @@ class PomodoroTimer(QMainWindow):
         self.activateWindow()
         self.raise_()
 
+    def show_stats(self):
+        from stats import load_summary # Imported on demand to keep startup lean
+        from stats_dialog import StatsDialog
+        try:
+            summary = load_summary(self.history)
+        except Exception as e:
+            print(f"读取统计数据失败: {e}")
+            return
+        self.stats_dialog = StatsDialog(summary, self)
+        self.stats_dialog.show()
+
+    def dump_instrumentation(self):
+        # Only reachable when started with --instrument (see instrumentation)
+        try:
+            path = instrumentation.recorder().dump()
+        except OSError as e:
+            print(f"导出性能数据失败: {e}")
+            return
+        self.show_tray_message(self.APP_NAME, self.INSTRUMENTATION_DUMPED_TEXT.format(path=path))
+
+    def handle_instance_command(self, command):
+        # Commands forwarded by a second launch (see single_instance)
+        if command == single_instance.CMD_SHOW:
+            self.show_window()
+        elif command == single_instance.CMD_START:
+            if not self.engine.state()[0]:
+                self.start_timer()
+        elif command == single_instance.CMD_STOP:
+            self.stop_timer()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._update_tick_visibility()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._update_tick_visibility()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.WindowStateChange:
+            self._update_tick_visibility()
+
+    def _update_tick_visibility(self):
+        visible = self.isVisible() and not self.isMinimized()
+        was_visible, self._ticks_visible = self._ticks_visible, visible
+        if visible and not was_visible:
+            # Rebuild the countdown display in one shot from the engine's current state
+            event = self.engine.current_tick()
+            if event is not None:
+                self.update_progress(event)
+
     def tray_icon_activated(self, reason):
         if reason == QSystemTrayIcon.DoubleClick:
             self.show_window()
@@ -309,167 +312,166 @@ class PomodoroTimer(QMainWindow):
 
     def close_application(self):
         self.stop_timer_logic()
+        self.engine.join(1.0) # Let the stopped phase reach the history queue
+        self.history.close()
         self.tray_icon.hide()
         QApplication.quit()
 
     def start_timer(self):
-        self.min_interval = self.min_spinbox.value()
-        self.max_interval = self.max_spinbox.value()
-        self.short_break_s = self.short_break_spinbox.value()
-        self.long_break_m = self.long_break_spinbox.value()
-        self.total_work_time_m = self.total_time_spinbox.value()
+        min_interval = self.min_spinbox.value()
+        max_interval = self.max_spinbox.value()
 
-        if self.min_interval > self.max_interval:
+        if min_interval > max_interval:
             QMessageBox.warning(self, self.SETTINGS_ERROR_TITLE, self.MIN_MAX_INTERVAL_ERROR_MESSAGE)
             return
 
+        self.engine.configure(min_interval, max_interval,
+                              self.short_break_spinbox.value(),
+                              self.long_break_spinbox.value(),
+                              self.total_time_spinbox.value())
+
         self._set_input_widgets_enabled(False)
         self.start_button.setEnabled(False)
         self.stop_button.setEnabled(True)
 
-        self.is_running = True
-        self.total_elapsed_s = 0
-        self.total_target_seconds = self.total_work_time_m * 60
-        self.overall_start_time_ts = time.time()
-        self.current_timer_phase = self.PHASE_WORKING
-
-        self.timer_thread = threading.Thread(target=self.timer_loop, daemon=True)
-        self.timer_thread.start()
+        self.sound_bank.load_async() # No-op if already loading
+        if self.tray_atlas is None:
+            self.tray_atlas = TrayProgressAtlas()
+        self._tray_frame = None
+        self.engine.start()
         self.update_signal.emit(self.DISPLAY_STARTED)
 
     def stop_timer_logic(self):
-        if self.is_running:
-            self.is_running = False
+        self.engine.stop()
 
     def stop_timer(self):
         self.stop_timer_logic()
         self._set_input_widgets_enabled(True)
         self.start_button.setEnabled(True)
         self.stop_button.setEnabled(False)
-        self.current_timer_phase = self.PHASE_IDLE
-        self.progress_widget.setText("00:00")
-        self.progress_widget.setPercentage(0)
         current_total_s_setting = self.total_time_spinbox.value() * 60
-        self.progress_widget.setTotalText(f"总剩余: {self.format_total_seconds(current_total_s_setting)}")
-        self.overall_start_time_ts = 0
-        self.total_target_seconds = 0
+        self.progress_widget.setValues(percentage=0, text="00:00",
+                                       total_text=f"总剩余: {format_total_seconds(current_total_s_setting)}")
+        self.tray_icon.setIcon(self.assets.icon())
         self.update_signal.emit(self.DISPLAY_STOPPED)
 
-    def _play_sound(self, sound_object): # Simpler play sound for generic version
-        if sound_object:
-            try:
-                sound_object.play()
-            except Exception as e:
-                print(f"播放声音失败: {e}")
-
-    def timer_loop(self):
-        while self.is_running and self.total_elapsed_s < self.total_work_time_m * 60:
-            self.current_timer_phase = self.PHASE_WORKING
-            self.current_work_interval_s = random.randint(self.min_interval * 60, self.max_interval * 60)
-            self.countdown(self.current_work_interval_s, self.DISPLAY_WORKING)
-            if not self.is_running: break
-            self._play_sound(self.ding_sound)
-
-            self.current_timer_phase = self.PHASE_SHORT_BREAK
-            self.update_signal.emit(self.DISPLAY_PLEASE_REST_SECONDS.format(seconds=self.short_break_s))
-            self.countdown(self.short_break_s, self.DISPLAY_SHORT_BREAK)
-            if not self.is_running: break
-            self._play_sound(self.ding_sound)
-
-            self.total_elapsed_s += self.current_work_interval_s + self.short_break_s
-
-        if self.is_running and self.total_elapsed_s >= self.total_work_time_m * 60:
-            self.current_timer_phase = self.PHASE_LONG_BREAK
-            self._play_sound(self.break_sound)
+    # --- SessionEngine callbacks (run on the timer thread, or the GUI thread with --qt-timer) ---
+    def on_phase_started(self, phase, phase_total_s):
+        self._schedule_stale = True
+        if phase == self.PHASE_SHORT_BREAK:
+            self.update_signal.emit(self.DISPLAY_PLEASE_REST_SECONDS.format(seconds=phase_total_s))
+        elif phase == self.PHASE_LONG_BREAK:
             long_break_msg = self.DISPLAY_LONG_BREAK_NOTICE.format(
-                total_time_min=self.total_work_time_m,
-                long_break_min=self.long_break_m
+                total_time_min=self.engine.total_work_time_m,
+                long_break_min=self.engine.long_break_m
             )
             self.update_signal.emit(long_break_msg)
-            self.tray_icon.showMessage("休息提醒", long_break_msg, QSystemTrayIcon.Information, 5000)
-            self.countdown(self.long_break_m * 60, self.DISPLAY_LONG_BREAK)
-            if self.is_running:
-                 self._play_sound(self.ding_sound)
-            
-        if self.is_running:
-            QTimer.singleShot(0, self.stop_timer)
-
-    def countdown(self, seconds, phase_display_text):
-        self.remaining_time_s = seconds
-        end_time_ts = time.time() + seconds
-        while self.is_running and time.time() < end_time_ts:
-            self.remaining_time_s = int(end_time_ts - time.time())
-            if self.remaining_time_s < 0: self.remaining_time_s = 0
-            mins, secs_rem = divmod(self.remaining_time_s, 60)
-            time_str = f"{mins:02d}:{secs_rem:02d}"
-            self.update_signal.emit(f"{phase_display_text}: {time_str}")
-            time.sleep(0.1)
-        if self.is_running and self.remaining_time_s <= 0:
-             mins, secs_rem = divmod(0, 60)
-             time_str = f"{mins:02d}:{secs_rem:02d}"
-             self.update_signal.emit(f"{phase_display_text}: {time_str}")
+            self.tray_message_signal.emit("休息提醒", long_break_msg)
+
+    def on_suspend_detected(self, suspended_s, shift_s):
+        self._schedule_stale = True # The shifted deadline moves the break times
+
+    def on_tick(self, event):
+        # Break times of day only change when a phase starts or a suspend shifts the deadline
+        if self._schedule_stale:
+            self._schedule_stale = False
+            self.schedule_signal.emit(self._schedule_text(event))
+        # The tray ring changes at most TrayProgressAtlas.STEPS times per phase, hidden or not
+        frame = TrayProgressAtlas.frame_index(event.phase, event.percentage)
+        if frame != self._tray_frame:
+            self._tray_frame = frame
+            self.tray_frame_signal.emit(frame)
+        if self._ticks_visible: # Nobody can see the countdown while hidden in the tray
+            self.tick_signal.emit(event)
+
+    def on_cue(self, cue):
+        self.audio.play(cue) # Never blocks the timer thread
+
+    def on_session_finished(self):
+        self.session_finished_signal.emit()
+
+    @pyqtSlot(str, str)
+    def show_tray_message(self, title, message):
+        self.tray_icon.showMessage(title, message, QSystemTrayIcon.Information, 5000)
+
+    @pyqtSlot(int)
+    def set_tray_progress(self, frame):
+        if self.engine.state()[0]: # Ignore a frame queued just before stop_timer restored the app icon
+            self.tray_icon.setIcon(self.tray_atlas.icon(frame))
+
+    @pyqtSlot(object)
+    def update_progress(self, event):
+        if not self.engine.state()[0]:
+            return # A tick queued just before stop_timer; keep the reset display
+        time_str = format_clock(event.remaining_s)
+        self.status_label.setText(f"{self.PHASE_DISPLAY_TEXTS[event.phase]}: {time_str}")
+        self.progress_widget.setValues(
+            percentage=event.percentage,
+            text=time_str,
+            total_text=f"总剩余: {format_total_seconds(event.overall_remaining_s)}")
+
+    @pyqtSlot(str)
+    def update_schedule(self, text):
+        if self.engine.state()[0]: # Ignore text queued just before stop_timer cleared the label
+            self.schedule_label.setText(text)
+
+    def _schedule_text(self, event):
+        parts = []
+        if event.next_break_s is not None and event.phase == self.PHASE_WORKING:
+            parts.append(self.DISPLAY_NEXT_BREAK.format(time=format_time_of_day(event.next_break_s)))
+        if event.long_break_s is not None:
+            parts.append(self.DISPLAY_LONG_BREAK_AT.format(time=format_time_of_day(event.long_break_s)))
+        return "    ".join(parts)
 
     @pyqtSlot(str)
     def update_ui_elements(self, status_message):
+        # Status messages only; per-second countdown updates arrive via update_progress
         self.status_label.setText(status_message)
-        if ":" in status_message:
-            try:
-                time_display_for_progress = status_message.split(": ", 1)[1]
-                if len(time_display_for_progress.split(':')) == 2:
-                     self.progress_widget.setText(time_display_for_progress)
-                else:
-                     self.progress_widget.setText("00:00")
-            except IndexError:
-                 self.progress_widget.setText("00:00")
-        elif status_message == self.DISPLAY_STOPPED or status_message == self.DISPLAY_IDLE:
-            self.progress_widget.setText("00:00")
-
-        current_phase_total_s = 0
-        if self.is_running:
-            if self.current_timer_phase == self.PHASE_WORKING:
-                current_phase_total_s = self.current_work_interval_s
-            elif self.current_timer_phase == self.PHASE_SHORT_BREAK:
-                current_phase_total_s = self.short_break_s
-            elif self.current_timer_phase == self.PHASE_LONG_BREAK:
-                current_phase_total_s = self.long_break_m * 60
-            if current_phase_total_s > 0:
-                elapsed_s = current_phase_total_s - self.remaining_time_s
-                percentage = (elapsed_s / current_phase_total_s) * 100
-                self.progress_widget.setPercentage(max(0, min(percentage, 100)))
-            else:
-                self.progress_widget.setPercentage(0)
-        else:
-             self.progress_widget.setPercentage(0)
-             if self.current_timer_phase == self.PHASE_IDLE:
+        is_running, phase, _ = self.engine.state()
+        if not is_running:
+            self.schedule_label.setText("")
+            self.progress_widget.setValues(percentage=0, text="00:00")
+            if phase == self.PHASE_IDLE:
                 current_total_s_setting = self.total_time_spinbox.value() * 60
-                self.progress_widget.setTotalText(f"总剩余: {self.format_total_seconds(current_total_s_setting)}")
-
-        if self.is_running and self.overall_start_time_ts > 0:
-            elapsed_overall_s = time.time() - self.overall_start_time_ts
-            remaining_overall_s = self.total_target_seconds - elapsed_overall_s
-            if remaining_overall_s < 0: remaining_overall_s = 0
-            self.progress_widget.setTotalText(f"总剩余: {self.format_total_seconds(remaining_overall_s)}")
+                self.progress_widget.setTotalText(f"总剩余: {format_total_seconds(current_total_s_setting)}")
 
 def main():
     app = QApplication(sys.argv)
     app.setQuitOnLastWindowClosed(False)
-    try:
-        # For generic version, directly use path. Ensure icons/clock.png is available.
-        app_icon_path = "icons/clock.png" 
-        if os.path.exists(app_icon_path):
-            application_icon = QIcon(app_icon_path)
-            app.setWindowIcon(application_icon)
-        else: # Fallback if custom icon is not found
-            app.setWindowIcon(QApplication.style().standardIcon(QStyle.SP_ComputerIcon))
-    except Exception as e:
-        print(f"Failed to set application icon: {e}")
-        try:
-            app.setWindowIcon(QApplication.style().standardIcon(QStyle.SP_ComputerIcon))
-        except Exception:
-            pass
-
-    timer = PomodoroTimer()
-    timer.show()
+    instrumentation.install_if_requested(sys.argv, PomodoroTimer) # No-op unless --instrument is given
+    # The metrics module is only imported with --metrics or FOCUS_TIMER_METRICS.
+    # Started before the window so idle fast-start instances are visible too.
+    if any(arg.startswith("--metrics") for arg in sys.argv) or os.environ.get("FOCUS_TIMER_METRICS"):
+        import metrics
+        PomodoroTimer.metrics_exporter = metrics.start_if_requested(sys.argv)
+    app.setWindowIcon(shared_assets().icon()) # Falls back to a standard icon if icons/clock.png is missing
+
+    def create_window(tray_icon=None):
+        timer = PomodoroTimer(tray_icon)
+        QTimer.singleShot(PomodoroTimer.AUDIO_LOAD_DELAY_MS, timer.sound_bank.load_async)
+        return timer
+
+    if fast_start_requested(sys.argv):
+        # Only the tray icon now; the window is built on first open
+        launcher = DeferredWindowLauncher(create_window, app.windowIcon(), PomodoroTimer.APP_NAME,
+                                          PomodoroTimer.TRAY_SHOW_ACTION_TEXT,
+                                          PomodoroTimer.TRAY_QUIT_ACTION_TEXT)
+        get_window = launcher.ensure_window
+        startup_profile.mark("tray icon shown")
+    else:
+        timer = create_window()
+        timer.show()
+        get_window = lambda: timer
+        startup_profile.mark("window shown")
+
+    def handle_instance_command(command):
+        get_window().handle_instance_command(command)
+
+    single_instance.serve(handle_instance_command)
+    initial_command = single_instance.requested_command(sys.argv, default=None)
+    if initial_command is not None:
+        QTimer.singleShot(0, lambda: handle_instance_command(initial_command))
+    QTimer.singleShot(0, startup_profile.report)
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
@@ -1,126 +1,38 @@
 import sys
-import random
-import time
 import os
-import math
-from datetime import datetime, timedelta
-import threading
+import startup_profile
+startup_profile.install_if_requested()  # 必须在导入 PyQt5 之前调用，才能统计其导入耗时
+import single_instance
+# 已有实例在运行时把命令转发给它并立即退出，不加载 PyQt5 和 pygame
+single_instance.ensure_single_instance(sys.argv)
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                             QHBoxLayout, QLabel, QPushButton, QSpinBox, 
                             QSystemTrayIcon, QMenu, QAction, QMessageBox,
-                            QGridLayout, QSizePolicy, QGroupBox, QFormLayout,
-                            QStyle)
-from PyQt5.QtCore import Qt, QTimer, pyqtSignal, pyqtSlot, QEvent, QSize, QRectF
-from PyQt5.QtGui import QIcon, QFont, QPainter, QPen, QColor, QBrush
-import pygame
-
-# 获取资源路径的辅助函数
-def resource_path(relative_path):
-    """ 获取资源的绝对路径，支持PyInstaller打包后的路径 """
-    try:
-        # PyInstaller创建临时文件夹并将路径存储在_MEIPASS中
-        base_path = sys._MEIPASS
-    except Exception:
-        base_path = os.path.abspath(".")
-    
-    return os.path.join(base_path, relative_path)
-
-class CircularProgressBar(QWidget):
-    """自定义圆形进度条控件"""
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.setMinimumSize(220, 220)  # 设置最小尺寸以确保有足够空间绘制
-        self.percentage = 0
-        self.text = "00:00"
-        self.total_text = "总剩余: 00:00:00"
-
-    def setPercentage(self, value):
-        """设置进度百分比 (0-100)"""
-        self.percentage = value
-        self.update()  # 触发重绘
-
-    def setText(self, text):
-        """设置中心显示的文本"""
-        self.text = text
-        self.update()
-
-    def setTotalText(self, text):
-        """设置总剩余时间文本"""
-        self.total_text = text
-        self.update()
-
-    def paintEvent(self, event):
-        """绘制圆形进度条"""
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)  # 启用抗锯齿
-        
-        # 计算绘制区域
-        width = self.width()
-        height = self.height()
-        size = min(width, height) - 10  # 留出一些边距
-        rect = QRectF((width - size) / 2, (height - size) / 2, size, size)
-        
-        # 绘制背景圆圈
-        painter.setPen(QPen(QColor(200, 200, 200), 10))
-        painter.drawEllipse(rect)
-        
-        # 绘制进度弧
-        if self.percentage > 0:
-            painter.setPen(QPen(QColor(76, 175, 80), 10))  # 设置为绿色，可以根据需要调整
-            # 计算起始角度和跨度角度，Qt中0度是3点钟方向，逆时针旋转
-            start_angle = 90 * 16  # 从12点钟方向开始
-            span_angle = -self.percentage * 360 * 16 / 100  # 乘以16是因为Qt使用1/16度单位
-            painter.drawArc(rect, start_angle, span_angle)
-        
-        # 绘制刻度线
-        painter.save()
-        painter.setPen(QPen(QColor(100, 100, 100), 1))
-        painter.translate(width / 2, height / 2)  # 将原点移到中心
-        radius = size / 2 - 5  # 略微调整刻度线位置
-        
-        # 绘制60个细小刻度
-        for i in range(60):
-            if i % 5 == 0:  # 每5分钟一个大刻度
-                painter.setPen(QPen(QColor(50, 50, 50), 2))
-                outer = radius
-                inner = radius - 10
-            else:
-                painter.setPen(QPen(QColor(150, 150, 150), 1))
-                outer = radius
-                inner = radius - 5
-            
-            angle = i * 6  # 每个刻度6度
-            x1 = inner * math.sin(math.radians(angle))
-            y1 = -inner * math.cos(math.radians(angle))
-            x2 = outer * math.sin(math.radians(angle))
-            y2 = -outer * math.cos(math.radians(angle))
-            painter.drawLine(x1, y1, x2, y2)
-        
-        painter.restore()
-        
-        # 绘制当前时间文本
-        painter.setPen(QColor(10, 10, 10))
-        font = QFont("Arial", 28, QFont.Bold)
-        painter.setFont(font)
-        painter.drawText(rect, Qt.AlignCenter, self.text)
-        
-        # 绘制总剩余时间文本 - 向上移动并增加字体粗细
-        font = QFont("Arial", 13, QFont.Bold)  # 增加字体粗细和略微增加字号
-        painter.setFont(font)
-        
-        # 在圆形内部绘制总剩余时间，而不是边缘
-        # 创建一个比原来更高的矩形区域用于文本绘制
-        # 将文本区从底部移上来约20%的圆形高度
-        total_rect = QRectF(
-            rect.left(), 
-            rect.top() + rect.height() * 0.66,  # 从顶部向下移动66%的位置(原来是在底部)
-            rect.width(), 
-            rect.height() * 0.2  # 高度为圆形高度的20%
-        )
-        painter.drawText(total_rect, Qt.AlignCenter, self.total_text)
+                            QSizePolicy, QGroupBox, QFormLayout)
+from PyQt5.QtCore import QEvent, Qt, QTimer, pyqtSignal, pyqtSlot
+from PyQt5.QtGui import QFont
+from app_paths import user_data_dir
+from assets import shared_assets
+from audio import AudioWorker, SoundBank
+from circular_progress import CircularProgressBar
+from fast_start import DeferredWindowLauncher, fast_start_requested
+from history import HISTORY_FILE_NAME, HistoryRecorder, HistoryStore
+import instrumentation
+from qt_engine import create_engine
+import timer_engine
+from timer_engine import format_clock, format_time_of_day, format_total_seconds
+from tray_progress import TrayProgressAtlas
 
 class PomodoroTimer(QMainWindow):
     update_signal = pyqtSignal(str)
+    tick_signal = pyqtSignal(object)  # 携带 timer_engine.TickEvent 的倒计时刷新
+    # 计时线程只发射信号，所有 Qt 调用都通过排队连接在 GUI 线程中执行
+    tray_message_signal = pyqtSignal(str, str)  # 标题、内容
+    session_finished_signal = pyqtSignal()
+    tray_frame_signal = pyqtSignal(int)  # TrayProgressAtlas 的帧编号，只在帧变化时发送
+    schedule_signal = pyqtSignal(str)  # 接下来的休息钟点，只在阶段开始或休眠后发送
+    
+    metrics_exporter = None  # 带 --metrics 启动时由 main() 设置
     
     # --- UI Text Constants ---
     APP_NAME = "专注时钟"
@@ -137,6 +49,9 @@ class PomodoroTimer(QMainWindow):
     STOP_BUTTON_TEXT = "停止"
     TRAY_SHOW_ACTION_TEXT = "打开"
     TRAY_QUIT_ACTION_TEXT = "退出"
+    TRAY_STATS_ACTION_TEXT = "统计"
+    TRAY_DUMP_INSTRUMENTATION_TEXT = "导出性能数据"
+    INSTRUMENTATION_DUMPED_TEXT = "性能数据已保存到 {path}"
     QUIT_CONFIRM_TITLE = '退出确认'
     QUIT_CONFIRM_MESSAGE = '确定要退出应用程序吗？\n\n如果您想保持程序在后台运行，请点击"取消"，\n程序将最小化到系统托盘。'
     MINIMIZED_TO_TRAY_TITLE = "专注时钟"
@@ -144,11 +59,11 @@ class PomodoroTimer(QMainWindow):
     SETTINGS_ERROR_TITLE = "设置错误"
     MIN_MAX_INTERVAL_ERROR_MESSAGE = "最小间隔不能大于最大间隔！"
     
-    # --- Timer Phases (Internal State) ---
-    PHASE_IDLE = "IDLE"
-    PHASE_WORKING = "WORKING"
-    PHASE_SHORT_BREAK = "SHORT_BREAK"
-    PHASE_LONG_BREAK = "LONG_BREAK"
+    # --- Timer Phases (Internal State, 由 timer_engine 定义) ---
+    PHASE_IDLE = timer_engine.PHASE_IDLE
+    PHASE_WORKING = timer_engine.PHASE_WORKING
+    PHASE_SHORT_BREAK = timer_engine.PHASE_SHORT_BREAK
+    PHASE_LONG_BREAK = timer_engine.PHASE_LONG_BREAK
 
     # --- Display Texts for Phases ---
     DISPLAY_IDLE = "准备就绪"
@@ -159,76 +74,57 @@ class PomodoroTimer(QMainWindow):
     DISPLAY_STOPPED = "已停止"
     DISPLAY_PLEASE_REST_SECONDS = "请休息 {seconds} 秒"
     DISPLAY_LONG_BREAK_NOTICE = "{total_time_min}分钟已到！请起来活动并休息 {long_break_min} 分钟"
+    DISPLAY_NEXT_BREAK = "下次休息 {time}"
+    DISPLAY_LONG_BREAK_AT = "长休息 {time}"
+    PHASE_DISPLAY_TEXTS = {
+        PHASE_WORKING: DISPLAY_WORKING,
+        PHASE_SHORT_BREAK: DISPLAY_SHORT_BREAK,
+        PHASE_LONG_BREAK: DISPLAY_LONG_BREAK,
+    }
+
+    AUDIO_LOAD_DELAY_MS = 500  # 窗口显示后延迟多久开始加载声音
+    SOUND_CACHE_DIR_NAME = "sound_cache"  # 用户数据目录下的 PCM 缓存目录
 
-    def __init__(self):
+    def __init__(self, tray_icon=None):
         super().__init__()
+        # 图标和提示音的路径只解析一次、图标只解码一次（见 assets）
+        self.assets = shared_assets()
+        
+        # 声音在窗口显示后由后台线程初始化和解码（见 main()），
+        # 尚未加载好或加载失败时使用系统提示音；解码结果缓存在磁盘上，之后启动无需再解码
+        self.sound_bank = SoundBank(self.assets.sound_sources(),
+                                    cache_dir=os.path.join(user_data_dir(), self.SOUND_CACHE_DIR_NAME))
+        # 播放在专用线程中进行，计时线程只投递命令
+        self.audio = AudioWorker(self.sound_bank, fallback=self._play_system_sound)
+        
+        # 计时状态和默认参数都保存在不依赖 GUI 的会话引擎中
+        # 带 --qt-timer 参数时改用在事件循环中运行的单线程引擎
+        self.engine = create_engine(sys.argv)
+        self.engine.listeners.append(self)
+        
+        # 每个阶段的结果先放入内存队列，由后台线程批量写入历史数据库
+        self.history = HistoryStore(os.path.join(user_data_dir(), HISTORY_FILE_NAME))
+        self.engine.listeners.append(HistoryRecorder(self.history))
+        if self.metrics_exporter is not None:  # 仅在 --metrics 时导出指标
+            self.metrics_exporter.attach(self.engine)
+        # 窗口可见且未最小化时才转发每秒的刷新（见 _update_tick_visibility），
+        # 由计时线程读取、GUI 线程写入
+        self._ticks_visible = False
+        # 托盘进度环的图集在第一次开始计时时绘制，不占用启动时间
+        self.tray_atlas = None
+        self._tray_frame = None  # 计时线程最近一次发送的帧编号
+        self._schedule_stale = True  # 阶段开始或检测到休眠时置位，下一次刷新时重新计算休息钟点
         
-        # 初始化音频
-        pygame.mixer.init()
-        
-        # 加载声音
-        try:
-            self.ding_sound = pygame.mixer.Sound(resource_path("sounds/ding.mp3"))
-            self.break_sound = pygame.mixer.Sound(resource_path("sounds/break.mp3"))
-        except Exception as e:
-            # 如果声音加载失败，使用系统提示音
-            print(f"警告：声音文件加载失败，将使用系统提示音: {e}")
-            self.ding_sound = None
-            self.break_sound = None
-        
-        # 设置默认参数
-        self.min_interval = 3  # 最小间隔(分钟)
-        self.max_interval = 5  # 最大间隔(分钟)
-        self.short_break_s = 10  # 短休息(秒)
-        self.long_break_m = 20   # 长休息(分钟)
-        self.total_work_time_m = 90   # 总工作时间(分钟)
-        
-        # 状态变量
-        self.is_running = False
-        self.timer_thread = None
-        self.remaining_time_s = 0
-        self.total_elapsed_s = 0
-        self.current_work_interval_s = 0
-        
-        # 总时间倒计时相关
-        self.overall_start_time_ts = 0
-        self.total_target_seconds = 0
         self.total_time_remaining_label = None # 将在 init_ui 中创建
         
-        self.current_timer_phase = self.PHASE_IDLE
-        
         self.init_ui()
-        self.init_tray()
-    
-    def _get_icon(self, icon_name="icons/clock.png"):
-        try:
-            path = resource_path(icon_name)
-            if os.path.exists(path):
-                return QIcon(path)
-        except Exception as e:
-            print(f"加载图标失败 {icon_name}: {e}")
-        return QApplication.style().standardIcon(QStyle.SP_ComputerIcon) # Fallback
-
-    def format_total_seconds(self, total_seconds):
-        """将总秒数格式化为 HH:MM:SS 的字符串"""
-        s = int(total_seconds)
-        m, s_rem = divmod(s, 60)
-        h, m_rem = divmod(m, 60)
-        return f"{h:02d}:{m_rem:02d}:{s_rem:02d}"
+        self.init_tray(tray_icon)
     
     def init_ui(self):
         self.setWindowTitle(self.APP_NAME)
         self.setMinimumSize(500, 450)  # 设置最小尺寸，允许放大
         
-        # 设置图标
-        try:
-            icon_path = resource_path("icons/clock.png")
-            if os.path.exists(icon_path):
-                app_icon = QIcon(icon_path)
-                self.setWindowIcon(app_icon)
-                print(f"成功设置窗口图标: {icon_path}")
-        except Exception as e:
-            print(f"设置窗口图标失败: {e}")
+        self.setWindowIcon(self.assets.icon())
         
         # 主布局
         central_widget = QWidget()
@@ -255,21 +151,21 @@ class PomodoroTimer(QMainWindow):
         interval_layout = QHBoxLayout(interval_widget)
         interval_layout.setContentsMargins(0, 0, 0, 0)
         
-        self.min_spinbox = QSpinBox(minimum=1, maximum=30, value=self.min_interval, minimumWidth=70)
-        self.max_spinbox = QSpinBox(minimum=1, maximum=30, value=self.max_interval, minimumWidth=70)
+        self.min_spinbox = QSpinBox(minimum=1, maximum=30, value=self.engine.min_interval, minimumWidth=70)
+        self.max_spinbox = QSpinBox(minimum=1, maximum=30, value=self.engine.max_interval, minimumWidth=70)
         interval_layout.addWidget(self.min_spinbox)
         interval_layout.addWidget(QLabel(self.TO_LABEL))
         interval_layout.addWidget(self.max_spinbox)
         interval_layout.addWidget(QLabel(self.MINUTES_UNIT_LABEL))
         interval_layout.addStretch(1)
-        settings_layout.addRow(self.WORK_INTERVAL_LABEL, interval_layout)
+        settings_layout.addRow(self.WORK_INTERVAL_LABEL, interval_widget)
         
         # 短休息设置
         short_break_widget = QWidget()
         short_break_layout = QHBoxLayout(short_break_widget)
         short_break_layout.setContentsMargins(0, 0, 0, 0)
         
-        self.short_break_spinbox = QSpinBox(minimum=5, maximum=60, value=self.short_break_s, singleStep=5, minimumWidth=70)
+        self.short_break_spinbox = QSpinBox(minimum=5, maximum=60, value=self.engine.short_break_s, singleStep=5, minimumWidth=70)
         short_break_layout.addWidget(self.short_break_spinbox)
         short_break_layout.addWidget(QLabel(self.SECONDS_UNIT_LABEL))
         short_break_layout.addStretch(1)
@@ -280,7 +176,7 @@ class PomodoroTimer(QMainWindow):
         long_break_layout = QHBoxLayout(long_break_widget)
         long_break_layout.setContentsMargins(0, 0, 0, 0)
         
-        self.long_break_spinbox = QSpinBox(minimum=5, maximum=60, value=self.long_break_m, singleStep=5, minimumWidth=70)
+        self.long_break_spinbox = QSpinBox(minimum=5, maximum=60, value=self.engine.long_break_m, singleStep=5, minimumWidth=70)
         long_break_layout.addWidget(self.long_break_spinbox)
         long_break_layout.addWidget(QLabel(self.MINUTES_UNIT_LABEL))
         long_break_layout.addStretch(1)
@@ -291,11 +187,11 @@ class PomodoroTimer(QMainWindow):
         total_time_layout = QHBoxLayout(total_time_widget)
         total_time_layout.setContentsMargins(0, 0, 0, 0)
         
-        self.total_time_spinbox = QSpinBox(minimum=10, maximum=240, value=self.total_work_time_m, singleStep=10, minimumWidth=70)
+        self.total_time_spinbox = QSpinBox(minimum=10, maximum=240, value=self.engine.total_work_time_m, singleStep=10, minimumWidth=70)
         total_time_layout.addWidget(self.total_time_spinbox)
         total_time_layout.addWidget(QLabel(self.MINUTES_UNIT_LABEL))
         total_time_layout.addStretch(1)
-        settings_layout.addRow(self.TOTAL_WORK_TIME_LABEL, total_time_layout)
+        settings_layout.addRow(self.TOTAL_WORK_TIME_LABEL, total_time_widget)
         
         main_layout.addWidget(settings_group)
         
@@ -315,17 +211,22 @@ class PomodoroTimer(QMainWindow):
         self.progress_widget = CircularProgressBar()
         status_layout.addWidget(self.progress_widget, 1)  # 给进度条更多空间
         
+        # 接下来的休息时间（来自预先生成的会话计划）
+        self.schedule_label = QLabel("")
+        self.schedule_label.setAlignment(Qt.AlignCenter)
+        status_layout.addWidget(self.schedule_label)
+        
         # 隐藏原来的倒计时标签，但保留用于内部逻辑
         self.timer_label = QLabel("00:00")
         self.timer_label.hide()
         
         # 隐藏原来的总剩余时间标签，但保留用于内部逻辑
-        self.total_time_remaining_label = QLabel(f"总剩余: {self.format_total_seconds(self.total_work_time_m * 60)}")
+        self.total_time_remaining_label = QLabel(f"总剩余: {format_total_seconds(self.engine.total_work_time_m * 60)}")
         self.total_time_remaining_label.hide()
         
         # 设置进度条的初始文本
         self.progress_widget.setText("00:00")
-        self.progress_widget.setTotalText(f"总剩余: {self.format_total_seconds(self.total_work_time_m * 60)}")
+        self.progress_widget.setTotalText(f"总剩余: {format_total_seconds(self.engine.total_work_time_m * 60)}")
         
         main_layout.addWidget(status_group)
         
@@ -344,40 +245,20 @@ class PomodoroTimer(QMainWindow):
         
         # 连接信号
         self.update_signal.connect(self.update_ui_elements)
+        self.tick_signal.connect(self.update_progress)
+        self.tray_message_signal.connect(self.show_tray_message)
+        self.session_finished_signal.connect(self.stop_timer)
+        self.tray_frame_signal.connect(self.set_tray_progress)
+        self.schedule_signal.connect(self.update_schedule)
         
         self._set_input_widgets_enabled(True)
         
-    def init_tray(self):
-        # 创建系统托盘图标
-        self.tray_icon = QSystemTrayIcon(self)
+    def init_tray(self, tray_icon=None):
+        # 创建系统托盘图标（快速启动模式下托盘图标已存在，由窗口接管）
+        self.tray_icon = tray_icon or QSystemTrayIcon(self)
         
-        # 尝试设置图标
-        try:
-            icon_path = resource_path("icons/clock.png")
-            print(f"尝试加载托盘图标，路径: {icon_path}")
-            print(f"该路径是否存在: {os.path.exists(icon_path)}")
-            
-            if os.path.exists(icon_path):
-                icon = QIcon(icon_path)
-                self.tray_icon.setIcon(icon)
-                # 确保窗口图标也设置
-                self.setWindowIcon(icon)
-                print("成功设置托盘图标")
-            else:
-                # 尝试使用应用程序默认图标
-                app_icon = QApplication.style().standardIcon(QStyle.SP_ComputerIcon)
-                self.tray_icon.setIcon(app_icon)
-                self.setWindowIcon(app_icon)
-                print(f"警告：找不到自定义图标文件，使用系统默认图标")
-        except Exception as e:
-            print(f"设置托盘图标失败: {e}")
-            # 尝试使用系统标准图标
-            try:
-                app_icon = QApplication.style().standardIcon(QStyle.SP_ComputerIcon)
-                self.tray_icon.setIcon(app_icon)
-                self.setWindowIcon(app_icon)
-            except Exception as e:
-                print(f"使用系统标准图标也失败: {e}")
+        # 托盘图标和窗口图标共用同一个已解码的图标（找不到图标文件时为系统默认图标）
+        self.tray_icon.setIcon(self.assets.icon())
         
         # 创建托盘菜单
         tray_menu = QMenu()
@@ -385,6 +266,14 @@ class PomodoroTimer(QMainWindow):
         show_action = QAction(self.TRAY_SHOW_ACTION_TEXT, self, triggered=self.show_window)
         tray_menu.addAction(show_action)
         
+        stats_action = QAction(self.TRAY_STATS_ACTION_TEXT, self, triggered=self.show_stats)
+        tray_menu.addAction(stats_action)
+        
+        if instrumentation.enabled():
+            dump_action = QAction(self.TRAY_DUMP_INSTRUMENTATION_TEXT, self,
+                                  triggered=self.dump_instrumentation)
+            tray_menu.addAction(dump_action)
+        
         quit_action = QAction(self.TRAY_QUIT_ACTION_TEXT, self, triggered=self.close_application)
         tray_menu.addAction(quit_action)
         
@@ -398,6 +287,37 @@ class PomodoroTimer(QMainWindow):
         # 设置工具提示
         self.tray_icon.setToolTip(self.APP_NAME)
     
+    def show_stats(self):
+        """打开统计窗口（统计模块按需导入，不影响启动速度）"""
+        from stats import load_summary
+        from stats_dialog import StatsDialog
+        try:
+            summary = load_summary(self.history)
+        except Exception as e:
+            print(f"读取统计数据失败: {e}")
+            return
+        self.stats_dialog = StatsDialog(summary, self)
+        self.stats_dialog.show()
+    
+    def dump_instrumentation(self):
+        """把性能采集数据导出为 JSON（仅在 --instrument 启动时可用）"""
+        try:
+            path = instrumentation.recorder().dump()
+        except OSError as e:
+            print(f"导出性能数据失败: {e}")
+            return
+        self.show_tray_message(self.APP_NAME, self.INSTRUMENTATION_DUMPED_TEXT.format(path=path))
+    
+    def handle_instance_command(self, command):
+        """处理再次启动时转发过来的命令（见 single_instance）"""
+        if command == single_instance.CMD_SHOW:
+            self.show_window()
+        elif command == single_instance.CMD_START:
+            if not self.engine.state()[0]:
+                self.start_timer()
+        elif command == single_instance.CMD_STOP:
+            self.stop_timer()
+    
     def show_window(self):
         self.show()
         self.setWindowState(self.windowState() & ~Qt.WindowMinimized | Qt.WindowActive)
@@ -408,6 +328,28 @@ class PomodoroTimer(QMainWindow):
         if reason == QSystemTrayIcon.DoubleClick:
             self.show_window()
     
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._update_tick_visibility()
+    
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._update_tick_visibility()
+    
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.WindowStateChange:
+            self._update_tick_visibility()
+    
+    def _update_tick_visibility(self):
+        """窗口显示/隐藏/最小化/还原时调用；重新可见时按引擎当前状态一次性恢复显示"""
+        visible = self.isVisible() and not self.isMinimized()
+        was_visible, self._ticks_visible = self._ticks_visible, visible
+        if visible and not was_visible:
+            event = self.engine.current_tick()
+            if event is not None:
+                self.update_progress(event)
+    
     def closeEvent(self, event):
         # 询问用户是否真的要退出应用程序
         reply = QMessageBox.question(self, self.QUIT_CONFIRM_TITLE, self.QUIT_CONFIRM_MESSAGE,
@@ -440,22 +382,27 @@ class PomodoroTimer(QMainWindow):
     def close_application(self):
         # 完全退出应用
         self.stop_timer()
+        self.engine.join(1.0)  # 等计时线程记录完被停止的阶段
+        self.history.close()
         self.tray_icon.hide()  # 隐藏托盘图标
         QApplication.quit()
     
     def start_timer(self):
         # 获取用户设置的值
-        self.min_interval = self.min_spinbox.value()
-        self.max_interval = self.max_spinbox.value()
-        self.short_break_s = self.short_break_spinbox.value()
-        self.long_break_m = self.long_break_spinbox.value()
-        self.total_work_time_m = self.total_time_spinbox.value()
+        min_interval = self.min_spinbox.value()
+        max_interval = self.max_spinbox.value()
+        total_work_time_m = self.total_time_spinbox.value()
         
         # 确保最小值不大于最大值
-        if self.min_interval > self.max_interval:
+        if min_interval > max_interval:
             QMessageBox.warning(self, self.SETTINGS_ERROR_TITLE, self.MIN_MAX_INTERVAL_ERROR_MESSAGE)
             return
         
+        self.engine.configure(min_interval, max_interval,
+                              self.short_break_spinbox.value(),
+                              self.long_break_spinbox.value(),
+                              total_work_time_m)
+        
         # 禁用设置项
         self._set_input_widgets_enabled(False)
         
@@ -463,25 +410,23 @@ class PomodoroTimer(QMainWindow):
         self.start_button.setEnabled(False)
         self.stop_button.setEnabled(True)
         
-        # 设置状态
-        self.is_running = True
-        self.total_elapsed_s = 0
-        
         # 设置总时间倒计时
-        self.total_target_seconds = self.total_work_time_m * 60
-        self.overall_start_time_ts = time.time()
-        self.total_time_remaining_label.setText(f"总剩余: {self.format_total_seconds(self.total_target_seconds)}")
+        self.total_time_remaining_label.setText(f"总剩余: {format_total_seconds(total_work_time_m * 60)}")
         
-        # 启动计时器线程
-        self.timer_thread = threading.Thread(target=self.timer_loop, daemon=True)
-        self.timer_thread.start()
+        # 启动计时器线程（确保声音已开始加载）
+        self.sound_bank.load_async()
+        if self.tray_atlas is None:
+            self.tray_atlas = TrayProgressAtlas()
+        self._tray_frame = None
+        self.engine.start()
         
         # 更新状态
         self.update_signal.emit(self.DISPLAY_STARTED)
     
     def stop_timer(self):
-        if self.is_running:
-            self.is_running = False
+        # 会话正常结束时引擎已自行停止，这里只需恢复界面
+        if self.stop_button.isEnabled():
+            self.engine.stop()
             
             # 恢复设置项
             self._set_input_widgets_enabled(True)
@@ -490,155 +435,112 @@ class PomodoroTimer(QMainWindow):
             self.start_button.setEnabled(True)
             self.stop_button.setEnabled(False)
             
+            # 托盘恢复为应用图标
+            self.tray_icon.setIcon(self.assets.icon())
+            
             # 更新状态
             self.update_signal.emit(self.DISPLAY_STOPPED)
             self.timer_label.setText("00:00")
             
             # 重置总时间显示以反映当前spinbox中的设置
             current_total_seconds_setting = self.total_time_spinbox.value() * 60
-            self.total_time_remaining_label.setText(f"总剩余: {self.format_total_seconds(current_total_seconds_setting)}")
-            
-            # 重置总计时器内部状态
-            self.overall_start_time_ts = 0
-            self.total_target_seconds = 0
-    
-    def _play_sound_with_fallback(self, sound):
-        """播放声音，如果声音文件不可用则使用Windows系统声音"""
-        if sound is not None:
-            try:
-                sound.play()
-            except Exception:
-                # 失败时尝试播放系统提示音
-                import winsound
-                winsound.MessageBeep(winsound.MB_ICONEXCLAMATION)
-        else:
-            # 使用Windows系统提示音
-            import winsound
-            winsound.MessageBeep(winsound.MB_ICONEXCLAMATION)
-    
-    def timer_loop(self):
-        while self.is_running and self.total_elapsed_s < self.total_work_time_m * 60:
-            # 随机选择当前间隔
-            self.current_work_interval_s = random.randint(self.min_interval * 60, self.max_interval * 60)
-            
-            # 倒计时当前间隔
-            self.countdown(self.current_work_interval_s, self.DISPLAY_WORKING)
-            
-            if not self.is_running:
-                break
-                
-            # 播放提示音
-            self._play_sound_with_fallback(self.ding_sound)
-            
+            self.total_time_remaining_label.setText(f"总剩余: {format_total_seconds(current_total_seconds_setting)}")
+    
+    def _play_system_sound(self, cue):
+        """声音文件不可用或播放失败时使用Windows系统提示音（在播放线程中调用）"""
+        import winsound
+        winsound.MessageBeep(winsound.MB_ICONEXCLAMATION)
+    
+    # --- SessionEngine 回调（在计时线程中调用，--qt-timer 模式下在 GUI 线程中调用） ---
+    def on_phase_started(self, phase, phase_total_s):
+        self._schedule_stale = True
+        if phase == self.PHASE_SHORT_BREAK:
             # 显示短休息提示
-            self.update_signal.emit(self.DISPLAY_PLEASE_REST_SECONDS.format(seconds=self.short_break_s))
-            
-            # 短休息倒计时
-            self.countdown(self.short_break_s, self.DISPLAY_SHORT_BREAK)
-            
-            # 短休息结束时播放提示音
-            if self.is_running:
-                self._play_sound_with_fallback(self.ding_sound)
-            
-            # 更新总计时
-            self.total_elapsed_s += self.current_work_interval_s + self.short_break_s
-            
-        # 如果是正常结束（不是被用户停止）
-        if self.is_running and self.total_elapsed_s >= self.total_work_time_m * 60:
-            # 播放长休息提示音
-            self._play_sound_with_fallback(self.break_sound)
-            
+            self.update_signal.emit(self.DISPLAY_PLEASE_REST_SECONDS.format(seconds=phase_total_s))
+        elif phase == self.PHASE_LONG_BREAK:
             # 显示长休息提示
             long_break_msg = self.DISPLAY_LONG_BREAK_NOTICE.format(
-                total_time_min=self.total_work_time_m, 
-                long_break_min=self.long_break_m
+                total_time_min=self.engine.total_work_time_m, 
+                long_break_min=self.engine.long_break_m
             )
             self.update_signal.emit(long_break_msg)
             
-            # 弹出通知
-            self.tray_icon.showMessage(
-                "休息提醒",
-                long_break_msg,
-                QSystemTrayIcon.Information,
-                5000
-            )
-            
-            # 长休息倒计时
-            self.countdown(self.long_break_m * 60, self.DISPLAY_LONG_BREAK)
-            
-            # 长休息结束时播放提示音
-            if self.is_running:
-                self._play_sound_with_fallback(self.ding_sound)
-            
-            # 重置计时器
-            self.stop_timer()
+            # 弹出通知（托盘图标只能在 GUI 线程中操作）
+            self.tray_message_signal.emit("休息提醒", long_break_msg)
     
-    def countdown(self, seconds, mode):
-        self.remaining_time_s = seconds
-        end_time_ts = time.time() + seconds
-        
-        while self.is_running and time.time() < end_time_ts:
-            # 计算剩余时间
-            self.remaining_time_s = int(end_time_ts - time.time())
-            
-            # 更新UI
-            mins, secs_rem = divmod(self.remaining_time_s, 60)
-            time_str = f"{mins:02d}:{secs_rem:02d}"
-            self.update_signal.emit(f"{mode}: {time_str}")
-            
-            # 100ms的检查间隔，保持UI响应性
-            time.sleep(0.1)
+    def on_suspend_detected(self, suspended_s, shift_s):
+        # 截止时间平移后，休息的钟点也随之变化
+        self._schedule_stale = True
+    
+    def on_tick(self, event):
+        # 休息的钟点只在阶段开始或休眠后变化，不必每秒格式化
+        if self._schedule_stale:
+            self._schedule_stale = False
+            self.schedule_signal.emit(self._schedule_text(event))
+        # 托盘进度环每个阶段最多切换 TrayProgressAtlas.STEPS 次，窗口隐藏时也照常更新
+        frame = TrayProgressAtlas.frame_index(event.phase, event.percentage)
+        if frame != self._tray_frame:
+            self._tray_frame = frame
+            self.tray_frame_signal.emit(frame)
+        # 窗口隐藏在托盘或最小化时没有人能看到倒计时，不发送刷新
+        if self._ticks_visible:
+            self.tick_signal.emit(event)
+    
+    def on_cue(self, cue):
+        # 进入长休息时播放长休息提示音，其余时候播放普通提示音；只投递命令，不会阻塞计时
+        self.audio.play(cue)
+    
+    def on_session_finished(self):
+        # 在 GUI 线程中重置计时器
+        self.session_finished_signal.emit()
+    
+    @pyqtSlot(str, str)
+    def show_tray_message(self, title, message):
+        self.tray_icon.showMessage(title, message, QSystemTrayIcon.Information, 5000)
+    
+    @pyqtSlot(int)
+    def set_tray_progress(self, frame):
+        """切换到预先绘制好的托盘进度环帧"""
+        if self.engine.state()[0]:  # 忽略停止前已排队的帧，保持恢复后的应用图标
+            self.tray_icon.setIcon(self.tray_atlas.icon(frame))
+    
+    @pyqtSlot(object)
+    def update_progress(self, event):
+        """根据结构化的刷新事件更新状态和进度条"""
+        if not self.engine.state()[0]:
+            return  # 停止前已排队的刷新，保持重置后的显示
+        time_str = format_clock(event.remaining_s)
+        self.status_label.setText(f"{self.PHASE_DISPLAY_TEXTS[event.phase]}: {time_str}")
+        self.progress_widget.setValues(
+            percentage=event.percentage,
+            text=time_str,
+            total_text=f"总剩余: {format_total_seconds(event.overall_remaining_s)}")
+    
+    @pyqtSlot(str)
+    def update_schedule(self, text):
+        if self.engine.state()[0]:  # 忽略停止前已排队的文字，保持清空后的显示
+            self.schedule_label.setText(text)
+    
+    def _schedule_text(self, event):
+        """工作中显示下次休息的钟点，长休息之前一直显示长休息的钟点"""
+        parts = []
+        if event.next_break_s is not None and event.phase == self.PHASE_WORKING:
+            parts.append(self.DISPLAY_NEXT_BREAK.format(time=format_time_of_day(event.next_break_s)))
+        if event.long_break_s is not None:
+            parts.append(self.DISPLAY_LONG_BREAK_AT.format(time=format_time_of_day(event.long_break_s)))
+        return "    ".join(parts)
     
     @pyqtSlot(str)
     def update_ui_elements(self, msg):
+        """显示状态提示文字（倒计时刷新由 update_progress 处理）"""
         self.status_label.setText(msg)
         
-        # 更新计时器显示
-        mins, secs = divmod(self.remaining_time_s, 60)
-        time_str = f"{mins:02d}:{secs:02d}"
-        self.timer_label.setText(time_str)
-        self.progress_widget.setText(time_str)
-        
-        # 计算并更新进度百分比
-        if self.is_running:
-            if "工作中" in msg:
-                # 工作时间进度
-                total_secs = self.current_work_interval_s
-                elapsed = total_secs - self.remaining_time_s
-                percentage = elapsed / total_secs * 100 if total_secs > 0 else 0
-            elif "短休息" in msg:
-                # 短休息进度
-                total_secs = self.short_break_s
-                elapsed = total_secs - self.remaining_time_s
-                percentage = elapsed / total_secs * 100 if total_secs > 0 else 0
-            elif "长休息" in msg:
-                # 长休息进度
-                total_secs = self.long_break_m * 60
-                elapsed = total_secs - self.remaining_time_s
-                percentage = elapsed / total_secs * 100 if total_secs > 0 else 0
-            else:
-                percentage = 0
-                
-            self.progress_widget.setPercentage(percentage)
-        else:
-            self.progress_widget.setPercentage(0)
-        
-        # 更新总剩余时间显示
-        if self.is_running and self.overall_start_time_ts > 0:
-            elapsed_overall_seconds = time.time() - self.overall_start_time_ts
-            remaining_overall_seconds = self.total_target_seconds - elapsed_overall_seconds
-            
-            if remaining_overall_seconds < 0:
-                remaining_overall_seconds = 0
-            
-            total_remaining_text = f"总剩余: {self.format_total_seconds(remaining_overall_seconds)}"
-            self.total_time_remaining_label.setText(total_remaining_text)
-            self.progress_widget.setTotalText(total_remaining_text)
-        elif not self.is_running:
+        if not self.engine.state()[0]:
+            self.schedule_label.setText("")
             # 如果计时器停止，使用当前spinbox设置的总时间
             current_total_seconds_setting = self.total_time_spinbox.value() * 60
-            total_remaining_text = f"总剩余: {self.format_total_seconds(current_total_seconds_setting)}"
-            self.progress_widget.setTotalText(total_remaining_text)
+            total_remaining_text = f"总剩余: {format_total_seconds(current_total_seconds_setting)}"
+            self.progress_widget.setValues(percentage=0, text="00:00", total_text=total_remaining_text)
 
     def _set_input_widgets_enabled(self, enabled):
         self.min_spinbox.setEnabled(enabled)
@@ -650,19 +552,47 @@ class PomodoroTimer(QMainWindow):
 def main():
     app = QApplication(sys.argv)
     app.setQuitOnLastWindowClosed(False)  # 关闭窗口时不退出应用
+    # 仅在 --instrument 时启用；必须在创建窗口之前，槽函数连接的才是计时包装
+    instrumentation.install_if_requested(sys.argv, PomodoroTimer)
+    # 仅在带 --metrics 或设置了 FOCUS_TIMER_METRICS 时才导入指标模块并启动；
+    # 先于窗口启动，快速启动模式下未打开窗口时也能报告空闲状态
+    if any(arg.startswith("--metrics") for arg in sys.argv) or os.environ.get("FOCUS_TIMER_METRICS"):
+        import metrics
+        PomodoroTimer.metrics_exporter = metrics.start_if_requested(sys.argv)
+    
+    # 设置应用程序图标，以便在任务栏和桌面快捷方式中显示（与窗口、托盘共用同一个图标）
+    app.setWindowIcon(shared_assets().icon())
+    
+    def create_window(tray_icon=None):
+        timer = PomodoroTimer(tray_icon)
+        # 窗口显示之后再开始加载声音
+        QTimer.singleShot(PomodoroTimer.AUDIO_LOAD_DELAY_MS, timer.sound_bank.load_async)
+        return timer
+    
+    if fast_start_requested(sys.argv):
+        # 快速启动：先只显示托盘图标，第一次打开时才创建主窗口
+        launcher = DeferredWindowLauncher(create_window, app.windowIcon(), PomodoroTimer.APP_NAME,
+                                          PomodoroTimer.TRAY_SHOW_ACTION_TEXT,
+                                          PomodoroTimer.TRAY_QUIT_ACTION_TEXT)
+        get_window = launcher.ensure_window
+        startup_profile.mark("tray icon shown")
+    else:
+        timer = create_window()
+        timer.show()
+        get_window = lambda: timer
+        startup_profile.mark("window shown")
+    
+    # 接收再次启动时转发过来的命令；本次启动带 --start/--stop 时也照样执行
+    def handle_instance_command(command):
+        get_window().handle_instance_command(command)
+    
+    single_instance.serve(handle_instance_command)
+    initial_command = single_instance.requested_command(sys.argv, default=None)
+    if initial_command is not None:
+        QTimer.singleShot(0, lambda: handle_instance_command(initial_command))
     
-    # 设置应用程序图标，以便在任务栏和桌面快捷方式中显示
-    try:
-        icon_path = resource_path("icons/clock.png")
-        if os.path.exists(icon_path):
-            app_icon = QIcon(icon_path)
-            app.setWindowIcon(app_icon)
-            print(f"成功设置应用程序图标: {icon_path}")
-    except Exception as e:
-        print(f"设置应用程序图标失败: {e}")
-    
-    timer = PomodoroTimer()
-    timer.show()
+    # 带 --import-times 参数时，事件循环开始后输出启动耗时
+    QTimer.singleShot(0, startup_profile.report)
     
     sys.exit(app.exec_())
 
@@ -0,0 +1,115 @@
+"""在 Qt 事件循环中运行的会话引擎（不使用计时线程）
+
+QtSessionEngine 与 SessionEngine 的接口和回调完全相同，但整个工作/短休息/
+长休息循环作为单线程状态机运行：每次用一个粗粒度的单次 QTimer 睡到剩余
+整秒数下一次变化的时刻，回调直接在 GUI 线程中执行，不需要跨线程传递信号。
+命令行带 --qt-timer 或设置环境变量 FOCUS_TIMER_ENGINE=qt 时启用，
+便于和线程版引擎对比内存占用和上下文切换次数。
+
+两种引擎都可以用 --suspend-policy=pause|continue|restart（或环境变量
+FOCUS_TIMER_SUSPEND_POLICY）选择检测到系统休眠后的处理方式。
+"""
+import math
+import os
+
+from PyQt5.QtCore import QTimer, Qt
+
+from timer_engine import SUSPEND_PAUSE, SUSPEND_POLICIES, SessionEngine
+
+QT_TIMER_FLAG = "--qt-timer"
+ENGINE_ENV = "FOCUS_TIMER_ENGINE"
+SUSPEND_POLICY_FLAG = "--suspend-policy"
+SUSPEND_POLICY_ENV = "FOCUS_TIMER_SUSPEND_POLICY"
+
+
+def qt_timer_requested(argv):
+    """命令行带 --qt-timer 或环境变量 FOCUS_TIMER_ENGINE=qt 时使用 QtSessionEngine"""
+    return QT_TIMER_FLAG in argv or os.environ.get(ENGINE_ENV) == "qt"
+
+
+def requested_suspend_policy(argv):
+    """--suspend-policy 策略 / --suspend-policy=策略 / FOCUS_TIMER_SUSPEND_POLICY，默认为 pause"""
+    policy = os.environ.get(SUSPEND_POLICY_ENV) or SUSPEND_PAUSE
+    for i, arg in enumerate(argv):
+        if arg.startswith(SUSPEND_POLICY_FLAG + "="):
+            policy = arg.split("=", 1)[1]
+        elif arg == SUSPEND_POLICY_FLAG and i + 1 < len(argv):
+            policy = argv[i + 1]
+    if policy not in SUSPEND_POLICIES:
+        print(f"未知的休眠处理方式 {policy}，可选: {', '.join(SUSPEND_POLICIES)}，使用 {SUSPEND_PAUSE}")
+        return SUSPEND_PAUSE
+    return policy
+
+
+def create_engine(argv):
+    """按命令行/环境变量选择会话引擎和休眠处理方式"""
+    suspend_policy = requested_suspend_policy(argv)
+    if qt_timer_requested(argv):
+        return QtSessionEngine(suspend_policy=suspend_policy)
+    return SessionEngine(suspend_policy=suspend_policy)
+
+
+class QtSessionEngine(SessionEngine):
+    """由单次 QTimer 驱动的会话引擎，必须在 GUI 线程中使用
+
+    start() 立即返回，之后的每一步都在事件循环中执行；run() 不可用。
+    """
+
+    def __init__(self, clock=None, rng=None, suspend_policy=SUSPEND_PAUSE):
+        super().__init__(clock, rng, suspend_policy)
+        self._timer = QTimer()
+        self._timer.setSingleShot(True)
+        # 粗粒度定时器允许系统合并唤醒；提前醒来时 step() 不会重复刷新，只会重新安排等待
+        self._timer.setTimerType(Qt.CoarseTimer)
+        self._timer.timeout.connect(self._on_timeout)
+        self._phase_active = False
+
+    def start(self):
+        """开始会话，第一个阶段的第一次刷新在返回前发出"""
+        self._timer.stop()
+        self._reset_session()
+        stop_event = self.stop_event
+        self._notify("on_session_started", self.schedule)
+        if self._enter_phase(0, stop_event):
+            self._advance(stop_event)
+
+    def run(self):
+        raise RuntimeError("QtSessionEngine runs on the Qt event loop; use start()")
+
+    def stop(self):
+        """停止会话，被停止的阶段在返回前通知 on_phase_finished"""
+        self._timer.stop()
+        super().stop()
+        if self._phase_active:
+            self._phase_active = False
+            self.ticker.finish()
+            self._end_phase(self.phase_index, False)
+
+    def _enter_phase(self, index, stop_event):
+        if index >= len(self.schedule):
+            self._finish_session(stop_event)
+            return False
+        if not self._begin_phase(index, stop_event):
+            return False
+        self.ticker.begin(self.schedule.durations[index], self.next_phase_start_ts)
+        self._phase_active = True
+        return True
+
+    def _on_timeout(self):
+        self.ticker.woke()
+        self._advance(self.stop_event)
+
+    def _advance(self, stop_event):
+        """刷新当前阶段；阶段结束时依次进入后续阶段，直到需要等待为止"""
+        while not stop_event.is_set():
+            timeout = self.ticker.step(self._tick)
+            if stop_event.is_set():
+                return  # 回调中停止了会话
+            if timeout is not None:
+                self._timer.start(max(1, math.ceil(timeout * 1000)))
+                return
+            self._phase_active = False
+            self.ticker.finish()
+            self._end_phase(self.phase_index, True)
+            if not self._enter_phase(self.phase_index + 1, stop_event):
+                return
@@ -0,0 +1,134 @@
+"""单文件资源包：把图标和提示音打包成一个带索引的文件，运行时通过 mmap 读取
+
+文件格式（小端序）：
+    文件头  magic "FTRP" | 版本 u16 | 条目数 u16 | 索引长度 u32
+    索引    每个条目: 偏移 u64 | 长度 u64 | 格式 4 字节（如 "png", "mp3"） | 名称长度 u16 | UTF-8 名称
+    数据    各文件内容，按 16 字节对齐
+
+名称为资源的相对路径（如 "sounds/ding.mp3"），与 assets 中使用的名称一致。
+打包前生成资源包：
+    python resource_pack.py                      # 生成 build/resources.pack
+    python resource_pack.py -o other.pack a.png  # 指定输出和文件
+"""
+import argparse
+import mmap
+import os
+import struct
+import sys
+
+PACK_FILE_NAME = "resources.pack"
+MAGIC = b"FTRP"
+VERSION = 1
+HEADER = struct.Struct("<4sHHI")
+ENTRY = struct.Struct("<QQ4sH")
+ALIGNMENT = 16
+
+DEFAULT_CONTENTS = ("icons/clock.png", "sounds/ding.mp3", "sounds/break.mp3")
+DEFAULT_OUTPUT = os.path.join("build", PACK_FILE_NAME)
+
+
+def _format_of(name):
+    return os.path.splitext(name)[1].lstrip(".").lower()[:4]
+
+
+def build_pack(root, names, output_path):
+    """把 root 下的 names 打包到 output_path，返回写入的条目数"""
+    blobs = []
+    for name in names:
+        with open(os.path.join(root, name), "rb") as f:
+            blobs.append((name, f.read()))
+
+    encoded_names = [name.encode("utf-8") for name, _ in blobs]
+    index_size = sum(ENTRY.size + len(n) for n in encoded_names)
+    offset = HEADER.size + index_size
+    index = []
+    for (name, data), encoded in zip(blobs, encoded_names):
+        offset += -offset % ALIGNMENT
+        index.append(ENTRY.pack(offset, len(data), _format_of(name).encode("ascii"), len(encoded)) + encoded)
+        offset += len(data)
+
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(blobs), index_size))
+        f.write(b"".join(index))
+        for _, data in blobs:
+            f.write(b"\0" * (-f.tell() % ALIGNMENT))
+            f.write(data)
+    os.replace(tmp_path, output_path)
+    return len(blobs)
+
+
+class ResourcePack:
+    """只读的资源包，get() 返回直接指向映射内存的 memoryview，不复制数据"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        self.entries = {}  # 名称 -> (偏移, 长度, 格式)
+        try:
+            self._read_index()
+        except (struct.error, UnicodeDecodeError) as e:
+            self.close()
+            raise ValueError(f"资源包已损坏: {path}") from e
+
+    def _read_index(self):
+        magic, version, count, index_size = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise struct.error(f"unsupported pack {magic!r} v{version}")
+        pos = HEADER.size
+        for _ in range(count):
+            offset, length, fmt, name_len = ENTRY.unpack_from(self._map, pos)
+            pos += ENTRY.size
+            name = bytes(self._view[pos:pos + name_len]).decode("utf-8")
+            pos += name_len
+            if offset + length > len(self._map):
+                raise struct.error(f"entry {name} out of range")
+            self.entries[name] = (offset, length, fmt.rstrip(b"\0").decode("ascii"))
+
+    def __contains__(self, name):
+        return name in self.entries
+
+    def get(self, name):
+        """返回资源内容的 memoryview，不存在时返回 None"""
+        entry = self.entries.get(name)
+        if entry is None:
+            return None
+        offset, length, _ = entry
+        return self._view[offset:offset + length]
+
+    def format(self, name):
+        return self.entries[name][2]
+
+    def close(self):
+        # 仍有外部引用的切片时 mmap 无法关闭，交给垃圾回收
+        try:
+            self._view.release()
+            self._map.close()
+        except (BufferError, ValueError):
+            pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="生成单文件资源包")
+    parser.add_argument("names", nargs="*", default=list(DEFAULT_CONTENTS),
+                        help="要打包的资源（相对于 --root 的路径）")
+    parser.add_argument("--root", default=os.path.dirname(os.path.abspath(__file__)), help="资源根目录")
+    parser.add_argument("-o", "--output", default=DEFAULT_OUTPUT, help="输出文件")
+    args = parser.parse_args(argv)
+
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    try:
+        count = build_pack(args.root, args.names, args.output)
+    except OSError as e:
+        print(f"生成资源包失败: {e}")
+        return 1
+    print(f"已生成资源包 {args.output}（{count} 个文件，{os.path.getsize(args.output)} 字节）")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
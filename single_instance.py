@@ -0,0 +1,217 @@
+"""单实例锁和本地控制通道
+
+只使用标准库，在导入 PyQt5 之前调用 ensure_single_instance()：
+已有实例在运行时，把命令（打开窗口/开始/停止）通过本地套接字转发给它后
+立即退出，不会加载任何界面或音频模块。
+
+锁为用户数据目录下 instance.lock 文件上的独占锁，进程退出（包括崩溃）后
+由操作系统自动释放。控制通道在支持的平台上使用 Unix 域套接字，否则使用
+只监听 127.0.0.1 的 TCP 端口；地址和随机令牌写在 instance.addr 中。
+"""
+import os
+import socket
+import sys
+import threading
+import time
+
+from app_paths import user_data_dir
+
+LOCK_FILE_NAME = "instance.lock"
+ADDRESS_FILE_NAME = "instance.addr"
+SOCKET_FILE_NAME = "instance.sock"
+
+CMD_SHOW = "show"
+CMD_START = "start"
+CMD_STOP = "stop"
+COMMANDS = (CMD_SHOW, CMD_START, CMD_STOP)
+COMMAND_FLAGS = {"--start": CMD_START, "--stop": CMD_STOP, "--show": CMD_SHOW}
+
+FORWARD_TIMEOUT_S = 1.0  # 单次连接/收发的超时
+STARTUP_WAIT_S = 10.0  # 主实例刚启动、还没开始接收命令时最多等待这么久
+RETRY_DELAY_S = 0.02  # 转发失败后的首次重试间隔，之后每次加倍
+MAX_RETRY_DELAY_S = 0.5
+
+_instance = None
+_bridge = None
+
+
+def requested_command(argv, default=CMD_SHOW):
+    """命令行中的 --start / --stop / --show，没有时返回 default"""
+    for flag, command in COMMAND_FLAGS.items():
+        if flag in argv:
+            return command
+    return default
+
+
+def _lock_file(f):
+    if sys.platform.startswith("win"):
+        import msvcrt
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+
+class InstanceLock:
+    """单实例锁，持有锁的进程通过 serve() 接收其他启动转发来的命令"""
+
+    def __init__(self, data_dir):
+        self.lock_path = os.path.join(data_dir, LOCK_FILE_NAME)
+        self.address_path = os.path.join(data_dir, ADDRESS_FILE_NAME)
+        self.socket_path = os.path.join(data_dir, SOCKET_FILE_NAME)
+        self.commands_handled = 0
+        self._lock = None
+        self._server = None
+        self._token = None
+
+    def acquire(self):
+        """尝试获得锁，已有实例持有锁时返回 False"""
+        f = open(self.lock_path, "a+")
+        try:
+            _lock_file(f)
+        except OSError:
+            f.close()
+            return False
+        self._lock = f
+        return True
+
+    def forward(self, command, timeout):
+        """把命令发给持有锁的实例，成功返回 True
+
+        主实例可能还没创建控制通道，或者地址文件仍是上一个实例留下的，
+        失败时按指数退避重试，直到 timeout 秒后放弃。
+        """
+        deadline = time.monotonic() + timeout
+        delay = RETRY_DELAY_S
+        while True:
+            try:
+                with open(self.address_path) as f:
+                    family, address, token = f.read().split()
+                with self._connect(family, address) as conn:
+                    conn.sendall(f"{token} {command}\n".encode())
+                    if conn.recv(16).startswith(b"ok"):
+                        return True
+            except (OSError, ValueError):
+                pass
+            remaining_s = deadline - time.monotonic()
+            if remaining_s <= 0:
+                return False
+            time.sleep(min(delay, remaining_s))
+            delay = min(delay * 2, MAX_RETRY_DELAY_S)
+
+    def _connect(self, family, address):
+        if family == "unix":
+            conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            conn.settimeout(FORWARD_TIMEOUT_S)
+            conn.connect(address)
+        else:
+            host, port = address.rsplit(":", 1)
+            conn = socket.create_connection((host, int(port)), timeout=FORWARD_TIMEOUT_S)
+        return conn
+
+    def serve(self, dispatch):
+        """开始在后台线程中接收命令，每个命令调用一次 dispatch(command)（在接收线程中）"""
+        if self._server is not None:
+            return
+        import secrets  # 只有主实例需要，转发命令的进程不必导入
+        if hasattr(socket, "AF_UNIX") and not sys.platform.startswith("win"):
+            # 持有锁说明旧的套接字文件（如果有）属于已退出的进程
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+            server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            server.bind(self.socket_path)
+            family, address = "unix", self.socket_path
+        else:
+            server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            server.bind(("127.0.0.1", 0))
+            family, address = "tcp", "127.0.0.1:%d" % server.getsockname()[1]
+        server.listen(4)
+        self._server = server
+        self._token = secrets.token_hex(16)
+
+        tmp_path = self.address_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(f"{family} {address} {self._token}\n")
+        os.replace(tmp_path, self.address_path)
+
+        threading.Thread(target=self._accept_loop, args=(server, dispatch),
+                         name="instance-server", daemon=True).start()
+
+    def _accept_loop(self, server, dispatch):
+        while True:
+            try:
+                conn, _ = server.accept()
+            except OSError:
+                return  # close() 关闭了监听套接字
+            with conn:
+                try:
+                    conn.settimeout(FORWARD_TIMEOUT_S)
+                    token, command = conn.recv(256).decode().split()
+                    if token != self._token or command not in COMMANDS:
+                        conn.sendall(b"error\n")
+                        continue
+                    dispatch(command)
+                    self.commands_handled += 1
+                    conn.sendall(b"ok\n")
+                except (OSError, ValueError) as e:
+                    print(f"处理实例命令失败: {e}")
+
+    def close(self):
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        if self._lock is not None:
+            self._lock.close()
+            self._lock = None
+
+
+def ensure_single_instance(argv):
+    """获得单实例锁；已有实例在运行时把命令转发给它并退出进程
+
+    需在导入 PyQt5 之前调用。锁文件无法创建等意外情况下照常启动；
+    已有实例持有锁但一直无法连接时以非零状态退出，不会启动第二个实例。
+    """
+    global _instance
+    try:
+        instance = InstanceLock(user_data_dir())
+        acquired = instance.acquire()
+    except OSError as e:
+        print(f"单实例检查失败: {e}")
+        return
+    if acquired:
+        _instance = instance
+        return
+    if instance.forward(requested_command(argv), STARTUP_WAIT_S):
+        sys.exit(0)
+    print("已有实例在运行但无法连接，退出")
+    sys.exit(1)
+
+
+def serve(handler):
+    """开始接收其他启动转发来的命令，handler(command) 在 GUI 线程中执行
+
+    需在创建 QApplication 之后、于 GUI 线程中调用。
+    """
+    global _bridge
+    if _instance is None:
+        return
+    from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
+
+    class CommandBridge(QObject):
+        # 接收线程发射信号，排队连接把命令交给 GUI 线程
+        command_received = pyqtSignal(str)
+
+        def __init__(self):
+            super().__init__()
+            self.command_received.connect(self._handle)
+
+        @pyqtSlot(str)
+        def _handle(self, command):
+            handler(command)
+
+    _bridge = CommandBridge()
+    try:
+        _instance.serve(_bridge.command_received.emit)
+    except OSError as e:
+        print(f"无法创建实例控制通道: {e}")
@@ -0,0 +1,97 @@
+"""启动耗时分析
+
+带 --import-times 参数启动时，记录每个模块的导入耗时（格式与
+python -X importtime 相同，打包后的 exe 中同样可用），以及托盘图标、
+窗口显示等启动里程碑的时间，事件循环开始后输出到标准错误。
+
+环境变量 FOCUS_TIMER_STARTUP_FD 为一个已打开的文件描述符时，每个里程碑在
+发生时立即写入一行到该描述符，供 bench_startup.py 从进程外部计时（不影响
+--import-times）。
+"""
+import builtins
+import os
+import sys
+import time
+
+IMPORT_TIMES_FLAG = "--import-times"
+STARTUP_FD_ENV = "FOCUS_TIMER_STARTUP_FD"
+
+_process_start = time.perf_counter()
+_import_timer = None
+_marks = []
+_notify_fd = int(os.environ[STARTUP_FD_ENV]) if os.environ.get(STARTUP_FD_ENV, "").isdigit() else None
+
+
+class ImportTimer:
+    """包装 builtins.__import__，记录每个模块首次导入的自身耗时和累计耗时"""
+
+    def __init__(self):
+        self.records = []     # (嵌套深度, 模块名, 自身耗时us, 累计耗时us)
+        self._stack = []      # 每层已导入子模块的累计耗时
+        self._original_import = None
+
+    def install(self):
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._timed_import
+
+    def uninstall(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level or name in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+        depth = len(self._stack)
+        self._stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            cumulative_us = (time.perf_counter() - start) * 1e6
+            children_us = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += cumulative_us
+            self.records.append((depth, name, cumulative_us - children_us, cumulative_us))
+
+
+def install_if_requested(argv=None):
+    """命令行带有 --import-times 时开始记录导入耗时，需在导入 PyQt5 之前调用"""
+    global _import_timer
+    argv = sys.argv if argv is None else argv
+    if IMPORT_TIMES_FLAG in argv and _import_timer is None:
+        _import_timer = ImportTimer()
+        _import_timer.install()
+
+
+def enabled():
+    return _import_timer is not None
+
+
+def mark(label):
+    """记录一个启动里程碑（自进程开始计时的毫秒数）"""
+    if _import_timer is not None:
+        _marks.append((label, (time.perf_counter() - _process_start) * 1000))
+    if _notify_fd is not None:
+        try:
+            os.write(_notify_fd, (label + "\n").encode("utf-8"))
+        except OSError:
+            pass
+
+
+def report(stream=None):
+    """停止记录并输出导入耗时明细和启动里程碑"""
+    if _import_timer is None:
+        return
+    stream = stream or sys.stderr
+    _import_timer.uninstall()
+    print("import time: self [us] | cumulative | imported package", file=stream)
+    for depth, name, self_us, cumulative_us in _import_timer.records:
+        print(f"import time: {self_us:9.0f} | {cumulative_us:10.0f} | {'  ' * depth}{name}", file=stream)
+    top_level = sorted((r for r in _import_timer.records if r[0] == 0), key=lambda r: -r[3])
+    print("\n最耗时的顶层导入:", file=stream)
+    for _, name, _, cumulative_us in top_level[:10]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}", file=stream)
+    print("\n启动里程碑:", file=stream)
+    for label, elapsed_ms in _marks:
+        print(f"  {elapsed_ms:8.1f} ms  {label}", file=stream)
@@ -0,0 +1,132 @@
+"""专注统计：每日/每周专注时长、休息完成率和连续专注天数
+
+统计只读取 history 中由触发器维护的按天汇总表 daily_totals，
+几年的记录也只有几千行。汇总按列整体计算：安装了 NumPy 时使用向量运算，
+否则退回到基于 array 的逐列扫描，两者结果相同。
+"""
+import datetime
+from array import array
+
+from timer_engine import PHASE_LONG_BREAK, PHASE_SHORT_BREAK, PHASE_WORKING
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+PHASES = (PHASE_WORKING, PHASE_SHORT_BREAK, PHASE_LONG_BREAK)
+BREAK_PHASES = (PHASE_SHORT_BREAK, PHASE_LONG_BREAK)
+
+
+class DailyColumns:
+    """daily_totals 的列式表示，每列一个数组，phase 存为 PHASES 中的序号"""
+
+    def __init__(self, rows=()):
+        self.day = array("l")
+        self.phase = array("b")
+        self.intervals = array("l")
+        self.completed = array("l")
+        self.seconds = array("d")
+        for day, phase, intervals, completed, seconds in rows:
+            if phase not in PHASES:
+                continue
+            self.day.append(day)
+            self.phase.append(PHASES.index(phase))
+            self.intervals.append(intervals)
+            self.completed.append(completed)
+            self.seconds.append(seconds)
+
+    def __len__(self):
+        return len(self.day)
+
+    @classmethod
+    def load(cls, conn, since_day=0):
+        """从数据库读取 since_day（日期序数）之后的汇总"""
+        return cls(conn.execute(
+            "SELECT day, phase, intervals, completed, seconds FROM daily_totals WHERE day >= ?",
+            (since_day,)))
+
+
+def _daily_sums(columns, first_day, n_days):
+    """按天累加，返回 {phase: (完成的阶段数, 阶段总数, 秒数)}，每项为长度 n_days 的序列"""
+    result = {}
+    if np is not None and len(columns):
+        day = np.frombuffer(columns.day, dtype=columns.day.typecode) - first_day
+        phase = np.frombuffer(columns.phase, dtype=columns.phase.typecode)
+        values = [np.frombuffer(column, dtype=column.typecode)
+                  for column in (columns.completed, columns.intervals, columns.seconds)]
+        in_range = (day >= 0) & (day < n_days)
+        for code, name in enumerate(PHASES):
+            mask = in_range & (phase == code)
+            result[name] = tuple(np.bincount(day[mask], weights=column[mask], minlength=n_days)
+                                 for column in values)
+        return result
+
+    for name in PHASES:
+        result[name] = (array("d", [0.0]) * n_days, array("d", [0.0]) * n_days, array("d", [0.0]) * n_days)
+    for i in range(len(columns)):
+        offset = columns.day[i] - first_day
+        if 0 <= offset < n_days:
+            completed, intervals, seconds = result[PHASES[columns.phase[i]]]
+            completed[offset] += columns.completed[i]
+            intervals[offset] += columns.intervals[i]
+            seconds[offset] += columns.seconds[i]
+    return result
+
+
+def _total(values):
+    return values.sum() if np is not None and isinstance(values, np.ndarray) else sum(values)
+
+
+def _streaks(active_days):
+    """返回 (截至最后一天的连续天数, 最长连续天数)；今天还没有专注时从昨天算起"""
+    best = run = 0
+    for active in active_days:
+        run = run + 1 if active else 0
+        best = max(best, run)
+    current = run
+    if not current and len(active_days) > 1:
+        for active in reversed(active_days[:-1]):
+            if not active:
+                break
+            current += 1
+    return current, best
+
+
+def summarize(columns, today=None, chart_days=14):
+    """计算统计界面需要的全部数字
+
+    专注秒数包括被停止的工作阶段已经进行的时间，work_intervals 和连续天数只计完成的
+    工作阶段。返回的 daily_focus_s 为最近 chart_days 天（含今天）每天的专注秒数。
+    """
+    today = today or datetime.date.today()
+    today_day = today.toordinal()
+    first_day = min(min(columns.day, default=today_day), today_day - chart_days + 1)
+    n_days = today_day - first_day + 1
+    sums = _daily_sums(columns, first_day, n_days)
+
+    focus_s = sums[PHASE_WORKING][2]
+    week_start = n_days - 1 - today.weekday()  # 本周一
+    breaks_completed = sum(_total(sums[phase][0]) for phase in BREAK_PHASES)
+    breaks_total = sum(_total(sums[phase][1]) for phase in BREAK_PHASES)
+    current_streak, best_streak = _streaks([s > 0 for s in sums[PHASE_WORKING][0]])
+    return {
+        "today_focus_s": float(focus_s[-1]),
+        "week_focus_s": float(_total(focus_s[max(0, week_start):])),
+        "total_focus_s": float(_total(focus_s)),
+        "work_intervals": int(_total(sums[PHASE_WORKING][0])),
+        "break_compliance": float(breaks_completed / breaks_total) if breaks_total else None,
+        "skipped_breaks": int(breaks_total - breaks_completed),
+        "current_streak_days": current_streak,
+        "best_streak_days": best_streak,
+        "daily_focus_s": [float(s) for s in focus_s[-chart_days:]],
+    }
+
+
+def load_summary(store, today=None, chart_days=14):
+    """打开 store 的数据库并返回 summarize() 的结果"""
+    conn = store.connect()
+    try:
+        return summarize(DailyColumns.load(conn), today, chart_days)
+    finally:
+        conn.close()
@@ -0,0 +1,78 @@
+"""统计窗口：显示 stats.summarize() 的结果和最近两周的每日专注时长"""
+import datetime
+
+from PyQt5.QtCore import QRectF, Qt
+from PyQt5.QtGui import QColor, QFont, QPainter
+from PyQt5.QtWidgets import QDialog, QFormLayout, QLabel, QVBoxLayout, QWidget
+
+from timer_engine import format_total_seconds
+
+
+class DailyFocusChart(QWidget):
+    """每日专注时长柱状图，最后一根柱子为今天"""
+    BAR_COLOR = QColor(76, 175, 80)
+    TODAY_COLOR = QColor(33, 150, 243)
+    LABEL_HEIGHT = 16
+
+    def __init__(self, daily_focus_s, parent=None):
+        super().__init__(parent)
+        self.daily_focus_s = daily_focus_s
+        self.setMinimumSize(320, 140)
+        self._label_font = QFont("Arial", 8)
+
+    def paintEvent(self, event):
+        if not self.daily_focus_s:
+            return
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setFont(self._label_font)
+
+        n = len(self.daily_focus_s)
+        peak = max(self.daily_focus_s) or 1
+        slot = self.width() / n
+        chart_height = self.height() - self.LABEL_HEIGHT
+        first_day = datetime.date.today() - datetime.timedelta(days=n - 1)
+        for i, seconds in enumerate(self.daily_focus_s):
+            bar_height = chart_height * seconds / peak
+            painter.fillRect(QRectF(i * slot + slot * 0.15, chart_height - bar_height, slot * 0.7, bar_height),
+                             self.TODAY_COLOR if i == n - 1 else self.BAR_COLOR)
+            day = first_day + datetime.timedelta(days=i)
+            painter.drawText(QRectF(i * slot, chart_height, slot, self.LABEL_HEIGHT),
+                             Qt.AlignCenter, str(day.day))
+
+
+class StatsDialog(QDialog):
+    TITLE = "专注统计"
+    TODAY_LABEL = "今日专注:"
+    WEEK_LABEL = "本周专注:"
+    TOTAL_LABEL = "累计专注:"
+    INTERVALS_LABEL = "完成的工作间隔:"
+    COMPLIANCE_LABEL = "休息完成率:"
+    STREAK_LABEL = "连续专注:"
+    STREAK_TEXT = "{current} 天（最长 {best} 天）"
+    COMPLIANCE_TEXT = "{percent:.0f}%（跳过 {skipped} 次）"
+    NO_DATA_TEXT = "暂无记录"
+    CHART_TITLE = "最近 {days} 天"
+
+    def __init__(self, summary, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(self.TITLE)
+        layout = QVBoxLayout(self)
+
+        form = QFormLayout()
+        form.addRow(self.TODAY_LABEL, QLabel(format_total_seconds(summary["today_focus_s"])))
+        form.addRow(self.WEEK_LABEL, QLabel(format_total_seconds(summary["week_focus_s"])))
+        form.addRow(self.TOTAL_LABEL, QLabel(format_total_seconds(summary["total_focus_s"])))
+        form.addRow(self.INTERVALS_LABEL, QLabel(str(summary["work_intervals"])))
+        if summary["break_compliance"] is None:
+            compliance_text = self.NO_DATA_TEXT
+        else:
+            compliance_text = self.COMPLIANCE_TEXT.format(percent=summary["break_compliance"] * 100,
+                                                          skipped=summary["skipped_breaks"])
+        form.addRow(self.COMPLIANCE_LABEL, QLabel(compliance_text))
+        form.addRow(self.STREAK_LABEL, QLabel(self.STREAK_TEXT.format(current=summary["current_streak_days"],
+                                                                      best=summary["best_streak_days"])))
+        layout.addLayout(form)
+
+        layout.addWidget(QLabel(self.CHART_TITLE.format(days=len(summary["daily_focus_s"]))))
+        layout.addWidget(DailyFocusChart(summary["daily_focus_s"]), 1)
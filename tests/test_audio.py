@@ -0,0 +1,110 @@
+"""AudioWorker 队列策略的单元测试：用不依赖 pygame 的假声音，播放线程先被第一个声音阻塞"""
+import threading
+import unittest
+
+from audio import AudioWorker
+
+
+class FakeSound:
+
+    def __init__(self, name, log, gate=None):
+        self.name = name
+        self.log = log
+        self.gate = gate
+
+    def play(self):
+        self.log.append(("play", self.name))
+        if self.gate is not None:
+            self.gate.wait(2)
+
+    def stop(self):
+        self.log.append(("stop", self.name))
+
+    def set_volume(self, volume):
+        self.log.append(("set_volume", self.name, volume))
+
+
+class FakeSoundBank:
+
+    def __init__(self, names):
+        self.log = []
+        self.gate = threading.Event()
+        self.started = threading.Event()
+        self.sounds = {name: FakeSound(name, self.log) for name in names}
+        self.sounds["block"] = FakeSound("block", self.log, self.gate)
+
+    def get(self, name):
+        if name == "block":
+            self.started.set()
+        return self.sounds.get(name)
+
+
+class AudioWorkerQueueTest(unittest.TestCase):
+
+    def setUp(self):
+        self.bank = FakeSoundBank(["ding", "break", "a", "b", "c", "d", "e"])
+        self.worker = AudioWorker(self.bank, max_pending=4)
+        # 播放线程正在播放 block 时，之后的命令都留在队列中
+        self.worker.play("block")
+        self.assertTrue(self.bank.started.wait(2))
+
+    def tearDown(self):
+        self.bank.gate.set()
+
+    def queued(self):
+        with self.worker._cond:
+            return list(self.worker._queue)
+
+    def drain(self):
+        """放行播放线程，等队列执行完后返回执行记录（不含 block）"""
+        done = threading.Event()
+        self.bank.gate.set()
+        self.worker.fallback = lambda name: done.set()
+        self.worker.play("marker")  # 不存在的声音，执行到它时调用 fallback
+        self.assertTrue(done.wait(2))
+        return [entry for entry in self.bank.log if entry[1] != "block"]
+
+    def test_duplicate_play_merged(self):
+        self.worker.play("ding")
+        self.worker.play("break")
+        self.worker.play("ding")
+        self.assertEqual(self.queued(), [("play", "ding"), ("play", "break")])
+        self.assertEqual(self.worker.dropped, 1)
+        self.assertEqual(self.drain(), [("play", "ding"), ("play", "break")])
+
+    def test_oldest_play_evicted(self):
+        for name in "abcde":
+            self.worker.play(name)
+        self.assertEqual(self.queued(), [("play", name) for name in "bcde"])
+        self.assertEqual(self.worker.dropped, 1)
+
+    def test_stop_clears_plays_and_is_kept_once(self):
+        self.worker.set_volume(0.5)
+        self.worker.play("ding")
+        self.worker.stop()
+        self.worker.play("break")
+        self.worker.stop()
+        # 控制命令不受 max_pending 限制，也不会被 play 挤掉
+        for name in "abcd":
+            self.worker.play(name)
+        queued = self.queued()
+        self.assertEqual(queued[:2], [("set_volume", 0.5), ("stop", None)])
+        self.assertEqual(queued.count(("stop", None)), 1)
+        self.assertEqual(queued[2:], [("play", name) for name in "abcd"])
+        self.assertEqual(self.worker.dropped, 3)  # ding、break 和第一次 stop
+
+    def test_only_last_volume_kept(self):
+        for volume in (0.2, 0.4, 0.6):
+            self.worker.set_volume(volume)
+        self.worker.play("ding")
+        self.assertEqual(self.queued(), [("set_volume", 0.6), ("play", "ding")])
+        self.assertEqual(self.worker.dropped, 2)
+        log = self.drain()
+        self.assertNotIn(0.2, [entry[-1] for entry in log])
+        self.assertEqual(self.worker.volume, 0.6)
+        self.assertIn(("set_volume", "ding", 0.6), log)
+        self.assertEqual(log[-1], ("play", "ding"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+"""history 的单元测试：批量写入、表结构升级和按天汇总的触发器"""
+import datetime
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+
+from history import SCHEMA, SCHEMA_VERSION, HistoryStore
+from timer_engine import PHASE_SHORT_BREAK, PHASE_WORKING
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def local_day(ts):
+    return datetime.date.fromtimestamp(ts).toordinal()
+
+
+def local_noon(days_ago=0):
+    day = datetime.date.today() - datetime.timedelta(days=days_ago)
+    return datetime.datetime.combine(day, datetime.time(12)).timestamp()
+
+
+class HistoryStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, "history.sqlite3")
+        self.stores = []
+
+    def tearDown(self):
+        for store in self.stores:
+            store.close()
+        self._tmp.cleanup()
+
+    def make_store(self, flush_interval_s=60.0):
+        store = HistoryStore(self.path)
+        store.FLUSH_INTERVAL_S = flush_interval_s
+        self.stores.append(store)
+        return store
+
+    def query(self, sql, params=()):
+        conn = sqlite3.connect(self.path)
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def add_intervals(self, store, count, started_at=None):
+        started_at = time.time() if started_at is None else started_at
+        for i in range(count):
+            store.add_interval(1, PHASE_WORKING, started_at + i, 60, 60.0, True)
+
+    def test_nothing_written_until_first_row(self):
+        self.make_store()
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_batch_size_triggers_write(self):
+        store = self.make_store()
+        self.add_intervals(store, store.BATCH_SIZE - 1)
+        time.sleep(0.2)
+        self.assertEqual(store.written, 0)
+        self.add_intervals(store, 1)
+        self.assertTrue(wait_until(lambda: store.written == store.BATCH_SIZE))
+        self.assertEqual(self.query("SELECT COUNT(*) FROM intervals"), [(store.BATCH_SIZE,)])
+
+    def test_flush_interval_triggers_write(self):
+        store = self.make_store(flush_interval_s=0.2)
+        self.add_intervals(store, 3)
+        self.assertEqual(store.written, 0)
+        self.assertTrue(wait_until(lambda: store.written == 3))
+        self.assertEqual(self.query("SELECT COUNT(*) FROM intervals"), [(3,)])
+
+    def test_close_flushes_pending_rows(self):
+        store = self.make_store()
+        store.add_session(1, time.time(), 42, 600)
+        self.add_intervals(store, 5)
+        store.finish_session(1)
+        store.close()
+        self.assertEqual(store.written, 7)
+        self.assertEqual(self.query("SELECT id, seed, planned_s, finished FROM sessions"), [(1, 42, 600, 1)])
+        self.assertEqual(self.query("SELECT COUNT(*) FROM intervals"), [(5,)])
+
+    def test_rows_after_close_are_dropped(self):
+        store = self.make_store()
+        self.add_intervals(store, 1)
+        store.close()
+        self.add_intervals(store, 1)
+        self.assertEqual(self.query("SELECT COUNT(*) FROM intervals"), [(1,)])
+
+    def test_daily_totals_trigger(self):
+        store = self.make_store()
+        now, yesterday = local_noon(), local_noon(1)
+        store.add_interval(1, PHASE_WORKING, now, 300, 300.0, True)
+        store.add_interval(1, PHASE_WORKING, now, 300, 120.5, False)
+        store.add_interval(1, PHASE_SHORT_BREAK, now, 10, 10.0, True)
+        store.add_interval(1, PHASE_WORKING, yesterday, 240, 240.0, True)
+        store.close()
+        rows = self.query("SELECT day, phase, intervals, completed, seconds FROM daily_totals ORDER BY day, phase")
+        self.assertEqual(rows, sorted([
+            (local_day(yesterday), PHASE_WORKING, 1, 1, 240.0),
+            (local_day(now), PHASE_SHORT_BREAK, 1, 1, 10.0),
+            (local_day(now), PHASE_WORKING, 2, 1, 420.5),
+        ]))
+
+    def test_migrates_v1_database(self):
+        # 1 版只有 sessions 和 intervals 两张表，升级时根据已有记录生成 daily_totals
+        now = local_noon()
+        conn = sqlite3.connect(self.path)
+        conn.executescript(SCHEMA)
+        conn.executemany("INSERT INTO intervals (session_id, phase, started_at, planned_s, elapsed_s, completed) "
+                         "VALUES (1, ?, ?, ?, ?, ?)",
+                         [(PHASE_WORKING, now, 300, 300.0, 1), (PHASE_WORKING, now, 300, 30.0, 0),
+                          (PHASE_SHORT_BREAK, now, 10, 10.0, 1)])
+        conn.execute("PRAGMA user_version = 1")
+        conn.commit()
+        conn.close()
+
+        store = self.make_store()
+        store.connect().close()
+        self.assertEqual(self.query("PRAGMA user_version"), [(SCHEMA_VERSION,)])
+        self.assertEqual(self.query("SELECT phase, intervals, completed, seconds FROM daily_totals WHERE day = ? "
+                                    "ORDER BY phase", (local_day(now),)),
+                         [(PHASE_SHORT_BREAK, 1, 1, 10.0), (PHASE_WORKING, 2, 1, 330.0)])
+
+        # 升级后新插入的记录由触发器累加
+        store.add_interval(1, PHASE_WORKING, now, 300, 300.0, True)
+        store.close()
+        self.assertEqual(self.query("SELECT intervals, completed, seconds FROM daily_totals "
+                                    "WHERE day = ? AND phase = ?", (local_day(now), PHASE_WORKING)),
+                         [(3, 2, 630.0)])
+
+    def test_failed_migration_rolls_back(self):
+        # 1 版数据库中的 intervals 缺少 elapsed_s 列，生成汇总时出错，已建的表和触发器都应回滚
+        conn = sqlite3.connect(self.path)
+        conn.execute("CREATE TABLE intervals (id INTEGER PRIMARY KEY, phase TEXT, started_at REAL)")
+        conn.execute("PRAGMA user_version = 1")
+        conn.commit()
+        conn.close()
+
+        with self.assertRaises(sqlite3.OperationalError):
+            self.make_store().connect()
+        self.assertEqual(self.query("PRAGMA user_version"), [(1,)])
+        self.assertEqual(self.query("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger') "
+                                    "ORDER BY name"), [("intervals",)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+"""metrics 的单元测试：通过 Unix 套接字抓取指标，检查开始/停止前后的变化"""
+import os
+import socket
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from metrics import MetricsExporter
+from timer_engine import SessionEngine
+
+
+def scrape(path):
+    """GET /metrics，返回 {指标名{标签}: 数值}"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.settimeout(2)
+        conn.connect(path)
+        conn.sendall(b"GET /metrics HTTP/1.0\r\n\r\n")
+        chunks = []
+        while True:
+            data = conn.recv(65536)
+            if not data:
+                break
+            chunks.append(data)
+    head, _, body = b"".join(chunks).decode().partition("\r\n\r\n")
+    assert head.startswith("HTTP/1.0 200"), head
+    samples = {}
+    for line in body.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "需要 Unix 套接字")
+class MetricsExporterTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, "metrics.sock")
+        self.exporter = MetricsExporter(self.path)
+        self.engine = SessionEngine()
+        self.engine.configure(1, 1, 10, 1, 1, seed=1)  # 工作 60 秒
+        self.exporter.attach(self.engine)
+
+    def tearDown(self):
+        self.engine.stop()
+        self.engine.join(2)
+        self.exporter.close()
+        self._tmp.cleanup()
+
+    def test_gauges_follow_start_and_stop(self):
+        idle = scrape(self.path)
+        self.assertEqual(idle['focus_timer_phase{phase="idle"}'], 1)
+        self.assertEqual(idle['focus_timer_phase{phase="working"}'], 0)
+        self.assertEqual(idle["focus_timer_phase_remaining_seconds"], 0)
+        self.assertEqual(idle["focus_timer_sessions_total"], 0)
+        self.assertNotIn("focus_timer_repaints_total", idle)  # 没有进度条时不导出
+        self.assertGreater(idle["process_threads"], 0)
+
+        ticked = threading.Event()
+
+        class TickWaiter:
+            def on_tick(self, event):
+                ticked.set()
+        self.engine.listeners.append(TickWaiter())
+        self.engine.start()
+        self.assertTrue(ticked.wait(2))
+        running = scrape(self.path)
+        self.assertEqual(running['focus_timer_phase{phase="idle"}'], 0)
+        self.assertEqual(running['focus_timer_phase{phase="working"}'], 1)
+        self.assertGreater(running["focus_timer_phase_remaining_seconds"], 55)
+        # 两个值来自引擎状态和最近一次刷新，抓取时恰好跨过秒边界可能相差 1 秒
+        self.assertAlmostEqual(running["focus_timer_session_remaining_seconds"],
+                               running["focus_timer_phase_remaining_seconds"] + 10, delta=1)
+        self.assertEqual(running["focus_timer_sessions_total"], 1)
+        self.assertGreaterEqual(running["focus_timer_ticks_total"], 1)
+
+        self.engine.stop()
+        self.engine.join(2)
+        stopped = scrape(self.path)
+        self.assertEqual(stopped['focus_timer_phase{phase="idle"}'], 1)
+        self.assertEqual(stopped['focus_timer_phase{phase="working"}'], 0)
+        self.assertEqual(stopped["focus_timer_phase_remaining_seconds"], 0)
+        self.assertEqual(stopped["focus_timer_session_remaining_seconds"], 0)
+        self.assertEqual(stopped['focus_timer_phases_total{phase="working",outcome="stopped"}'], 1)
+        self.assertEqual(stopped['focus_timer_phases_total{phase="working",outcome="completed"}'], 0)
+        self.assertEqual(stopped["focus_timer_sessions_total"], 1)
+
+    def test_resident_memory(self):
+        with mock.patch("metrics.current_rss_kb", return_value=2048):
+            self.assertEqual(scrape(self.path)["process_resident_memory_bytes"], 2048 * 1024)
+        # 无法获取当前常驻内存的平台不导出这一项，而不是导出峰值或 0
+        with mock.patch("metrics.current_rss_kb", return_value=None):
+            self.assertNotIn("process_resident_memory_bytes", scrape(self.path))
+
+    def test_unknown_path_is_404(self):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.settimeout(2)
+            conn.connect(self.path)
+            conn.sendall(b"GET /other HTTP/1.0\r\n\r\n")
+            self.assertTrue(conn.recv(1024).startswith(b"HTTP/1.0 404"))
+
+
+if __name__ == "__main__":
+    unittest.main()
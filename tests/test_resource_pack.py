@@ -0,0 +1,90 @@
+"""resource_pack 的单元测试：打包后读回名称、内容和切片，以及损坏的资源包被拒绝"""
+import os
+import tempfile
+import unittest
+
+from resource_pack import ALIGNMENT, HEADER, ResourcePack, build_pack
+
+CONTENTS = {
+    "icons/clock.png": b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 3,
+    "sounds/ding.mp3": b"ID3" + b"\xff\xfb" * 500,
+    "sounds/提示.mp3": b"x",  # 非 ASCII 名称，长度不是对齐的整数倍
+    "empty.txt": b"",
+}
+
+
+class ResourcePackTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self._tmp.name, "assets")
+        for name, data in CONTENTS.items():
+            path = os.path.join(self.root, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(data)
+        self.path = os.path.join(self._tmp.name, "resources.pack")
+        self.assertEqual(build_pack(self.root, list(CONTENTS), self.path), len(CONTENTS))
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def open_pack(self):
+        pack = ResourcePack(self.path)
+        self.addCleanup(pack.close)
+        return pack
+
+    def write_corrupt(self, data):
+        with open(self.path, "wb") as f:
+            f.write(data)
+
+    def test_round_trip(self):
+        pack = self.open_pack()
+        self.assertEqual(set(pack.entries), set(CONTENTS))
+        for name, data in CONTENTS.items():
+            self.assertIn(name, pack)
+            view = pack.get(name)
+            self.assertIsInstance(view, memoryview)
+            self.assertEqual(bytes(view), data)
+            self.assertEqual(pack.entries[name][0] % ALIGNMENT, 0)
+            view.release()
+        self.assertEqual(pack.format("icons/clock.png"), "png")
+        self.assertEqual(pack.format("sounds/ding.mp3"), "mp3")
+        self.assertNotIn("sounds/break.mp3", pack)
+        self.assertIsNone(pack.get("sounds/break.mp3"))
+
+    def test_memoryview_slices(self):
+        pack = self.open_pack()
+        data = CONTENTS["icons/clock.png"]
+        view = pack.get("icons/clock.png")
+        self.assertEqual(bytes(view[:8]), data[:8])
+        self.assertEqual(bytes(view[100:300]), data[100:300])
+        self.assertEqual(bytes(view[-5:]), data[-5:])
+        self.assertEqual(view[8], data[8])
+        self.assertTrue(view.readonly)
+        view.release()
+
+    def test_truncated_pack_rejected(self):
+        with open(self.path, "rb") as f:
+            data = f.read()
+        index_end = data.index(CONTENTS["icons/clock.png"][:8])
+        for length in (HEADER.size - 1, HEADER.size + 5, index_end, len(data) - 1):
+            self.write_corrupt(data[:length])
+            with self.assertRaises(ValueError, msg=f"截断到 {length} 字节"):
+                ResourcePack(self.path)
+
+    def test_empty_file_rejected(self):
+        self.write_corrupt(b"")
+        with self.assertRaises(ValueError):
+            ResourcePack(self.path)
+
+    def test_bad_magic_rejected(self):
+        with open(self.path, "rb") as f:
+            data = f.read()
+        self.write_corrupt(b"XXXX" + data[4:])
+        with self.assertRaises(ValueError):
+            ResourcePack(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+"""single_instance 的单元测试：同一进程中的两个 InstanceLock 分别扮演主实例和再次启动"""
+import os
+import queue
+import socket
+import tempfile
+import unittest
+from unittest import mock
+
+import single_instance
+from single_instance import CMD_SHOW, CMD_START, CMD_STOP, InstanceLock
+
+
+class InstanceLockTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.data_dir = self._tmp.name
+        self.locks = []
+
+    def tearDown(self):
+        for lock in self.locks:
+            lock.close()
+        self._tmp.cleanup()
+
+    def make_lock(self):
+        lock = InstanceLock(self.data_dir)
+        self.locks.append(lock)
+        return lock
+
+    def serve_primary(self):
+        primary = self.make_lock()
+        self.assertTrue(primary.acquire())
+        received = queue.Queue()
+        primary.serve(received.put)
+        return primary, received
+
+    def test_only_one_lock(self):
+        primary = self.make_lock()
+        second = self.make_lock()
+        self.assertTrue(primary.acquire())
+        self.assertFalse(second.acquire())
+        primary.close()
+        self.assertTrue(second.acquire())
+
+    def test_forward_round_trip(self):
+        primary, received = self.serve_primary()
+        second = self.make_lock()
+        self.assertFalse(second.acquire())
+        for command in (CMD_SHOW, CMD_START, CMD_STOP):
+            self.assertTrue(second.forward(command, timeout=1))
+            self.assertEqual(received.get(timeout=1), command)
+        self.assertEqual(primary.commands_handled, 3)
+
+    def test_wrong_token_rejected(self):
+        primary, received = self.serve_primary()
+        with open(primary.address_path) as f:
+            family, address, token = f.read().split()
+        self.assertEqual(family, "unix")
+        for message in (f"{'0' * len(token)} {CMD_START}\n", f"{token} reboot\n"):
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+                conn.settimeout(1)
+                conn.connect(address)
+                conn.sendall(message.encode())
+                self.assertEqual(conn.recv(16), b"error\n")
+        self.assertTrue(received.empty())
+        self.assertEqual(primary.commands_handled, 0)
+
+    def test_stale_socket_and_address_replaced(self):
+        # 上一个实例崩溃后留下的套接字文件和地址文件
+        with open(os.path.join(self.data_dir, single_instance.SOCKET_FILE_NAME), "w"):
+            pass
+        with open(os.path.join(self.data_dir, single_instance.ADDRESS_FILE_NAME), "w") as f:
+            f.write(f"unix {os.path.join(self.data_dir, 'gone.sock')} {'0' * 32}\n")
+        primary, received = self.serve_primary()
+        self.assertTrue(self.make_lock().forward(CMD_STOP, timeout=1))
+        self.assertEqual(received.get(timeout=1), CMD_STOP)
+
+    def test_forward_gives_up_without_server(self):
+        primary = self.make_lock()
+        self.assertTrue(primary.acquire())
+        self.assertFalse(self.make_lock().forward(CMD_SHOW, timeout=0.1))
+
+    def ensure(self, argv):
+        with mock.patch.dict(os.environ, {"FOCUS_TIMER_HOME": self.data_dir}), \
+                mock.patch.object(single_instance, "_instance", None):
+            single_instance.ensure_single_instance(argv)
+            return single_instance._instance
+
+    def test_ensure_single_instance_forwards_and_exits(self):
+        primary = self.ensure([])
+        self.assertIsNotNone(primary)
+        self.locks.append(primary)
+        received = queue.Queue()
+        primary.serve(received.put)
+        with self.assertRaises(SystemExit) as cm:
+            self.ensure(["--start"])
+        self.assertEqual(cm.exception.code, 0)
+        self.assertEqual(received.get(timeout=1), CMD_START)
+
+    def test_ensure_single_instance_never_runs_unlocked(self):
+        # 主实例持有锁但一直没有开始接收命令：以非零状态退出，而不是作为第二个实例启动
+        primary = self.make_lock()
+        self.assertTrue(primary.acquire())
+        with mock.patch.object(single_instance, "STARTUP_WAIT_S", 0.1), \
+                self.assertRaises(SystemExit) as cm:
+            self.ensure(["--show"])
+        self.assertEqual(cm.exception.code, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+"""stats 的单元测试：NumPy 与 array 两种实现结果相同，连续天数和本周起点"""
+import datetime
+import random
+import unittest
+from unittest import mock
+
+import stats
+from stats import DailyColumns, summarize
+from timer_engine import PHASE_LONG_BREAK, PHASE_SHORT_BREAK, PHASE_WORKING
+
+WEDNESDAY = datetime.date(2026, 10, 14)
+
+
+def work(day, completed=1, intervals=None, seconds=None):
+    """某天（相对 WEDNESDAY 的天数）的工作阶段汇总行"""
+    intervals = completed if intervals is None else intervals
+    seconds = 300.0 * intervals if seconds is None else seconds
+    return (WEDNESDAY.toordinal() + day, PHASE_WORKING, intervals, completed, seconds)
+
+
+def summarize_without_numpy(columns, today=WEDNESDAY, chart_days=14):
+    with mock.patch.object(stats, "np", None):
+        return summarize(columns, today, chart_days)
+
+
+class SummarizeTest(unittest.TestCase):
+
+    @unittest.skipIf(stats.np is None, "需要 NumPy")
+    def test_numpy_matches_array_fallback(self):
+        rng = random.Random(7)
+        for _ in range(50):
+            rows = {}
+            for _ in range(rng.randrange(0, 40)):
+                day = WEDNESDAY.toordinal() - rng.randrange(0, 60)
+                phase = rng.choice((PHASE_WORKING, PHASE_SHORT_BREAK, PHASE_LONG_BREAK))
+                intervals = rng.randrange(1, 8)
+                rows[day, phase] = (day, phase, intervals, rng.randrange(0, intervals + 1),
+                                    rng.randrange(0, 3600) / 4)  # 可精确表示，累加顺序不影响结果
+            columns = DailyColumns(rows.values())
+            for chart_days in (1, 7, 14):
+                self.assertEqual(summarize(columns, WEDNESDAY, chart_days),
+                                 summarize_without_numpy(columns, WEDNESDAY, chart_days))
+
+    def test_empty(self):
+        summary = summarize_without_numpy(DailyColumns())
+        self.assertEqual(summary["total_focus_s"], 0)
+        self.assertIsNone(summary["break_compliance"])
+        self.assertEqual((summary["current_streak_days"], summary["best_streak_days"]), (0, 0))
+        self.assertEqual(summary["daily_focus_s"], [0.0] * 14)
+
+    def test_streaks_across_gaps(self):
+        # 前 9~7 天连续 3 天，前 5 天只有被停止的阶段（不算），前 2 天到昨天连续 2 天
+        columns = DailyColumns([work(-9), work(-8), work(-7), work(-5, completed=0, intervals=2),
+                                work(-2), work(-1)])
+        for summarize_fn in (summarize, summarize_without_numpy):
+            summary = summarize_fn(columns, WEDNESDAY)
+            # 今天还没有完成的工作阶段时从昨天算起
+            self.assertEqual((summary["current_streak_days"], summary["best_streak_days"]), (2, 3))
+            summary = summarize_fn(DailyColumns([work(-9), work(-8), work(-7), work(-2)]), WEDNESDAY)
+            self.assertEqual((summary["current_streak_days"], summary["best_streak_days"]), (0, 3))
+            summary = summarize_fn(DailyColumns([work(-1), work(0)]), WEDNESDAY)
+            self.assertEqual((summary["current_streak_days"], summary["best_streak_days"]), (2, 2))
+
+    def test_week_starts_on_monday(self):
+        # 前 10 天和前 3 天是周日，前 9 天和前 2 天是周一
+        columns = DailyColumns([work(day, seconds=seconds) for day, seconds in
+                                ((-10, 1.0), (-9, 2.0), (-3, 4.0), (-2, 8.0), (-1, 16.0), (0, 32.0))])
+        monday = WEDNESDAY - datetime.timedelta(days=2)
+        sunday = WEDNESDAY - datetime.timedelta(days=3)
+        for summarize_fn in (summarize, summarize_without_numpy):
+            self.assertEqual(summarize_fn(columns, WEDNESDAY)["week_focus_s"], 8 + 16 + 32)
+            self.assertEqual(summarize_fn(columns, monday)["week_focus_s"], 8)
+            # 周日：从本周一算起的整周，不含前一周的周日和之后的日期
+            summary = summarize_fn(columns, sunday)
+            self.assertEqual(summary["week_focus_s"], 2 + 4)
+            self.assertEqual(summary["today_focus_s"], 4)
+            self.assertEqual(summary["total_focus_s"], 1 + 2 + 4)
+
+    def test_stopped_intervals_count_as_focus_time(self):
+        columns = DailyColumns([work(0, completed=1, intervals=3, seconds=500.0),
+                                (WEDNESDAY.toordinal(), PHASE_SHORT_BREAK, 4, 3, 40.0)])
+        for summarize_fn in (summarize, summarize_without_numpy):
+            summary = summarize_fn(columns, WEDNESDAY)
+            self.assertEqual(summary["today_focus_s"], 500.0)
+            self.assertEqual(summary["work_intervals"], 1)
+            self.assertEqual(summary["break_compliance"], 0.75)
+            self.assertEqual(summary["skipped_breaks"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
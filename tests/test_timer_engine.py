@@ -0,0 +1,302 @@
+"""timer_engine 的单元测试：用 SimulatedClock 快进，不需要 PyQt5 / pygame
+
+运行: python -m pytest tests（或 python -m unittest discover tests）
+"""
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+
+from history import HistoryRecorder, HistoryStore
+from timer_engine import (CUE_BREAK, CUE_DING, PHASE_IDLE, PHASE_LONG_BREAK, PHASE_SHORT_BREAK,
+                          PHASE_WORKING, SUSPEND_CONTINUE, SUSPEND_PAUSE, SUSPEND_RESTART,
+                          SessionEngine, SessionSchedule, SimulatedClock, SystemClock)
+
+
+class SlowWakeClock(SystemClock):
+    """真实时钟，但被停止后过一会儿才醒来，用于放大停止后立即重新开始时的竞争"""
+
+    def wait(self, stop_event, timeout):
+        stopped = stop_event.wait(timeout)
+        if stopped:
+            time.sleep(0.05)
+        return stopped
+
+
+class NoBootClock(SimulatedClock):
+    """没有含休眠时间的时钟的平台"""
+
+    def boot_now(self):
+        return None
+
+
+class EventLog:
+    """按顺序记录引擎的所有回调"""
+
+    def __init__(self):
+        self.events = []
+
+    def __getattr__(self, name):
+        if not name.startswith("on_"):
+            raise AttributeError(name)
+        return lambda *args: self.events.append((name, args))
+
+    def named(self, name):
+        return [args for event, args in self.events if event == name]
+
+
+def make_engine(listener, suspend_policy=SUSPEND_PAUSE, settings=(1, 1, 10, 1, 1), clock=None):
+    """默认计划为 工作 60 秒 → 短休息 10 秒 → 长休息 60 秒"""
+    clock = clock or SimulatedClock()
+    engine = SessionEngine(clock=clock, suspend_policy=suspend_policy)
+    engine.configure(*settings, seed=1)
+    engine.listeners.append(listener)
+    return engine, clock
+
+
+class SessionScheduleTest(unittest.TestCase):
+    SETTINGS = ((1, 5, 10, 20, 90), (3, 3, 5, 5, 10), (1, 30, 60, 60, 240), (30, 30, 5, 5, 10))
+
+    def schedules(self):
+        for settings in self.SETTINGS:
+            for seed in range(20):
+                yield SessionSchedule(*settings, seed=seed)
+
+    def test_same_seed_same_plan(self):
+        a = SessionSchedule(1, 5, 10, 20, 90, seed=42)
+        b = SessionSchedule(1, 5, 10, 20, 90, seed=42)
+        self.assertEqual(list(a.durations), list(b.durations))
+
+    def test_structure(self):
+        for schedule in self.schedules():
+            phases = [schedule.phase(i) for i in range(len(schedule))]
+            self.assertEqual(phases[-1], PHASE_LONG_BREAK)
+            self.assertEqual(schedule.long_break_index, len(schedule) - 1)
+            self.assertEqual(phases[:-1], [PHASE_WORKING, PHASE_SHORT_BREAK] * (len(schedule) // 2))
+
+    def test_prefix_sums(self):
+        for schedule in self.schedules():
+            durations = list(schedule.durations)
+            for i in range(len(durations) + 1):
+                self.assertEqual(schedule.starts[i], sum(durations[:i]))
+            self.assertEqual(schedule.total_s, sum(durations))
+
+    def test_locate(self):
+        for schedule in self.schedules():
+            durations = list(schedule.durations)
+            self.assertEqual(schedule.locate(0), (0, durations[0]))
+            self.assertEqual(schedule.locate(-1), (0, durations[0]))
+            for i, start in enumerate(schedule.starts[:-1]):
+                # 恰好在阶段开始时属于新阶段，前一秒还在上一个阶段
+                self.assertEqual(schedule.locate(start), (i, durations[i]))
+                self.assertEqual(schedule.locate(start + durations[i] - 1), (i, 1))
+                if i:
+                    self.assertEqual(schedule.locate(start - 0.5), (i - 1, 0.5))
+            self.assertEqual(schedule.locate(schedule.total_s), (len(schedule), 0))
+            self.assertEqual(schedule.locate(schedule.total_s + 100), (len(schedule), 0))
+
+    def test_next_break_index(self):
+        for schedule in self.schedules():
+            for i in range(len(schedule)):
+                expected = next((j for j in range(i + 1, len(schedule))
+                                 if schedule.phase(j) != PHASE_WORKING), None)
+                self.assertEqual(schedule.next_break_index(i), expected)
+
+    def test_overall_remaining_and_seconds_until(self):
+        for schedule in self.schedules():
+            durations = list(schedule.durations)
+            long_break = schedule.long_break_index
+            for i in range(len(durations)):
+                for remaining_s in (0, 1, durations[i]):
+                    expected = remaining_s + sum(durations[i + 1:long_break]) if i < long_break else 0
+                    self.assertEqual(schedule.overall_remaining_s(i, remaining_s), expected)
+                    for target in range(i + 1, len(durations)):
+                        self.assertEqual(schedule.seconds_until(i, remaining_s, target),
+                                         remaining_s + sum(durations[i + 1:target]))
+
+
+class SessionEngineTest(unittest.TestCase):
+
+    def test_full_session(self):
+        log = EventLog()
+        engine, clock = make_engine(log)
+        engine.run()
+
+        self.assertEqual(log.named("on_phase_started"),
+                         [(PHASE_WORKING, 60), (PHASE_SHORT_BREAK, 10), (PHASE_LONG_BREAK, 60)])
+        finished = log.named("on_phase_finished")
+        self.assertEqual([(p, total, done) for p, total, _, done in finished],
+                         [(PHASE_WORKING, 60, True), (PHASE_SHORT_BREAK, 10, True), (PHASE_LONG_BREAK, 60, True)])
+        for _, total, elapsed_s, _ in finished:
+            self.assertAlmostEqual(elapsed_s, total, delta=0.01)
+        self.assertEqual(log.named("on_cue"), [(CUE_DING,), (CUE_DING,), (CUE_BREAK,), (CUE_DING,)])
+        self.assertEqual(log.named("on_session_finished"), [()])
+        self.assertAlmostEqual(clock.now(), 130, delta=0.01)
+        self.assertEqual(engine.state(), (False, PHASE_IDLE, 0))
+
+    def test_one_tick_per_second(self):
+        log = EventLog()
+        engine, _ = make_engine(log)
+        engine.run()
+        ticks = [args[0] for args in log.named("on_tick")]
+        working = [t.remaining_s for t in ticks if t.phase == PHASE_WORKING]
+        self.assertEqual(working, list(range(60, -1, -1)))
+        first = ticks[0]
+        self.assertEqual((first.overall_remaining_s, first.next_break_s, first.long_break_s), (70, 60, 70))
+        self.assertEqual(ticks[-1].overall_remaining_s, 0)
+
+    def test_stop_mid_phase(self):
+        log = EventLog()
+        engine, clock = make_engine(log)
+
+        def stop_at_40(event):
+            if event.remaining_s == 40:
+                engine.stop()
+        log.on_tick = stop_at_40
+        engine.run()
+
+        self.assertEqual(log.named("on_phase_started"), [(PHASE_WORKING, 60)])
+        [(phase, total, elapsed_s, completed)] = log.named("on_phase_finished")
+        self.assertEqual((phase, total, completed), (PHASE_WORKING, 60, False))
+        self.assertAlmostEqual(elapsed_s, 19, delta=0.01)  # 剩余 40 秒的刷新发生在第 19 秒
+        self.assertEqual(log.named("on_cue"), [])
+        self.assertEqual(log.named("on_session_finished"), [])
+        self.assertEqual(engine.state()[:2], (False, PHASE_IDLE))
+        self.assertIsNone(engine.current_tick())
+
+    def test_stop_from_other_thread(self):
+        log = EventLog()
+        engine = SessionEngine()
+        engine.configure(1, 1, 10, 1, 1, seed=1)
+        engine.listeners.append(log)
+        started = threading.Event()
+        log.on_phase_started = lambda phase, total: started.set()
+        engine.start()
+        self.assertTrue(started.wait(2))
+        engine.stop()
+        engine.join(2)
+        self.assertFalse(engine.timer_thread.is_alive())
+        [(phase, _, _, completed)] = log.named("on_phase_finished")
+        self.assertEqual((phase, completed), (PHASE_WORKING, False))
+
+    def test_restart_right_after_stop(self):
+        # 停止后立即开始一个不同计划的会话：被停止的阶段仍按旧会话记录
+        with tempfile.TemporaryDirectory() as tmp:
+            store = HistoryStore(os.path.join(tmp, "history.sqlite3"))
+            engine = SessionEngine(clock=SlowWakeClock())
+            engine.listeners.append(HistoryRecorder(store))
+            started = threading.Event()
+            log = EventLog()
+            log.on_phase_started = lambda phase, total: started.set()
+            engine.listeners.append(log)
+
+            engine.configure(1, 1, 10, 1, 1)  # 工作 60 秒
+            engine.start()
+            self.assertTrue(started.wait(2))
+            time.sleep(0.01)  # 两个会话的编号（毫秒时间戳）不同
+            engine.stop()
+            started.clear()
+            engine.configure(2, 2, 10, 1, 1)  # 工作 120 秒
+            engine.start()
+            self.assertTrue(started.wait(2))
+            engine.stop()
+            engine.join(2)
+            store.close()
+
+            conn = sqlite3.connect(store.path)
+            sessions = [row[0] for row in conn.execute("SELECT id FROM sessions ORDER BY id")]
+            rows = conn.execute("SELECT session_id, phase, planned_s, elapsed_s, completed "
+                                "FROM intervals ORDER BY id").fetchall()
+            conn.close()
+        self.assertEqual(len(sessions), 2)
+        self.assertEqual([row[:3] + row[4:] for row in rows],
+                         [(sessions[0], PHASE_WORKING, 60, 0), (sessions[1], PHASE_WORKING, 120, 0)])
+        for row in rows:
+            self.assertGreaterEqual(row[3], 0)
+            self.assertLess(row[3], 1)
+
+
+class SuspendPolicyTest(unittest.TestCase):
+    """第一个工作阶段剩余 50 秒（第 9 秒）的那次等待中休眠 30 秒，第 10 秒唤醒"""
+    SUSPEND_S = 30
+
+    def run_with_suspend(self, policy, monotonic_counts):
+        log = EventLog()
+        engine, clock = make_engine(log, suspend_policy=policy)
+        suspended = []
+
+        def on_tick(event):
+            log.events.append(("on_tick", (event,)))
+            if event.phase == PHASE_WORKING and event.remaining_s == 50 and not suspended:
+                suspended.append(True)
+                clock.simulate_suspend(self.SUSPEND_S, monotonic_counts)
+        log.on_tick = on_tick
+        engine.run()
+        [(suspended_s, shift_s)] = log.named("on_suspend_detected")
+        self.assertAlmostEqual(suspended_s, self.SUSPEND_S, delta=0.01)
+        working_elapsed_s = log.named("on_phase_finished")[0][2]
+        self.assertEqual(engine.drift_report()["suspend_count"], 1)
+        self.assertEqual(log.named("on_session_finished"), [()])
+        return working_elapsed_s, shift_s
+
+    def test_pause(self):
+        # 休眠时间不计入：单调时钟停止的平台不需要调整，计入了休眠的平台顺延截止时间
+        elapsed_s, shift_s = self.run_with_suspend(SUSPEND_PAUSE, monotonic_counts=False)
+        self.assertAlmostEqual(elapsed_s, 60, delta=0.01)
+        self.assertEqual(shift_s, 0)
+        elapsed_s, shift_s = self.run_with_suspend(SUSPEND_PAUSE, monotonic_counts=True)
+        self.assertAlmostEqual(elapsed_s, 60 + self.SUSPEND_S, delta=0.01)
+        self.assertAlmostEqual(shift_s, self.SUSPEND_S, delta=0.01)
+
+    def test_continue(self):
+        # 休眠时间照常计入：按墙上时间，阶段在唤醒后只剩 20 秒
+        elapsed_s, shift_s = self.run_with_suspend(SUSPEND_CONTINUE, monotonic_counts=False)
+        self.assertAlmostEqual(elapsed_s, 60 - self.SUSPEND_S, delta=0.01)
+        self.assertAlmostEqual(shift_s, -self.SUSPEND_S, delta=0.01)
+        elapsed_s, shift_s = self.run_with_suspend(SUSPEND_CONTINUE, monotonic_counts=True)
+        self.assertAlmostEqual(elapsed_s, 60, delta=0.01)
+        self.assertEqual(shift_s, 0)
+
+    def test_continue_past_deadline(self):
+        # 休眠比阶段剩余时间还长：唤醒后立即结束该阶段，下一阶段完整计时
+        log = EventLog()
+        engine, clock = make_engine(log, suspend_policy=SUSPEND_CONTINUE)
+
+        def on_tick(event):
+            log.events.append(("on_tick", (event,)))
+            if event.phase == PHASE_WORKING and event.remaining_s == 50 and not log.named("on_suspend_detected"):
+                clock.simulate_suspend(90)
+        log.on_tick = on_tick
+        engine.run()
+        finished = log.named("on_phase_finished")
+        self.assertTrue(all(completed for *_, completed in finished))
+        self.assertAlmostEqual(finished[0][2], 10, delta=0.01)  # 单调时钟上只经过了 10 秒
+        self.assertAlmostEqual(finished[1][2], 10, delta=0.01)
+
+    def test_restart(self):
+        # 被打断的阶段从唤醒时起重新完整计时
+        elapsed_s, _ = self.run_with_suspend(SUSPEND_RESTART, monotonic_counts=False)
+        self.assertAlmostEqual(elapsed_s, 10 + 60, delta=0.01)
+        elapsed_s, _ = self.run_with_suspend(SUSPEND_RESTART, monotonic_counts=True)
+        self.assertAlmostEqual(elapsed_s, 10 + self.SUSPEND_S + 60, delta=0.01)
+
+    def test_without_boot_clock(self):
+        # 没有含休眠时间的时钟时，单调时钟没有计入的休眠无法检测（也不会把墙上时间的跳变当成休眠），
+        # 单调时钟计入了的休眠仍然按等待超时检测
+        for monotonic_counts, expected in ((False, 0), (True, 1)):
+            log = EventLog()
+            engine, clock = make_engine(log, suspend_policy=SUSPEND_CONTINUE, clock=NoBootClock())
+
+            def on_tick(event, clock=clock):
+                if event.phase == PHASE_WORKING and event.remaining_s == 50:
+                    clock.simulate_suspend(self.SUSPEND_S, monotonic_counts)
+            log.on_tick = on_tick
+            engine.run()
+            self.assertEqual(len(log.named("on_suspend_detected")), expected)
+            self.assertEqual(log.named("on_session_finished"), [()])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,581 @@
+"""专注时钟的计时引擎（不依赖 PyQt5 / pygame）
+
+图形界面、命令行和测试都通过 SessionEngine 驱动同一套工作/休息循环。
+"""
+import bisect
+import itertools
+import random
+import sys
+import threading
+import time
+from array import array
+from collections import namedtuple
+
+# --- Timer Phases ---
+PHASE_IDLE = "IDLE"
+PHASE_WORKING = "WORKING"
+PHASE_SHORT_BREAK = "SHORT_BREAK"
+PHASE_LONG_BREAK = "LONG_BREAK"
+
+# --- Sound Cues ---
+CUE_DING = "ding"    # 工作间隔或短休息结束
+CUE_BREAK = "break"  # 进入长休息
+
+# --- Suspend Policies: 系统休眠打断了一个阶段之后如何处理 ---
+SUSPEND_PAUSE = "pause"        # 休眠时间不计入，阶段从中断处继续（默认）
+SUSPEND_CONTINUE = "continue"  # 休眠时间照常计入，醒来时阶段可能已经结束
+SUSPEND_RESTART = "restart"    # 被打断的阶段从头重新计时
+SUSPEND_POLICIES = (SUSPEND_PAUSE, SUSPEND_CONTINUE, SUSPEND_RESTART)
+
+# 唤醒时刻比秒边界稍晚一点，避免计时器精度不足导致提前醒来而多唤醒一次
+TICK_SLACK_S = 0.005
+# 一次等待多出来的时间超过该值即认为系统休眠过（或进程被挂起）
+SUSPEND_THRESHOLD_S = 5.0
+
+
+def format_clock(seconds):
+    """将秒数格式化为 MM:SS"""
+    mins, secs_rem = divmod(int(seconds), 60)
+    return f"{mins:02d}:{secs_rem:02d}"
+
+
+def format_total_seconds(total_seconds):
+    """将总秒数格式化为 HH:MM:SS"""
+    s = int(total_seconds)
+    m, s_rem = divmod(s, 60)
+    h, m_rem = divmod(m, 60)
+    return f"{h:02d}:{m_rem:02d}:{s_rem:02d}"
+
+
+def format_time_of_day(seconds_from_now):
+    """将距现在的秒数换算为当天的钟点 HH:MM"""
+    return time.strftime("%H:%M", time.localtime(time.time() + seconds_from_now))
+
+
+class TickEvent(namedtuple("TickEvent", ["phase", "remaining_s", "phase_total_s",
+                                         "overall_remaining_s", "next_break_s", "long_break_s"],
+                           defaults=(None, None))):
+    """一次倒计时刷新：当前阶段、阶段剩余秒数、阶段总秒数、总剩余秒数，
+    以及距下一次休息、距长休息开始的秒数（没有时为 None）"""
+    __slots__ = ()
+
+    @property
+    def percentage(self):
+        """当前阶段已完成的百分比 (0-100)"""
+        if self.phase_total_s <= 0:
+            return 0
+        elapsed_s = self.phase_total_s - self.remaining_s
+        return max(0, min(elapsed_s * 100 / self.phase_total_s, 100))
+
+
+class SystemClock:
+    """真实时钟：基于单调时钟，不受 NTP 校时、夏令时等墙上时间跳变影响
+
+    now() 在部分平台（Linux、macOS）上不包含系统休眠的时间；
+    boot_now() 包含休眠时间，两者之差用于检测休眠。
+    """
+
+    def now(self):
+        return time.monotonic()
+
+    def boot_now(self):
+        """包含系统休眠时间的单调时钟，当前平台没有时返回 None
+
+        Linux 上为 CLOCK_BOOTTIME，Windows 上为 GetTickCount64，macOS 上为 mach_continuous_time。
+        不能退回墙上时间，否则校时、夏令时或手动改时间都会被当成休眠。
+        """
+        return _boot_clock() if _boot_clock is not None else None
+
+    def wait(self, stop_event, timeout):
+        return stop_event.wait(timeout)
+
+
+def _find_boot_clock():
+    if hasattr(time, "CLOCK_BOOTTIME"):
+        return lambda: time.clock_gettime(time.CLOCK_BOOTTIME)
+    try:
+        import ctypes
+        if sys.platform == "win32":
+            tick_count = ctypes.windll.kernel32.GetTickCount64
+            tick_count.restype = ctypes.c_uint64
+            return lambda: tick_count() / 1000.0
+        if sys.platform == "darwin":
+            libc = ctypes.CDLL("/usr/lib/libSystem.dylib")
+
+            class TimebaseInfo(ctypes.Structure):
+                _fields_ = [("numer", ctypes.c_uint32), ("denom", ctypes.c_uint32)]
+
+            info = TimebaseInfo()
+            libc.mach_timebase_info(ctypes.byref(info))
+            continuous_time = libc.mach_continuous_time
+            continuous_time.restype = ctypes.c_uint64
+            scale = info.numer / info.denom / 1e9
+            return lambda: continuous_time() * scale
+    except (ImportError, OSError, AttributeError):
+        pass
+    return None
+
+
+_boot_clock = _find_boot_clock()
+
+
+class SimulatedClock:
+    """模拟时钟：等待时直接把时间拨快，不真正睡眠
+
+    用于测试和基准测试，可以在几毫秒内跑完一整个会话。
+    wake_latency_s 为每次唤醒额外推迟的最大秒数（均匀分布），
+    用来模拟操作系统调度延迟。
+    """
+
+    def __init__(self, start_ts=0.0, wake_latency_s=0.0, rng=None):
+        self.current_ts = start_ts
+        self.hidden_s = 0.0  # 单调时钟没有计入的休眠时间
+        self.wake_latency_s = wake_latency_s
+        self.rng = rng or random.Random(0)
+        self.waits = 0
+        self._pending_suspend = None
+
+    def now(self):
+        return self.current_ts
+
+    def boot_now(self):
+        return self.current_ts + self.hidden_s
+
+    def simulate_suspend(self, seconds, monotonic_counts=False):
+        """下一次等待期间模拟系统休眠 seconds 秒
+
+        monotonic_counts 为 True 时模拟单调时钟计入休眠时间的平台（Windows），
+        否则模拟单调时钟在休眠期间停止的平台（Linux、macOS）。
+        """
+        self._pending_suspend = (seconds, monotonic_counts)
+
+    def wait(self, stop_event, timeout):
+        self.waits += 1
+        if not stop_event.is_set():
+            self.current_ts += timeout
+            if self.wake_latency_s:
+                self.current_ts += self.rng.uniform(0, self.wake_latency_s)
+            if self._pending_suspend is not None:
+                seconds, monotonic_counts = self._pending_suspend
+                self._pending_suspend = None
+                if monotonic_counts:
+                    self.current_ts += seconds
+                else:
+                    self.hidden_s += seconds
+        return stop_event.is_set()
+
+
+class DeadlineTicker:
+    """基于截止时间的倒计时调度器
+
+    不再以固定频率轮询，而是直接睡到剩余整秒数下一次变化的时刻
+    （或阶段结束的时刻），因此每秒只唤醒一次。每次唤醒后检查是否发生过
+    系统休眠，并按 suspend_policy 调整当前阶段的截止时间。
+    """
+
+    def __init__(self, clock=None, suspend_policy=SUSPEND_PAUSE, on_suspend=None):
+        if suspend_policy not in SUSPEND_POLICIES:
+            raise ValueError(f"unknown suspend policy: {suspend_policy!r}")
+        self.clock = clock or SystemClock()
+        self.suspend_policy = suspend_policy
+        self.on_suspend = on_suspend  # on_suspend(suspended_s, shift_s)
+        self.end_time_ts = 0.0  # 当前（或上一个）阶段的截止时间
+        self.wakeups = 0        # 累计唤醒次数
+        self.active_s = 0.0     # 累计倒计时时长(秒)
+        self.suspend_count = 0  # 检测到的休眠次数
+        self.suspended_s = 0.0  # 累计休眠时长(秒)
+        self._phase_s = 0
+        self._begin_ts = 0.0
+        self._last_shown_s = None
+        self._wait = None       # 当前等待开始时的 (单调时间, 含休眠时间, 等待秒数)
+
+    def countdown(self, seconds, stop_event, on_tick, start_ts=None):
+        """倒计时 seconds 秒，剩余整秒数每变化一次就调用 on_tick(remaining_s)
+
+        start_ts 为本阶段计划的开始时间（默认为现在），截止时间据此计算，
+        因此上一阶段结束时的延迟不会累积到后面的阶段。
+        stop_event 被置位时立即返回。正常走完返回 True，被中断返回 False。
+        """
+        self.begin(seconds, start_ts)
+        try:
+            while not stop_event.is_set():
+                timeout = self.step(on_tick)
+                if timeout is None:
+                    return True
+                self.clock.wait(stop_event, timeout)
+                self.woke()
+            return False
+        finally:
+            self.finish()
+
+    # begin / step / woke / finish 是 countdown 的各个步骤，供不阻塞线程的调度方式
+    # （例如 Qt 事件循环中的定时器）自行安排等待
+
+    def begin(self, seconds, start_ts=None):
+        """开始一个阶段的倒计时"""
+        self._begin_ts = self.clock.now()
+        self._phase_s = seconds
+        self.end_time_ts = (self._begin_ts if start_ts is None else start_ts) + seconds
+        self._last_shown_s = None
+        self._wait = None
+
+    def step(self, on_tick):
+        """剩余整秒数变化时调用 on_tick，返回到下一次应唤醒的秒数，阶段结束时返回 None"""
+        left_s = self.end_time_ts - self.clock.now()
+        if left_s <= 0:
+            if self._last_shown_s != 0:
+                self._last_shown_s = 0
+                on_tick(0)
+            return None
+        remaining_s = int(left_s)
+        if remaining_s != self._last_shown_s:
+            self._last_shown_s = remaining_s
+            on_tick(remaining_s)
+        # 剩余时间落到 remaining_s 以下时显示才会变化
+        timeout = left_s - remaining_s + TICK_SLACK_S
+        self._wait = (self.clock.now(), self.clock.boot_now(), timeout)
+        return timeout
+
+    def woke(self):
+        """等待结束后调用：计入唤醒次数并检查期间是否发生过系统休眠"""
+        self.wakeups += 1
+        if self._wait is not None:
+            self._check_suspend(*self._wait)
+            self._wait = None
+
+    def finish(self):
+        """阶段结束或被停止后调用，累计倒计时时长"""
+        self.active_s += self.clock.now() - self._begin_ts
+
+    def _check_suspend(self, before_ts, before_boot_ts, timeout):
+        now = self.clock.now()
+        elapsed_s = now - before_ts
+        counted_s = max(0.0, elapsed_s - timeout)  # 单调时钟计入了的休眠时间
+        hidden_s = 0.0  # 没有计入的（没有含休眠时间的时钟时无法检测）
+        if before_boot_ts is not None:
+            hidden_s = max(0.0, (self.clock.boot_now() - before_boot_ts) - elapsed_s)
+        suspended_s = counted_s + hidden_s
+        if suspended_s < SUSPEND_THRESHOLD_S:
+            return
+
+        if self.suspend_policy == SUSPEND_PAUSE:
+            shift_s = counted_s
+        elif self.suspend_policy == SUSPEND_CONTINUE:
+            shift_s = -hidden_s
+        else:
+            shift_s = now + self._phase_s - self.end_time_ts
+        self.end_time_ts += shift_s
+        self.suspend_count += 1
+        self.suspended_s += suspended_s
+        if self.on_suspend is not None:
+            self.on_suspend(suspended_s, shift_s)
+
+    def wakeups_per_minute(self):
+        """倒计时期间平均每分钟的唤醒次数"""
+        if self.active_s <= 0:
+            return 0.0
+        return self.wakeups * 60.0 / self.active_s
+
+
+class SessionSchedule:
+    """预先生成的整个会话计划
+
+    开始会话时用给定的随机种子一次性抽取所有工作间隔，各阶段的类型和时长
+    按顺序存放在紧凑数组中，starts 为时长的前缀和（starts[i] 为第 i 个阶段
+    相对会话开始的秒数，最后一项为会话总时长）。已知阶段序号时，阶段剩余、
+    总剩余和下一次休息都可以直接算出；按任意时刻查询所处阶段只需在前缀和上二分。
+    相同的参数和种子总是生成相同的计划，便于复现问题。
+    """
+    PHASES = (PHASE_WORKING, PHASE_SHORT_BREAK, PHASE_LONG_BREAK)
+
+    def __init__(self, min_interval, max_interval, short_break_s, long_break_m, total_work_time_m, seed):
+        self.seed = seed
+        self.phase_codes = array("b")
+        self.durations = array("l")
+
+        rng = random.Random(seed)
+        total_work_s = total_work_time_m * 60
+        elapsed_s = 0
+        # 与原来的计时循环一致：每个工作间隔后跟一次短休息，累计满总工作时间后进入长休息
+        while elapsed_s < total_work_s:
+            work_s = rng.randint(min_interval * 60, max_interval * 60)
+            self._append(PHASE_WORKING, work_s)
+            self._append(PHASE_SHORT_BREAK, short_break_s)
+            elapsed_s += work_s + short_break_s
+        self.long_break_index = len(self.durations)
+        self._append(PHASE_LONG_BREAK, long_break_m * 60)
+
+        self.starts = array("q", itertools.accumulate(self.durations, initial=0))
+        # next_break[i]: 第 i 个阶段之后（含）的第一个休息阶段的序号
+        self.next_break = array("l", [0] * len(self.durations))
+        following = len(self.durations)
+        for index in range(len(self.durations) - 1, -1, -1):
+            if self.phase_codes[index]:
+                following = index
+            self.next_break[index] = following
+
+    def _append(self, phase, seconds):
+        self.phase_codes.append(self.PHASES.index(phase))
+        self.durations.append(seconds)
+
+    def __len__(self):
+        return len(self.durations)
+
+    @property
+    def total_s(self):
+        """整个会话（含长休息）的总秒数"""
+        return self.starts[-1]
+
+    def phase(self, index):
+        return self.PHASES[self.phase_codes[index]]
+
+    def locate(self, offset_s):
+        """返回会话开始 offset_s 秒后所处的 (阶段序号, 阶段剩余秒数)，会话已结束时序号为 len(self)"""
+        index = bisect.bisect_right(self.starts, offset_s) - 1
+        if index < 0:
+            return 0, self.durations[0]
+        if index >= len(self.durations):
+            return len(self.durations), 0
+        return index, self.starts[index + 1] - offset_s
+
+    def overall_remaining_s(self, index, phase_remaining_s):
+        """距长休息开始（即专注部分结束）的剩余秒数"""
+        if index >= self.long_break_index:
+            return 0
+        return self.starts[self.long_break_index] - self.starts[index + 1] + phase_remaining_s
+
+    def seconds_until(self, index, phase_remaining_s, target_index):
+        """当前处于第 index 个阶段时，距第 target_index 个阶段开始的秒数"""
+        return self.starts[target_index] - self.starts[index + 1] + phase_remaining_s
+
+    def next_break_index(self, index):
+        """第 index 个阶段之后的第一个休息阶段的序号，没有时返回 None"""
+        if index + 1 >= len(self.durations):
+            return None
+        return self.next_break[index + 1]
+
+
+class SessionEngine:
+    """一次专注会话：随机工作间隔 + 短休息循环，累计满总工作时间后进入长休息
+
+    所有状态都保存在这里，不依赖任何 GUI。事件通过 listeners 中对象的
+    可选回调方法通知，回调在运行会话的线程中执行（界面需自行转到 GUI 线程）：
+        on_session_started(schedule)
+                                  schedule 为本次会话的 SessionSchedule
+        on_phase_started(phase, phase_total_s)
+        on_tick(event)            event 为 TickEvent
+        on_phase_finished(phase, phase_total_s, elapsed_s, completed)
+                                  elapsed_s 为按时钟实际经过的秒数，
+                                  completed 为 False 表示阶段被停止
+        on_cue(cue)               CUE_DING / CUE_BREAK
+        on_suspend_detected(suspended_s, shift_s)
+                                  检测到系统休眠，shift_s 为截止时间的调整量
+        on_session_finished()     会话正常结束（未被停止）
+
+    各阶段按计划时间首尾相接（下一阶段从上一阶段的计划截止时间开始），
+    提示音、回调等造成的延迟不会累积，drift_s 为最近一个阶段实际结束时间
+    与计划截止时间之差，也就是此刻整个会话的累计偏差。
+    """
+
+    def __init__(self, clock=None, rng=None, suspend_policy=SUSPEND_PAUSE):
+        self.clock = clock or SystemClock()
+        self.rng = rng or random.Random()
+        self.ticker = DeadlineTicker(self.clock, suspend_policy, on_suspend=self._on_suspend)
+        self.listeners = []
+
+        # 默认参数
+        self.min_interval = 3        # 最小间隔(分钟)
+        self.max_interval = 5        # 最大间隔(分钟)
+        self.short_break_s = 10      # 短休息(秒)
+        self.long_break_m = 20       # 长休息(分钟)
+        self.total_work_time_m = 90  # 总工作时间(分钟)
+
+        # 状态变量（is_running、current_timer_phase、remaining_time_s 由 _state_lock 保护，
+        # 其他线程请通过 state() 读取）
+        self._state_lock = threading.Lock()
+        self.is_running = False
+        self.timer_thread = None
+        self.stop_event = threading.Event()
+        self.current_timer_phase = PHASE_IDLE
+        self.remaining_time_s = 0
+        self.seed = None              # 不为 None 时每次会话都使用该随机种子
+        self.schedule = None          # 当前会话的 SessionSchedule
+        self.phase_index = 0          # 当前阶段在 schedule 中的序号
+        self.next_phase_start_ts = 0  # 下一阶段的计划开始时间
+        self._phase_start_ts = 0
+        self._suspended_in_phase = False
+
+        # 计时偏差统计
+        self.drift_s = 0.0
+        self.max_drift_s = 0.0
+
+    def configure(self, min_interval, max_interval, short_break_s, long_break_m, total_work_time_m,
+                  seed=None):
+        """设置会话参数，最小间隔大于最大间隔时抛出 ValueError
+
+        seed 用于复现某次会话的计划，为 None 时每次会话随机生成种子。
+        """
+        if min_interval > max_interval:
+            raise ValueError("min_interval must not be greater than max_interval")
+        self.seed = seed
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.short_break_s = short_break_s
+        self.long_break_m = long_break_m
+        self.total_work_time_m = total_work_time_m
+
+    def start(self):
+        """在后台线程中开始会话（上一个会话的线程还没退出时先等它结束）"""
+        self._reset_session()
+        self.timer_thread = threading.Thread(target=self._run_session, args=(self.stop_event,),
+                                             name="session-timer", daemon=True)
+        self.timer_thread.start()
+
+    def run(self):
+        """在当前线程中开始会话，直到会话结束或被停止才返回"""
+        self._reset_session()
+        self._run_session(self.stop_event)
+
+    def stop(self):
+        """停止会话并立即唤醒计时线程，可在任意线程调用"""
+        with self._state_lock:
+            self._stop_locked()
+
+    def _stop_locked(self):
+        self.is_running = False
+        self.stop_event.set()
+        self.current_timer_phase = PHASE_IDLE
+
+    def state(self):
+        """返回 (is_running, current_timer_phase, remaining_time_s) 的一致快照，可在任意线程调用"""
+        with self._state_lock:
+            return self.is_running, self.current_timer_phase, self.remaining_time_s
+
+    def join(self, timeout=None):
+        """等待后台会话线程结束（停止后最后一个阶段的回调也已执行完）"""
+        if self.timer_thread is not None:
+            self.timer_thread.join(timeout)
+
+    def _reset_session(self):
+        with self._state_lock:
+            self.stop_event.set()
+        # 等上一个会话的计时线程记录完被停止的阶段再替换 schedule 等状态，
+        # 否则它会按新会话的计划和开始时间通知 on_phase_finished
+        previous = self.timer_thread
+        if previous is not None and previous is not threading.current_thread():
+            previous.join()
+        with self._state_lock:
+            self.stop_event = threading.Event()
+            self.is_running = True
+            self.current_timer_phase = PHASE_WORKING
+        seed = self.seed if self.seed is not None else self.rng.getrandbits(32)
+        self.schedule = SessionSchedule(self.min_interval, self.max_interval, self.short_break_s,
+                                        self.long_break_m, self.total_work_time_m, seed)
+        self.phase_index = 0
+        self.next_phase_start_ts = self.clock.now()
+        self.drift_s = 0.0
+        self.max_drift_s = 0.0
+
+    def current_tick(self):
+        """返回当前状态对应的 TickEvent（与最近一次 on_tick 的内容相同），会话未运行时返回 None
+
+        界面重新显示时用它一次性恢复显示，隐藏期间不必处理每次刷新。
+        """
+        with self._state_lock:
+            is_running, index, remaining_s = self.is_running, self.phase_index, self.remaining_time_s
+        schedule = self.schedule
+        if not is_running or schedule is None or index >= len(schedule):
+            return None
+        return self._tick_event(schedule, index, remaining_s)
+
+    def drift_report(self):
+        """返回计时偏差和休眠统计"""
+        return {
+            "drift_s": self.drift_s,
+            "max_drift_s": self.max_drift_s,
+            "suspend_count": self.ticker.suspend_count,
+            "suspended_s": self.ticker.suspended_s,
+            "suspend_policy": self.ticker.suspend_policy,
+        }
+
+    def _on_suspend(self, suspended_s, shift_s):
+        self._suspended_in_phase = True
+        self._notify("on_suspend_detected", suspended_s, shift_s)
+
+    def _notify(self, name, *args):
+        for listener in self.listeners:
+            callback = getattr(listener, name, None)
+            if callback is not None:
+                callback(*args)
+
+    def _run_session(self, stop_event):
+        self._notify("on_session_started", self.schedule)
+        for index in range(len(self.schedule)):
+            if not self._begin_phase(index, stop_event):
+                break
+            completed = self.ticker.countdown(self.schedule.durations[index], stop_event, self._tick,
+                                              start_ts=self.next_phase_start_ts) and not stop_event.is_set()
+            self._end_phase(index, completed)
+            if not completed:
+                break
+        self._finish_session(stop_event)
+
+    # 以下步骤由 _run_session 按顺序调用，不使用计时线程的引擎（qt_engine）也复用它们
+
+    def _begin_phase(self, index, stop_event):
+        """进入计划中的第 index 个阶段，会话已被停止时返回 False"""
+        schedule = self.schedule
+        phase = schedule.phase(index)
+        seconds = schedule.durations[index]
+        if phase == PHASE_LONG_BREAK:
+            self._notify("on_cue", CUE_BREAK)
+        with self._state_lock:
+            if stop_event.is_set():
+                return False
+            self.phase_index = index
+            self.current_timer_phase = phase
+            self.remaining_time_s = seconds
+        self._notify("on_phase_started", phase, seconds)
+        self._phase_start_ts = self.clock.now()
+        self._suspended_in_phase = False
+        return True
+
+    def _tick(self, remaining_s):
+        with self._state_lock:
+            self.remaining_time_s = remaining_s
+        self._notify("on_tick", self._tick_event(self.schedule, self.phase_index, remaining_s))
+
+    @staticmethod
+    def _tick_event(schedule, index, remaining_s):
+        next_break = schedule.next_break_index(index)
+        return TickEvent(
+            schedule.phase(index), remaining_s, schedule.durations[index],
+            schedule.overall_remaining_s(index, remaining_s),
+            None if next_break is None else schedule.seconds_until(index, remaining_s, next_break),
+            None if index >= schedule.long_break_index
+            else schedule.seconds_until(index, remaining_s, schedule.long_break_index))
+
+    def _end_phase(self, index, completed):
+        """第 index 个阶段结束（completed 为 False 表示被停止）"""
+        schedule = self.schedule
+        now = self.clock.now()
+        if completed and self._suspended_in_phase:
+            # 截止时间在休眠期间已过（continue 策略）时，下一阶段从唤醒后开始，
+            # 休眠造成的延迟不计入偏差
+            self.next_phase_start_ts = max(self.ticker.end_time_ts, now)
+        elif completed:
+            self.next_phase_start_ts = self.ticker.end_time_ts
+            self.drift_s = now - self.ticker.end_time_ts
+            self.max_drift_s = max(self.max_drift_s, abs(self.drift_s))
+        self._notify("on_phase_finished", schedule.phase(index), schedule.durations[index],
+                     now - self._phase_start_ts, completed)
+        if completed:
+            self._notify("on_cue", CUE_DING)
+
+    def _finish_session(self, stop_event):
+        # 如果是正常结束（不是被用户停止）
+        if not stop_event.is_set():
+            self._notify("on_session_finished")
+            with self._state_lock:
+                if self.stop_event is stop_event:
+                    self._stop_locked()
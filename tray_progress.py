@@ -0,0 +1,89 @@
+"""托盘图标上的进度环
+
+所有帧（STEPS 步 × 3 种阶段）只绘制一次，画在同一张图集 QPixmap 上，
+每帧对应一个预先创建好的 QIcon。计时过程中只在显示的步数或阶段变化时
+切换图标，不需要每秒用 QPainter 绘制，也不会分配新的图标。
+"""
+from PyQt5.QtCore import QRectF, Qt
+from PyQt5.QtGui import QColor, QIcon, QPainter, QPen, QPixmap
+from PyQt5.QtWidgets import QApplication
+
+from timer_engine import PHASE_LONG_BREAK, PHASE_SHORT_BREAK, PHASE_WORKING
+
+
+class TrayProgressAtlas:
+    """预先绘制的托盘进度环帧
+
+    帧编号 = 阶段行号 * STEPS + 步数，由 frame_index() 计算（不涉及 Qt 对象，
+    可在计时线程中调用），icon() 返回对应的共享 QIcon。第 0 步为空环，
+    第 STEPS - 1 步为整圈，分别对应 0% 和 100%。
+    """
+    STEPS = 60
+    FRAME_SIZE = 32
+    RING_WIDTH = 5
+    PHASES = (PHASE_WORKING, PHASE_SHORT_BREAK, PHASE_LONG_BREAK)
+    PHASE_COLORS = {
+        PHASE_WORKING: QColor(76, 175, 80),        # 与窗口中的进度弧相同的绿色
+        PHASE_SHORT_BREAK: QColor(33, 150, 243),
+        PHASE_LONG_BREAK: QColor(255, 152, 0),
+    }
+    TRACK_COLOR = QColor(200, 200, 200)
+    _PHASE_ROWS = {phase: row for row, phase in enumerate(PHASES)}
+
+    def __init__(self, frame_size=FRAME_SIZE):
+        self.frame_size = frame_size
+        screen = QApplication.primaryScreen()
+        self.device_pixel_ratio = screen.devicePixelRatio() if screen is not None else 1.0
+        self.atlas = self._render_atlas()
+        self.icons = [self._frame_icon(i) for i in range(len(self.PHASES) * self.STEPS)]
+
+    @classmethod
+    def frame_index(cls, phase, percentage):
+        """阶段和完成百分比对应的帧编号，未知阶段返回 None"""
+        row = cls._PHASE_ROWS.get(phase)
+        if row is None:
+            return None
+        step = min(cls.STEPS - 1, int(percentage * (cls.STEPS - 1) / 100))
+        return row * cls.STEPS + step
+
+    def icon(self, index):
+        return self.icons[index]
+
+    def _render_atlas(self):
+        """每行一种阶段、每列一步，全部绘制到一张透明的 QPixmap 上"""
+        dpr = self.device_pixel_ratio
+        size = self.frame_size
+        atlas = QPixmap(round(size * self.STEPS * dpr), round(size * len(self.PHASES) * dpr))
+        atlas.setDevicePixelRatio(dpr)
+        atlas.fill(Qt.transparent)
+
+        painter = QPainter(atlas)
+        painter.setRenderHint(QPainter.Antialiasing)
+        margin = self.RING_WIDTH / 2 + 1
+        track_pen = QPen(self.TRACK_COLOR, self.RING_WIDTH)
+        for row, phase in enumerate(self.PHASES):
+            color = self.PHASE_COLORS[phase]
+            arc_pen = QPen(color, self.RING_WIDTH, Qt.SolidLine, Qt.FlatCap)
+            for step in range(self.STEPS):
+                rect = QRectF(step * size + margin, row * size + margin, size - 2 * margin, size - 2 * margin)
+                painter.setPen(track_pen)
+                painter.setBrush(Qt.NoBrush)
+                painter.drawEllipse(rect)
+                # 第 0 步不画进度弧，最后一步画满整圈；从12点钟方向顺时针
+                if step:
+                    painter.setPen(arc_pen)
+                    painter.drawArc(rect, 90 * 16, -round(360 * 16 * step / (self.STEPS - 1)))
+                # 中心的圆点用阶段颜色，便于一眼分辨工作/休息
+                painter.setPen(Qt.NoPen)
+                painter.setBrush(color)
+                painter.drawEllipse(rect.center(), size * 0.16, size * 0.16)
+        painter.end()
+        return atlas
+
+    def _frame_icon(self, index):
+        row, step = divmod(index, self.STEPS)
+        dpr = self.device_pixel_ratio
+        size = round(self.frame_size * dpr)
+        frame = self.atlas.copy(step * size, row * size, size, size)
+        frame.setDevicePixelRatio(dpr)
+        return QIcon(frame)